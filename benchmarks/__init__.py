@@ -0,0 +1,9 @@
+#
+# 
+#
+"""This package contains scripts to measure the performance of the
+critical paths of this application. Run every module from the root of
+the project, for example:
+
+`python -m benchmarks.lrc_parse`
+"""
@@ -0,0 +1,68 @@
+#
+#
+#
+"""This module measures the cost of transferring timestamps between two
+versions of the same lyrics. It makes a timed LRC file and a copy with
+corrected text in which a fraction of lines are edited, inserted, or
+deleted, and reports the cost of `TransferTimestamps` per line for
+growing numbers of lines to show it stays near-linear.
+"""
+
+
+from argparse import ArgumentParser
+import random
+from timeit import repeat
+
+from benchmarks.lrc_parse import MakeLrcText
+from media.lrc import Lrc, LyricsItem, TransferTimestamps
+
+
+def MakeCorrectedLyrics(
+        lyrics: tuple[LyricsItem, ...],
+        edit_ratio: float,
+        seed: int = 0,
+        ) -> list[LyricsItem]:
+    """Returns untimed LyricsItems with the text of `lyrics` in which
+    about `edit_ratio` of lines are edited, inserted, or deleted.
+    """
+    rand = random.Random(seed)
+    corrected: list[LyricsItem] = []
+    for item in lyrics:
+        if rand.random() >= edit_ratio:
+            corrected.append(LyricsItem(item.text))
+            continue
+        action = rand.randrange(3)
+        if action == 0:
+            corrected.append(LyricsItem(item.text.upper() + ' (fixed)'))
+        elif action == 1:
+            corrected.append(LyricsItem(item.text))
+            corrected.append(LyricsItem('inserted line'))
+    return corrected
+
+
+def main() -> None:
+    argParser = ArgumentParser(description=__doc__)
+    argParser.add_argument(
+        '-n',
+        '--lines',
+        type=int,
+        nargs='+',
+        default=[100, 1_000, 10_000])
+    argParser.add_argument('-e', '--edit-ratio', type=float, default=0.05)
+    argParser.add_argument('-r', '--repeat', type=int, default=5)
+    args = argParser.parse_args()
+
+    for nLines in args.lines:
+        source = Lrc.FromStr(MakeLrcText(nLines)).lyrics
+        target = MakeCorrectedLyrics(source, args.edit_ratio)
+        elapsed = min(repeat(
+            lambda: TransferTimestamps(source, target),
+            repeat=args.repeat,
+            number=1))
+        print(
+            f'{nLines:>8,} lines: {elapsed * 1e3:9.2f} ms '
+            f'{elapsed * 1e6 / nLines:7.2f} µs/line')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+#
+#
+#
+"""This module measures the cost of detecting the encoding of LRC files
+on a mixed-encoding corpus. It encodes synthetic LRC files as ASCII,
+UTF-8, UTF-8 with BOM, UTF-16, and a legacy codepage and reports the
+cost of the detection layer per file and its throughput compared to a
+plain UTF-8 decode of the same bytes.
+"""
+
+
+from argparse import ArgumentParser
+from timeit import repeat
+
+from benchmarks.lrc_parse import MakeLrcText
+from media.lrc import Lrc, _DecodeLrcData
+
+
+def MakeCorpus(n_files: int, n_lines: int) -> list[tuple[str, bytes]]:
+    """Makes a list of 2-tuples of encoding names and the raw content of
+    `n_files` synthetic LRC files in a round robin of encodings.
+    """
+    encodings = ['ascii', 'utf-8', 'utf-8-sig', 'utf-16', 'cp1256',]
+    corpus: list[tuple[str, bytes]] = []
+    for idx in range(n_files):
+        encoding = encodings[idx % len(encodings)]
+        text = MakeLrcText(n_lines, idx)
+        if encoding == 'ascii':
+            text = text.encode('ascii', 'ignore').decode('ascii')
+        corpus.append((encoding, text.encode(encoding),))
+    return corpus
+
+
+def main() -> None:
+    argParser = ArgumentParser(description=__doc__)
+    argParser.add_argument('-f', '--files', type=int, default=500)
+    argParser.add_argument('-n', '--lines', type=int, default=60)
+    argParser.add_argument('-r', '--repeat', type=int, default=5)
+    args = argParser.parse_args()
+
+    corpus = MakeCorpus(args.files, args.lines)
+    nBytes = sum(len(data) for _, data in corpus)
+    fallbacks = Lrc.FALLBACK_ENCODINGS
+
+    def Detect() -> None:
+        for _, data in corpus:
+            _DecodeLrcData(data, fallbacks)
+
+    def DecodeUtf8() -> None:
+        for _, data in corpus:
+            str(data, 'utf-8', 'replace')
+
+    for encoding in sorted({encoding for encoding, _ in corpus}):
+        subset = [data for enc, data in corpus if enc == encoding]
+        subsetTime = min(repeat(
+            lambda: [_DecodeLrcData(data, fallbacks) for data in subset],
+            repeat=args.repeat,
+            number=1))
+        print(
+            f'{encoding:>10}: {subsetTime * 1e6 / len(subset):8.2f} '
+            'µs/file')
+    detect = min(repeat(Detect, repeat=args.repeat, number=1))
+    plain = min(repeat(DecodeUtf8, repeat=args.repeat, number=1))
+    print(f'Files: {len(corpus):,}, {nBytes / 1e6:.2f} MB')
+    print(
+        f'Detection:   {detect * 1e6 / len(corpus):8.2f} µs/file '
+        f'{nBytes / detect / 1e6:8.1f} MB/s')
+    print(
+        f'UTF-8 only:  {plain * 1e6 / len(corpus):8.2f} µs/file '
+        f'{nBytes / plain / 1e6:8.1f} MB/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+#
+#
+#
+"""This module measures reading LRC files from zip lyrics packs. It
+makes a pack with many members and reports the cost of building the
+index of `LrcPack` compared to `zipfile`, of opening the pack again with
+its index cached, and of looking up and parsing one member by stem.
+"""
+
+
+from argparse import ArgumentParser
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from timeit import repeat
+from zipfile import ZIP_DEFLATED, ZipFile
+
+from benchmarks.lrc_parse import MakeLrcText
+from media.lrc_pack import LrcPack
+
+
+def MakePack(filename: Path, n_members: int, n_lines: int) -> None:
+    """Makes a zip lyrics pack with `n_members` LRC members in album
+    folders.
+    """
+    data = MakeLrcText(n_lines).encode()
+    with ZipFile(filename, mode='w', compression=ZIP_DEFLATED) as zipFile:
+        for idx in range(n_members):
+            zipFile.writestr(f'album {idx % 100}/song {idx}.lrc', data)
+
+
+def main() -> None:
+    argParser = ArgumentParser(description=__doc__)
+    argParser.add_argument('-m', '--members', type=int, default=100_000)
+    argParser.add_argument('-n', '--lines', type=int, default=40)
+    argParser.add_argument('-r', '--repeat', type=int, default=3)
+    args = argParser.parse_args()
+
+    with TemporaryDirectory() as tempDir:
+        filename = Path(tempDir, 'pack.zip')
+        MakePack(filename, args.members, args.lines)
+
+        def BuildIndex() -> None:
+            LrcPack.ClearIndexes()
+            LrcPack(filename)
+
+        def ListZipFile() -> None:
+            with ZipFile(filename) as zipFile:
+                zipFile.infolist()
+
+        build = min(repeat(BuildIndex, repeat=args.repeat, number=1))
+        listing = min(repeat(ListZipFile, repeat=args.repeat, number=1))
+        cached = min(repeat(
+            lambda: LrcPack(filename),
+            repeat=args.repeat,
+            number=100)) / 100
+        pack = LrcPack(filename)
+        stem = f'song {args.members // 2}'
+        lookup = min(repeat(
+            lambda: pack.Get(stem),
+            repeat=args.repeat,
+            number=1_000)) / 1_000
+        print(f'Members: {args.members:,}')
+        print(f'Index build:   {build * 1e3:9.2f} ms')
+        print(f'zipfile list:  {listing * 1e3:9.2f} ms')
+        print(f'Cached open:   {cached * 1e6:9.2f} µs')
+        print(f'Lookup+parse:  {lookup * 1e6:9.2f} µs')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+#
+# 
+#
+"""This module measures the per-line cost of parsing LRC files. It
+generates a synthetic LRC file with tags and timestamped lyrics and
+reports the cost of the tokenizer alone and of the whole `Lrc`
+construction.
+"""
+
+
+from argparse import ArgumentParser
+from pathlib import Path
+import random
+from tempfile import TemporaryDirectory
+from timeit import repeat
+
+from media.lrc import Lrc, _LrcParser
+
+
+_WORDS = [
+    'love',
+    'night',
+    'rain',
+    'heart',
+    'la',
+    'شب',
+    'دل',
+    'باران',]
+
+
+def MakeLrcText(n_lines: int, seed: int = 0) -> str:
+    """Makes the text of a synthetic LRC file with `n_lines` lyrics
+    items in increasing order of timestamps.
+    """
+    rand = random.Random(seed)
+    lines = [
+        '[ar:Artist]',
+        '[ti:Title]',
+        '[al:Album]',
+        '[by:Benchmark]',
+        '',]
+    ms = 0
+    for _ in range(n_lines):
+        ms += rand.randint(100, 4_000)
+        mm, rem = divmod(ms, 60_000)
+        ss, xx = divmod(rem, 1_000)
+        text = ' '.join(rand.choices(_WORDS, k=rand.randint(2, 9)))
+        lines.append(f'[{mm:02}:{ss:02}.{xx // 10:02}]{text}')
+    lines.append('')
+    return '\n'.join(lines)
+
+
+def main() -> None:
+    argParser = ArgumentParser(description=__doc__)
+    argParser.add_argument('-n', '--lines', type=int, default=10_000)
+    argParser.add_argument('-r', '--repeat', type=int, default=5)
+    argParser.add_argument('--number', type=int, default=10)
+    args = argParser.parse_args()
+
+    text = MakeLrcText(args.lines)
+    nLines = text.count('\n')
+    with TemporaryDirectory() as tmpDir:
+        lrcFile = Path(tmpDir, 'bench.lrc')
+        lrcFile.write_text(text, encoding='utf-8')
+        tokenizer = min(repeat(
+            lambda: _LrcParser(Lrc.TAGS).Parse(text),
+            repeat=args.repeat,
+            number=args.number)) / args.number
+        whole = min(repeat(
+            lambda: Lrc(lrcFile),
+            repeat=args.repeat,
+            number=args.number)) / args.number
+    print(f'Lines: {nLines:,}')
+    print(
+        f'Tokenizer: {tokenizer * 1e3:8.2f} ms/file '
+        f'{tokenizer * 1e6 / nLines:6.2f} µs/line')
+    print(
+        f'Lrc(...):  {whole * 1e3:8.2f} ms/file '
+        f'{whole * 1e6 / nLines:6.2f} µs/line')
+
+
+if __name__ == '__main__':
+    main()
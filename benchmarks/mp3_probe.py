@@ -0,0 +1,68 @@
+#
+#
+#
+"""This module measures reading the basic properties of MP3 files
+in-process by `ProbeMp3` compared to running `ffprobe`. It probes the
+specified MP3 files or, if none is given, synthetic CBR and headerless
+VBR files which take the frame scan path.
+"""
+
+
+from argparse import ArgumentParser
+from pathlib import Path
+import random
+import shutil
+from tempfile import TemporaryDirectory
+from timeit import repeat
+
+from media.mp3 import _RunFfprobe
+from media.mp3_probe import ProbeMp3, _ParseFrameHeader
+
+
+def MakeMp3(filename: Path, n_frames: int, vbr: bool, seed: int = 0) -> None:
+    """Makes a synthetic MPEG-1 layer III file of silent-looking frames
+    at 44.1 kHz. If `vbr` is True, bit rates vary per frame.
+    """
+    rand = random.Random(seed)
+    frames: list[bytes] = []
+    for _ in range(n_frames):
+        bitRateIdx = rand.randint(1, 14) if vbr else 9
+        header = 0xFFFB0000 | (bitRateIdx << 12) | 0x40
+        length = _ParseFrameHeader(header).length
+        frames.append(header.to_bytes(4, 'big') + bytes(length - 4))
+    filename.write_bytes(b''.join(frames))
+
+
+def main() -> None:
+    argParser = ArgumentParser(description=__doc__)
+    argParser.add_argument('files', type=Path, nargs='*')
+    argParser.add_argument('-n', '--frames', type=int, default=9_000)
+    argParser.add_argument('-r', '--repeat', type=int, default=5)
+    args = argParser.parse_args()
+
+    hasFfprobe = shutil.which('ffprobe') is not None
+    with TemporaryDirectory() as tempDir:
+        files: list[Path] = args.files
+        if not files:
+            for name, vbr in (('cbr.mp3', False), ('vbr.mp3', True),):
+                files.append(Path(tempDir, name))
+                MakeMp3(files[-1], args.frames, vbr)
+        for filename in files:
+            probe = min(repeat(
+                lambda: ProbeMp3(filename),
+                repeat=args.repeat,
+                number=1))
+            rawData = ProbeMp3(filename)
+            duration = rawData['format']['duration'] if rawData else None
+            print(f'{filename.name}: duration {duration}')
+            print(f'  ProbeMp3: {probe * 1e3:9.2f} ms')
+            if hasFfprobe:
+                ffprobe = min(repeat(
+                    lambda: _RunFfprobe(filename),
+                    repeat=args.repeat,
+                    number=1))
+                print(f'  ffprobe:  {ffprobe * 1e3:9.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,6 @@
+#
+#
+#
+"""Makes the packages of this repository importable by the tests in
+`tests` folder.
+"""
@@ -0,0 +1,261 @@
+#
+#
+#
+"""This script validates and optionally normalizes, exports to
+subtitles, or embeds into the ID3 tags of their MP3 files all LRC files
+in a directory tree without the GUI. LRC files are parsed in a pool of
+processes and the counts of errors are aggregated into a report. With
+`--tags`, only the tags at the beginning of LRC files are read and the
+usage of tags is reported instead. Run it from the root of the project,
+for example:
+
+`python lrc_batch.py path/to/library --normalize --dry-run`
+"""
+
+
+from argparse import ArgumentParser
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+import os
+from pathlib import Path
+import sys
+from time import perf_counter
+from typing import Iterator, NamedTuple
+
+from media.lrc import Lrc, LrcErrors
+from media.id3_lyrics import WriteId3Lyrics
+from media.subtitles import ExportSubtitles
+
+
+class LrcReport(NamedTuple):
+    """The result of processing one LRC file in a worker process."""
+    filename: str
+    errors: int
+    """The `LrcErrors` flags of the file as an integer, before any
+    normalization.
+    """
+    encoding: str = ''
+    toRewrite: bool = False
+    """Specifies whether the normalized form differs from the file."""
+    written: bool = False
+    """Specifies whether the file has been rewritten."""
+    exported: bool = False
+    """Specifies whether the file has been exported to subtitles."""
+    embedded: bool = False
+    """Specifies whether the file has been embedded into its MP3 file."""
+    failure: str = ''
+    """The description of the exception raised processing the file or an
+    empty string.
+    """
+    tags: tuple[str, ...] = ()
+    """The names of the tags of the file in tags-only mode."""
+
+
+def IterLrcFiles(folder: str | Path) -> Iterator[str]:
+    """Yields the file system addresses of all LRC files in the
+    directory tree of `folder`.
+    """
+    for dirPath, _, fileNames in os.walk(folder):
+        for fileName in fileNames:
+            if fileName.lower().endswith('.lrc'):
+                yield os.path.join(dirPath, fileName)
+
+
+def ProcessLrc(
+        filename: str,
+        to_normalize: bool = False,
+        dry_run: bool = True,
+        export: str = '',
+        embed: bool = False,
+        tags_only: bool = False,
+        ) -> LrcReport:
+    """Parses the specified LRC file and returns its report. If
+    `tags_only` is True, only the tags at the beginning of the file are
+    read and reported, errors are not checked, and other arguments are
+    ignored. If
+    `to_normalize` is True, the file is normalized and, unless `dry_run`
+    is True, saved. If `export` is a subtitle extension such as `.srt`,
+    the timed lyrics are written next to the file with that extension,
+    ending the last cue at the `[length:]` tag if available. If `embed`
+    is True, the timed lyrics are written as SYLT and USLT frames into
+    the MP3 file with the same stem next to the file, if any.
+    """
+    try:
+        if tags_only:
+            lrc = Lrc(filename, True, True, headerOnly=True)
+            return LrcReport(
+                filename,
+                0,
+                lrc.encoding,
+                tags=(*lrc.tags, *lrc.unknownTags,))
+        lrc = Lrc(filename, True, True)
+        errors = int(lrc.errors)
+        toRewrite = written = exported = embedded = False
+        if to_normalize:
+            lrc.Normalize()
+            toRewrite = lrc.NeedsSaving()
+            if toRewrite and not dry_run:
+                written = lrc.Save()
+        if export and lrc.AreTimstampsOk():
+            lengthMs = lrc.GetLength()
+            if not dry_run:
+                ExportSubtitles(
+                    lrc,
+                    Path(filename).with_suffix(export),
+                    None if lengthMs is None else lengthMs / 1_000)
+            exported = True
+        mp3File = Path(filename).with_suffix('.mp3')
+        if embed and lrc.AreTimstampsOk() and mp3File.exists():
+            if not dry_run:
+                WriteId3Lyrics(mp3File, lrc)
+            embedded = True
+        return LrcReport(
+            filename,
+            errors,
+            lrc.encoding,
+            toRewrite,
+            written,
+            exported,
+            embedded)
+    except Exception as err:
+        return LrcReport(filename, 0, failure=f'{type(err).__name__}: {err}')
+
+
+def _ProcessLrcArgs(
+        args: tuple[str, bool, bool, str, bool, bool],
+        ) -> LrcReport:
+    return ProcessLrc(*args)
+
+
+def main() -> None:
+    argParser = ArgumentParser(description=__doc__)
+    argParser.add_argument('folder', type=Path)
+    argParser.add_argument(
+        '--normalize',
+        action='store_true',
+        help='rewrite files with tags first, deduplicated, and ordered')
+    argParser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='report files to be changed without writing anything')
+    argParser.add_argument(
+        '--export',
+        choices=['srt', 'vtt', 'ass'],
+        default='',
+        help='write timed lyrics as subtitles next to every LRC file')
+    argParser.add_argument(
+        '--embed',
+        action='store_true',
+        help='write timed lyrics as SYLT and USLT frames into MP3 files')
+    argParser.add_argument(
+        '--tags',
+        action='store_true',
+        help='only read the tags of files and report their usage')
+    argParser.add_argument(
+        '-j',
+        '--jobs',
+        type=int,
+        default=None,
+        help='the number of worker processes (defaults to CPU count)')
+    argParser.add_argument(
+        '--chunksize',
+        type=int,
+        default=64,
+        help='the number of files sent to a worker at a time')
+    argParser.add_argument(
+        '-v',
+        '--verbose',
+        action='store_true',
+        help='list files with errors')
+    args = argParser.parse_args()
+    if args.tags and (args.normalize or args.export or args.embed):
+        argParser.error(
+            '--tags cannot be used with --normalize, --export, or --embed')
+
+    if not args.folder.is_dir():
+        sys.stderr.write(f"'{args.folder}' is not a folder\n")
+        sys.exit(1)
+
+    startTime = perf_counter()
+    errorCounts: Counter[LrcErrors] = Counter()
+    encodingCounts: Counter[str] = Counter()
+    tagCounts: Counter[str] = Counter()
+    nFiles = nFailed = nFaulty = nToRewrite = nWritten = nExported = 0
+    nEmbedded = 0
+    export = f'.{args.export}' if args.export else ''
+    tasks = (
+        (
+            filename,
+            args.normalize,
+            args.dry_run,
+            export,
+            args.embed,
+            args.tags,)
+        for filename in IterLrcFiles(args.folder))
+    with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        for report in executor.map(
+                _ProcessLrcArgs,
+                tasks,
+                chunksize=args.chunksize):
+            nFiles += 1
+            if report.failure:
+                nFailed += 1
+                print(f'FAILED {report.filename}: {report.failure}')
+                continue
+            encodingCounts[report.encoding] += 1
+            tagCounts.update(report.tags)
+            nToRewrite += report.toRewrite
+            nWritten += report.written
+            nExported += report.exported
+            nEmbedded += report.embedded
+            if report.errors:
+                nFaulty += 1
+                errors = LrcErrors(report.errors)
+                # Iterating members since flag values are not iterable
+                # before Python 3.11...
+                names: list[str] = []
+                for flag in LrcErrors:
+                    if flag and errors & flag == flag:
+                        errorCounts[flag] += 1
+                        names.append(flag.name)
+                if args.verbose:
+                    print(f"{'|'.join(names):<40} {report.filename}")
+    elapsed = perf_counter() - startTime
+
+    if args.tags:
+        print(f'Files: {nFiles:,} ({nFailed:,} failed)')
+        print('Tags:')
+        for tag, count in tagCounts.most_common():
+            print(f'  {tag:<22} {count:>8,}')
+    else:
+        print(
+            f'Files: {nFiles:,} ({nFailed:,} failed, '
+            f'{nFaulty:,} with errors)')
+        for flag in LrcErrors:
+            if errorCounts[flag]:
+                print(f'  {flag.name:<22} {errorCounts[flag]:>8,}')
+    print('Encodings:')
+    for encoding, count in encodingCounts.most_common():
+        print(f'  {encoding:<22} {count:>8,}')
+    if args.normalize:
+        if args.dry_run:
+            print(f'Files to be rewritten: {nToRewrite:,}')
+        else:
+            print(f'Files rewritten: {nWritten:,}')
+    if export:
+        if args.dry_run:
+            print(f'Files to be exported: {nExported:,}')
+        else:
+            print(f'Files exported: {nExported:,}')
+    if args.embed:
+        if args.dry_run:
+            print(f'Files to be embedded: {nEmbedded:,}')
+        else:
+            print(f'Files embedded: {nEmbedded:,}')
+    print(
+        f'Elapsed: {elapsed:.2f} s, '
+        f'{nFiles / elapsed if elapsed else 0:,.0f} files/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -119,8 +119,9 @@ class FolderPlaylist(AbstractPlaylist):
 
         * `key`: the sorting function of audios in this `FolderPlaylist`.
         * `added_cb`, `changed_cb`, and `deleted_cb`: callabcks to be
-        called when corresponding events are detected. At least one of
-        them must be set for observing functionality.
+        called when corresponding events are detected for audios of the
+        folder. At least one of them must be set for observing
+        functionality.
         """
         from utils.funcs import PathLikeToPath
         self._master = master
@@ -206,18 +207,29 @@ class FolderPlaylist(AbstractPlaylist):
     
     def _OnCreated(self, items: Iterable[str]) -> None:
         if self._addedCb:
-            for item in items:
-                self._addedCb(Path(item))
+            for item in self._FilterAudios(items):
+                self._addedCb(item)
 
     def _OnChanged(self, items: Iterable[str]) -> None:
         if self._changedCb:
-            for item in items:
-                self._changedCb(Path(item))
+            for item in self._FilterAudios(items):
+                self._changedCb(item)
 
     def _OnDeleted(self, items: Iterable[str]) -> None:
         if self._deletedCb:
-            for item in items:
-                self._deletedCb(Path(item))
+            for item in self._FilterAudios(items):
+                self._deletedCb(item)
+
+    @staticmethod
+    def _FilterAudios(items: Iterable[str]) -> Iterable[Path]:
+        """Yields items of the folder which are audios, so changes to
+        other files such as LRCs and their temporary files during saving
+        are not reported as changes to the playlist.
+        """
+        for item in items:
+            pth = Path(item)
+            if FileExt(pth.suffix) == AUDIO_EXT:
+                yield pth
     
     def __repr__(self) -> str:
         return f"<{type(self).__qualname__} dir={str(self._dir)}>"
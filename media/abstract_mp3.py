@@ -7,6 +7,7 @@ playing the file, and also some basic editing capabilities.
 from asyncio import AbstractEventLoop
 from abc import ABC, abstractmethod
 from pathlib import Path
+from threading import Event
 
 
 class MP3NotFoundError(Exception):
@@ -124,6 +125,14 @@ class AbstractMp3(ABC):
         """Specifies whether the audio is playing at the moment or not."""
         pass
 
+    @property
+    @abstractmethod
+    def endEvent(self) -> Event:
+        """Gets the event which is set when the current playback reaches
+        the end of the stream, but not when it is paused or stopped.
+        """
+        pass
+
     @abstractmethod
     def Play(self) -> None:
         pass
@@ -0,0 +1,145 @@
+#
+#
+#
+"""This module offers a minimal reader of ID3v2 tags which walks the
+frame headers and reads only the bodies of the requested frames,
+seeking over the others such as cover art. It is meant for hot paths
+where loading the whole tag by `mutagen` is too costly. Tags using
+features which are not supported here raise `Id3Unsupported` so that
+the caller can fall back to `mutagen`.
+"""
+
+from __future__ import annotations
+import struct
+from typing import BinaryIO, Container, NamedTuple
+
+
+class Id3Unsupported(Exception):
+    """Raised for ID3 tags which cannot be read directly such as
+    unsynchronized, compressed, or encrypted ones.
+    """
+    pass
+
+
+class Id3Frames(NamedTuple):
+    """The result of reading requested frames of an ID3v2 tag."""
+    major: int
+    """The major version of the tag, 2 to 4, or 0 if there is none."""
+    size: int
+    """The size of the whole tag including its header and footer, which
+    is where the audio starts.
+    """
+    frames: list[tuple[bytes, bytes]]
+    """The IDs and bodies of the requested frames in the order of the
+    tag.
+    """
+
+
+ENCODINGS = ('latin-1', 'utf-16', 'utf-16-be', 'utf-8',)
+"""The ID3 text encodings by their encoding bytes."""
+
+
+def _ReadSyncsafe(data: bytes) -> int:
+    value = 0
+    for byte in data:
+        value = (value << 7) | (byte & 0x7F)
+    return value
+
+
+def ReadId3Frames(
+        file: BinaryIO,
+        frame_ids: Container[bytes],
+        ) -> Id3Frames:
+    """Reads the ID3v2 tag at the current position of the binary `file`
+    and returns the bodies of frames whose IDs are in `frame_ids`, for
+    example `b'SYLT'`. Frame IDs of ID3v2.2 tags have three characters.
+    The file is left at an unspecified position.
+
+    #### Exceptions:
+    * `Id3Unsupported`: the tag uses features which are not supported
+    here such as unsynchronization, compression, or encryption.
+    """
+    start = file.tell()
+    header = file.read(10)
+    if len(header) < 10 or header[:3] != b'ID3':
+        return Id3Frames(0, 0, [])
+    major, flags = header[3], header[5]
+    bodySize = _ReadSyncsafe(header[6:10])
+    size = 10 + bodySize
+    if major == 4 and flags & 0x10:
+        # Accounting for the footer...
+        size += 10
+    if major not in (2, 3, 4,) or flags & 0x80:
+        # Unsynchronized tags must be decoded byte by byte...
+        raise Id3Unsupported()
+    end = start + 10 + bodySize
+    pos = start + 10
+    if major == 2:
+        if flags & 0x40:
+            # ID3v2.2 compression has never been defined...
+            raise Id3Unsupported()
+        frameHeaderSize = 6
+    else:
+        frameHeaderSize = 10
+        if flags & 0x40:
+            # Skipping the extended header...
+            extSize = file.read(4)
+            if major == 3:
+                pos += 4 + struct.unpack('>L', extSize)[0]
+            else:
+                pos += _ReadSyncsafe(extSize)
+            file.seek(pos)
+    frames: list[tuple[bytes, bytes]] = []
+    while pos + frameHeaderSize <= end:
+        frameHeader = file.read(frameHeaderSize)
+        if len(frameHeader) < frameHeaderSize or frameHeader[0] == 0:
+            # Reaching padding or the end of the file...
+            break
+        if major == 2:
+            frameId = frameHeader[:3]
+            frameSize = int.from_bytes(frameHeader[3:6], 'big')
+            frameFlags = 0
+        else:
+            frameId = frameHeader[:4]
+            if major == 4:
+                frameSize = _ReadSyncsafe(frameHeader[4:8])
+            else:
+                frameSize = struct.unpack('>L', frameHeader[4:8])[0]
+            frameFlags = struct.unpack('>H', frameHeader[8:10])[0]
+        pos += frameHeaderSize + frameSize
+        if frameId not in frame_ids:
+            file.seek(pos)
+            continue
+        if (major == 3 and frameFlags & 0x00E0) or \
+                (major == 4 and frameFlags & 0x004F):
+            # Compressed, encrypted, grouped, or unsynchronized frame...
+            raise Id3Unsupported()
+        body = file.read(frameSize)
+        if len(body) < frameSize:
+            break
+        frames.append((frameId, body,))
+    return Id3Frames(major, size, frames)
+
+
+def ReadString(data: bytes, pos: int, encoding: int) -> tuple[str, int]:
+    """Reads a null-terminated string of the ID3 `encoding` from `pos`
+    of a frame body and returns it and the position after its
+    terminator. If there is no terminator, the string extends to the end
+    of the body.
+    """
+    if encoding in (1, 2,):
+        end = pos
+        while True:
+            end = data.find(b'\x00\x00', end)
+            if end < 0 or (end - pos) % 2 == 0:
+                break
+            end += 1
+        termSize = 2
+    else:
+        end = data.find(b'\x00', pos)
+        termSize = 1
+    if end < 0:
+        end, termSize = len(data), 0
+    raw = data[pos:end]
+    text = raw.decode(ENCODINGS[encoding], 'replace') if raw else ''
+    return text, end + termSize
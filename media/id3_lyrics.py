@@ -0,0 +1,224 @@
+#
+#
+#
+"""This module reads and writes lyrics embedded in MP3 files as ID3
+SYLT (synchronized lyrics) and USLT (unsynchronized lyrics) frames.
+
+Reading walks the headers of ID3v2 frames by `ReadId3Frames` and reads
+only the bodies of lyrics frames, seeking over the others such as cover
+art, so it is much cheaper than loading the whole tag. Tags which cannot
+be read that way, such as unsynchronized or compressed ones, are read by
+`mutagen`. Writing is done by `mutagen`.
+
+SYLT entries whose text starts with a line break begin a new line and
+the other entries of such frames are timed words of the current line,
+which map to enhanced LRC lines.
+"""
+
+from __future__ import annotations
+from array import array
+from os import PathLike
+import struct
+from typing import Iterable
+
+from media.id3_frames import ENCODINGS, Id3Unsupported, ReadId3Frames, \
+    ReadString
+from media.lrc import Lrc, LyricsItem, Timestamp
+
+
+_SYLT_IDS = {b'SYLT', b'SLT',}
+_USLT_IDS = {b'USLT', b'ULT',}
+
+_TIMESTAMP_MS = 2
+"""The SYLT timestamp format of absolute milliseconds."""
+
+_CONTENT_LYRICS = 1
+"""The SYLT content type of lyrics."""
+
+
+def _ParseSylt(body: bytes) -> tuple[int, int, list[tuple[str, int]]]:
+    """Parses the body of a SYLT frame and returns its timestamp format,
+    content type, and entries of texts and times.
+    """
+    encoding, timestampFormat, contentType = body[0], body[4], body[5]
+    if encoding >= len(ENCODINGS):
+        raise ValueError(f'bad ID3 text encoding: {encoding}')
+    _, pos = ReadString(body, 6, encoding)
+    entries: list[tuple[str, int]] = []
+    while pos < len(body):
+        text, pos = ReadString(body, pos, encoding)
+        if pos + 4 > len(body):
+            break
+        entries.append((text, struct.unpack_from('>L', body, pos)[0],))
+        pos += 4
+    return timestampFormat, contentType, entries
+
+
+def _ParseUslt(body: bytes) -> str:
+    """Parses the body of a USLT frame and returns its text."""
+    encoding = body[0]
+    if encoding >= len(ENCODINGS):
+        raise ValueError(f'bad ID3 text encoding: {encoding}')
+    _, pos = ReadString(body, 4, encoding)
+    text, _ = ReadString(body, pos, encoding)
+    return text
+
+
+def _ReadFramesWithMutagen(
+        mp3_file: PathLike,
+        ) -> tuple[list[tuple[int, int, list[tuple[str, int]]]], list[str]]:
+    from mutagen import MutagenError
+    from mutagen.id3 import ID3
+    try:
+        id3 = ID3(mp3_file)
+    except MutagenError:
+        # Treating a missing or broken tag as having no lyrics...
+        return [], []
+    sylts = [
+        (frame.format, frame.type, list(frame.text),)
+        for frame in id3.getall('SYLT')]
+    uslts = [frame.text for frame in id3.getall('USLT')]
+    return sylts, uslts
+
+
+def SyltToLyrics(entries: Iterable[tuple[str, int]]) -> list[LyricsItem]:
+    """Converts SYLT entries of texts and times in milliseconds to lyrics
+    items. If some entries start with a line break, they begin lines and
+    the others become timed words of the current line.
+    """
+    entries = list(entries)
+    isWordLevel = any(
+        text[:1] in ('\n', '\r',)
+        for text, _ in entries[1:])
+    FromMilliseconds = Timestamp.FromMilliseconds
+    if not isWordLevel:
+        return [
+            LyricsItem(text.strip('\r\n'), FromMilliseconds(ms))
+            for text, ms in entries]
+    lyrics: list[LyricsItem] = []
+    texts: list[str] = []
+    words = array('l')
+    lineLen = 0
+    for text, ms in entries:
+        if text[:1] in ('\n', '\r',) or not lyrics:
+            _EndSyltLine(lyrics, texts, words)
+            text = text.lstrip('\r\n')
+            lyrics.append(LyricsItem(text, FromMilliseconds(ms)))
+            texts = [text]
+            words = array('l', [0, ms])
+            lineLen = len(text)
+        else:
+            words.extend((lineLen, ms,))
+            texts.append(text)
+            lineLen += len(text)
+    _EndSyltLine(lyrics, texts, words)
+    return lyrics
+
+
+def _EndSyltLine(
+        lyrics: list[LyricsItem],
+        texts: list[str],
+        words: array[int],
+        ) -> None:
+    """Sets the text and timed words of the last lyrics item from the
+    SYLT entries of its line.
+    """
+    if len(words) > 2:
+        lyrics[-1].text = ''.join(texts)
+        lyrics[-1].words = words
+
+
+def ReadId3Lyrics(
+        mp3_file: PathLike,
+        lrc_file: PathLike | None = None,
+        ) -> Lrc | None:
+    """Reads the lyrics embedded in the ID3 tag of the specified MP3 file
+    and returns them as an Lrc object or None if there is none. SYLT
+    frames of lyrics timed in milliseconds are preferred; otherwise the
+    text of the first USLT frame is used, parsed as LRC if it is in that
+    format. `lrc_file`, if provided, is where `Lrc.Save` writes the
+    lyrics. A tag which cannot be parsed is taken as having no lyrics.
+
+    #### Exceptions:
+    * `OSError`: the file cannot be read
+    """
+    try:
+        with open(mp3_file, mode='rb') as file:
+            id3 = ReadId3Frames(file, _SYLT_IDS | _USLT_IDS)
+        sylts = [
+            _ParseSylt(body)
+            for frameId, body in id3.frames
+            if frameId in _SYLT_IDS]
+        uslts = [
+            _ParseUslt(body)
+            for frameId, body in id3.frames
+            if frameId in _USLT_IDS]
+    except (Id3Unsupported, ValueError, IndexError, struct.error):
+        sylts, uslts = _ReadFramesWithMutagen(mp3_file)
+    # Preferring lyrics content over other types of synced text...
+    sylts.sort(key=lambda sylt: sylt[1] != _CONTENT_LYRICS)
+    for timestampFormat, _, entries in sylts:
+        if timestampFormat == _TIMESTAMP_MS and entries:
+            return Lrc.FromLyrics(
+                SyltToLyrics(entries),
+                lrc_file,
+                True,
+                True)
+    for text in uslts:
+        if text.strip():
+            return Lrc.FromStr(text, lrc_file, True, True)
+    return None
+
+
+def WriteId3Lyrics(
+        mp3_file: PathLike,
+        lrc: Lrc,
+        lang: str = 'XXX',
+        ) -> None:
+    """Embeds the timed lyrics of `lrc` into the ID3 tag of the specified
+    MP3 file as a SYLT frame, with timed words of enhanced LRC lines as
+    separate entries, and as a USLT frame of plain text for players which
+    do not support SYLT. Existing SYLT and USLT frames are replaced. The
+    `[offset:]` tag is baked into the times.
+
+    #### Exceptions:
+    * `ValueError`: some lyrics do not have a timestamp
+    * `mutagen.MutagenError`: the file cannot be read or written
+    """
+    from mutagen.id3 import ID3, ID3NoHeaderError, Encoding, SYLT, USLT
+    lyrics = lrc.Retimed(bakeOffset=True).lyrics
+    entries: list[tuple[str, int]] = []
+    for idx, item in enumerate(lyrics):
+        prefix = '\n' if idx else ''
+        ms = item.timestamp.ToMilliseconds()
+        text, words = item.text, item.words
+        if not words:
+            entries.append((prefix + text, ms,))
+            continue
+        if words[0]:
+            # Keeping the text before the first timed word...
+            entries.append((prefix + text[:words[0]], ms,))
+            prefix = ''
+        for wordIdx in range(item.nWords):
+            start, end = item.GetWordSpan(wordIdx)
+            entries.append((prefix + text[start:end], words[2 * wordIdx + 1],))
+            prefix = ''
+    try:
+        id3 = ID3(mp3_file)
+    except ID3NoHeaderError:
+        id3 = ID3()
+    id3.delall('SYLT')
+    id3.delall('USLT')
+    id3.add(SYLT(
+        encoding=Encoding.UTF8,
+        lang=lang,
+        format=_TIMESTAMP_MS,
+        type=_CONTENT_LYRICS,
+        desc='',
+        text=entries))
+    id3.add(USLT(
+        encoding=Encoding.UTF8,
+        lang=lang,
+        desc='',
+        text='\n'.join(item.text for item in lyrics)))
+    id3.save(mp3_file)
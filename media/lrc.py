@@ -3,18 +3,35 @@ accompanying resource for some MP3 files.
 """
 
 from __future__ import annotations
-from copy import deepcopy
+from array import array
+from bisect import bisect_right
+import codecs
+from difflib import SequenceMatcher
 from enum import IntFlag
-from math import modf
+from glob import escape
+from hashlib import blake2b
+from heapq import merge
+from importlib import import_module
+import os
 from os import PathLike
 from pathlib import Path
 import re
-from typing import overload
+import shutil
+from sys import intern
+from types import MappingProxyType
+from typing import BinaryIO, Iterable, Mapping, NamedTuple, Sequence, \
+    overload
+import unicodedata
 
 
 class Timestamp:
     """Specifies a timestamp in the form of mm:ss.xx where mm and ss are
-    integers and """
+    integers and xx is the fraction of the second. Internally the
+    timestamp is kept as an integer number of milliseconds so objects of
+    this class are compact, immutable, hashable, and cheap to compare.
+    """
+    __slots__ = ('_ms', '_str',)
+
     @classmethod
     def FromString(cls, timestamp: str) -> Timestamp:
         """Converts strings in the form of mm:ss.xx to an instance of
@@ -42,15 +59,25 @@ class Timestamp:
             ) -> Timestamp:
         """Converts a floating-pont number to an instance of Timastamp, for
         examle 87.3 will be converted to 1:17.3. The 'ndigits' keyword
-        specifies number of digits after decimal point to kep.
+        specifies number of digits after decimal point to kep. It raises
+        ValueError if 'seconds' is negative.
         """
         seconds = round(seconds, ndigits)
-        xx, secs = modf(seconds)
-        mm, ss = divmod(int(secs), 60)
-        return Timestamp(
-            minutes=mm,
-            seconds=ss,
-            milliseconds=round(xx, ndigits))
+        if seconds < 0.0:
+            raise ValueError("'seconds' must be positive")
+        return cls.FromMilliseconds(round(seconds * 1_000))
+
+    @classmethod
+    def FromMilliseconds(cls, ms: int) -> Timestamp:
+        """Converts an integer number of milliseconds to an instance of
+        Timestamp. It raises ValueError if 'ms' is negative.
+        """
+        if ms < 0:
+            raise ValueError("'ms' must be positive")
+        timestamp = cls.__new__(cls)
+        timestamp._ms = ms
+        timestamp._str = None
+        return timestamp
 
     def __init__(
             self,
@@ -64,91 +91,92 @@ class Timestamp:
         If one of the parts is not in the suitable interval, it raises
         ValueError.
         """
-        self._minutes: int
-        self._seconds: int
-        self._milliseconds: float
-
-        # Setting attribute...
-        self.minutes = minutes
-        self.seconds = seconds
-        self.milliseconds = milliseconds
-    
-    @property
-    def minutes(self) -> int:
-        return self._minutes
-    
-    @minutes.setter
-    def minutes(self, __mm: int) -> None:
-        # Setting minutes attribute...
-        if not isinstance(__mm, int):
+        if not isinstance(minutes, int):
             raise TypeError("'minutes' must be an integer")
-        if __mm < 0:
+        if minutes < 0:
             raise ValueError("'minutes' must be positive")
-        self._minutes = __mm
+        if not isinstance(seconds, int):
+            raise TypeError("'seconds' must be an integer")
+        if not (0 <= seconds < 60):
+            raise ValueError("0 <= seconds < 60 must be true")
+        if not isinstance(milliseconds, float):
+            raise TypeError("'milliseconds' must be a floating-point number")
+        if not (0.0 <= milliseconds < 1.0):
+            raise ValueError("0.0 <= milliseconds < 1.0 must be true")
+        self._ms: int = (
+            (60 * minutes + seconds) * 1_000
+            + round(milliseconds * 1_000))
+        """The total milliseconds of this timestamp."""
+        self._str: str | None = None
+        """The cached string representation of this timestamp."""
     
     @property
-    def seconds(self) -> None:
-        return self._seconds
+    def minutes(self) -> int:
+        return self._ms // 60_000
     
-    @seconds.setter
-    def seconds(self, __ss: int) -> None:
-        if not isinstance(__ss, int):
-            raise TypeError("'seconds' must be an integer")
-        if not (0 <= __ss < 60):
-            raise ValueError("0 <= seconds < 60 must be true")
-        self._seconds = __ss
+    @property
+    def seconds(self) -> int:
+        return self._ms // 1_000 % 60
     
     @property
     def milliseconds(self) -> float:
-        return self._milliseconds
-    
-    @milliseconds.setter
-    def milliseconds(self, __xx: float) -> None:
-        if not isinstance(__xx, float):
-            raise TypeError("'milliseconds' must be a floating-point number")
-        if not (0.0 <= __xx < 1.0):
-            raise ValueError("0.0 <= milliseconds < 1.0 must be true")
-        self._milliseconds = __xx
+        """Gets the fraction of the second as a floating-point number
+        in the range of [0.0, 1.0).
+        """
+        return self._ms % 1_000 / 1_000
     
     def ToFloat(self) -> float:
-        return 60 * self._minutes + self._seconds + self._milliseconds
+        return self._ms / 1_000
+
+    def ToMilliseconds(self) -> int:
+        """Returns the total milliseconds of this timestamp."""
+        return self._ms
 
     def __str__(self) -> str:
-        xx = str(self.milliseconds).lstrip('0')
-        return f'{self.minutes:02}:{self.seconds:02}{xx}'
+        if self._str is None:
+            secs, ms = divmod(self._ms, 1_000)
+            mm, ss = divmod(secs, 60)
+            if ms % 10:
+                self._str = f'{mm:02}:{ss:02}.{ms:03}'
+            else:
+                self._str = f'{mm:02}:{ss:02}.{ms // 10:02}'
+        return self._str
     
     def __repr__(self) -> str:
         return f'<{self.__class__} object {str(self)}>'
     
+    def __hash__(self) -> int:
+        return hash(self._ms)
+    
     def __lt__(self, timestamp: Timestamp) -> bool:
-        a = (self.minutes, self.seconds, self.milliseconds,)
-        b = (timestamp.minutes, timestamp.seconds, timestamp.milliseconds,)
-        return a < b
+        if not isinstance(timestamp, Timestamp):
+            return NotImplemented
+        return self._ms < timestamp._ms
     
     def __gt__(self, timestamp: Timestamp) -> bool:
-        a = (self.minutes, self.seconds, self.milliseconds,)
-        b = (timestamp.minutes, timestamp.seconds, timestamp.milliseconds,)
-        return a > b
+        if not isinstance(timestamp, Timestamp):
+            return NotImplemented
+        return self._ms > timestamp._ms
     
     def __le__(self, timestamp: Timestamp) -> bool:
-        a = (self.minutes, self.seconds, self.milliseconds,)
-        b = (timestamp.minutes, timestamp.seconds, timestamp.milliseconds,)
-        return a <= b
+        if not isinstance(timestamp, Timestamp):
+            return NotImplemented
+        return self._ms <= timestamp._ms
     
     def __ge__(self, timestamp: Timestamp) -> bool:
-        a = (self.minutes, self.seconds, self.milliseconds,)
-        b = (timestamp.minutes, timestamp.seconds, timestamp.milliseconds,)
-        return a >= b
+        if not isinstance(timestamp, Timestamp):
+            return NotImplemented
+        return self._ms >= timestamp._ms
     
     def __eq__(self, timestamp: Timestamp) -> bool:
-        a = (self.minutes, self.seconds, self.milliseconds,)
-        b = (timestamp.minutes, timestamp.seconds, timestamp.milliseconds,)
-        return a == b
+        if not isinstance(timestamp, Timestamp):
+            return NotImplemented
+        return self._ms == timestamp._ms
     
     def __ne__(self, timestamp: Timestamp) -> bool:
-        a = (self.minutes, self.seconds, self.milliseconds,)
-        b = (timestamp.minutes, timestamp.seconds, timestamp.milliseconds,)
-        return a != b
+        if not isinstance(timestamp, Timestamp):
+            return NotImplemented
+        return self._ms != timestamp._ms
 
 
 class LrcErrors(IntFlag):
@@ -176,13 +204,67 @@ _lrcErrorMessages = {
 
 
 class LyricsItem:
+    __slots__ = ('text', 'timestamp', 'words',)
+
     def __init__(
             self,
             text: str,
-            timestamp: Timestamp | None = None
+            timestamp: Timestamp | None = None,
+            words: array[int] | None = None,
             ) -> None:
+        """Initializes a new instance of LyricsItem. The optional 'words'
+        is the word-level timing of enhanced LRC lines as a flat array of
+        pairs of the offset of every word in 'text' and its start time in
+        milliseconds.
+        """
         self.text = text
         self.timestamp = timestamp
+        self.words = words
+    
+    def Copy(self) -> LyricsItem:
+        """Returns an editable copy of this lyrics item. Timestamps and
+        texts are immutable so they are shared with the copy.
+        """
+        return LyricsItem(
+            self.text,
+            self.timestamp,
+            None if self.words is None else array('l', self.words))
+    
+    @property
+    def nWords(self) -> int:
+        """Gets the number of timed words of this lyrics item."""
+        return 0 if self.words is None else len(self.words) >> 1
+    
+    def GetWordSpan(self, idx: int) -> tuple[int, int]:
+        """Returns the `[start, end)` interval of the `idx`th timed word
+        in the text. It raises IndexError if there is no such word.
+        """
+        words = self.words
+        if words is None or not (0 <= idx < (len(words) >> 1)):
+            raise IndexError("'idx' is out of range of timed words")
+        idx <<= 1
+        try:
+            return words[idx], words[idx + 2]
+        except IndexError:
+            return words[idx], len(self.text)
+    
+    def GetEnhancedText(self) -> str:
+        """Returns the text of this lyrics item with inline word
+        timestamps in the form of `<mm:ss.xx>` if it has word-level
+        timing, otherwise the text.
+        """
+        if not self.words:
+            return self.text
+        parts: list[str] = []
+        prevOffset = 0
+        words = self.words
+        for idx in range(0, len(words), 2):
+            offset = words[idx]
+            parts.append(self.text[prevOffset:offset])
+            parts.append(f'<{Timestamp.FromMilliseconds(words[idx + 1])}>')
+            prevOffset = offset
+        parts.append(self.text[prevOffset:])
+        return ''.join(parts)
     
     def __getitem__(self, __value: int) -> str | Timestamp:
         """Returns timestamp attribute for 0 and text for 1. For any other
@@ -213,6 +295,9 @@ class LyricsItem:
             if not isinstance(__value, str):
                 raise TypeError(
                     "Item for index 0 of a 'LyricsItem' must be string")
+            if __value != self.text:
+                # Word offsets are not valid for the new text...
+                self.words = None
             self.text = __value
         else:
             raise TypeError(
@@ -229,11 +314,1065 @@ class LyricsItem:
             + '>')
 
 
+_SetText = LyricsItem.text.__set__
+_SetTimestamp = LyricsItem.timestamp.__set__
+_SetWords = LyricsItem.words.__set__
+
+
+class _FrozenLyricsItem(LyricsItem):
+    """A read-only LyricsItem. `Lrc` objects keep their lyrics as such
+    items so they can share them with readers without copying. `Copy`
+    returns an editable LyricsItem.
+    """
+    __slots__ = ()
+
+    def __init__(
+            self,
+            text: str,
+            timestamp: Timestamp | None = None,
+            words: array[int] | None = None,
+            ) -> None:
+        # Setting the slots by their descriptors, bypassing __setattr__...
+        _SetText(self, text)
+        _SetTimestamp(self, timestamp)
+        _SetWords(self, words)
+
+    def __setattr__(self, name: str, value: object) -> None:
+        raise AttributeError(
+            'lyrics items of Lrc objects are read-only, edit a copy')
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(
+            'lyrics items of Lrc objects are read-only, edit a copy')
+
+    def __setitem__(self, __idx: int, __value: str | Timestamp, /) -> None:
+        raise TypeError(
+            'lyrics items of Lrc objects are read-only, edit a copy')
+
+    def __reduce__(self) -> tuple:
+        return (
+            _FrozenLyricsItem,
+            (self.text, self.timestamp, self.words,),)
+
+
+def _Freeze(
+        items: Iterable[LyricsItem],
+        copyWords: bool = True,
+        ) -> tuple[LyricsItem, ...]:
+    """Returns the specified lyrics items as a tuple of read-only items,
+    sharing the ones which are already read-only. Arrays of timed words
+    are copied unless `copyWords` is False.
+    """
+    return tuple(
+        item if type(item) is _FrozenLyricsItem
+        else _FrozenLyricsItem(
+            item.text,
+            item.timestamp,
+            item.words if item.words is None or not copyWords
+                else array('l', item.words))
+        for item in items)
+
+
+def _ParseTimeText(text: str, start: int, end: int) -> int | None:
+    """Parses `text[start:end]` as a timestamp in the form of mm:ss.xx
+    and returns its total milliseconds. It returns -1 if the timestamp is
+    well-formed but its values are not valid and None if it is not a
+    timestamp at all.
+    """
+    colon = text.find(':', start, end)
+    if colon < 0:
+        return None
+    dot = text.find('.', colon + 1, end)
+    if dot < 0:
+        return None
+    mm = text[start:colon]
+    ss = text[colon + 1:dot]
+    xx = text[dot:end]
+    if not (mm.isdecimal() and ss.isdecimal() and xx[1:].isdecimal()):
+        return None
+    secs = int(ss)
+    if secs >= 60:
+        return -1
+    return (60 * int(mm) + secs) * 1_000 + round(float(xx) * 1_000)
+
+
+def _ParseWordTimestamps(text: str) -> tuple[str, array[int] | None]:
+    """Parses inline word timestamps of enhanced LRC lines such as
+    `<00:12.00>Hello <00:12.50>world` and returns a 2-tuple of the text
+    without word timestamps and the word-level timing as a flat array of
+    pairs of (offset, milliseconds). If there is no word timestamp, the
+    text is returned intact with None.
+    """
+    parts: list[str] = []
+    words = array('l')
+    length = 0
+    copied = 0
+    search = 0
+    while True:
+        start = text.find('<', search)
+        if start < 0:
+            break
+        end = text.find('>', start + 1)
+        if end < 0:
+            break
+        ms = _ParseTimeText(text, start + 1, end)
+        if ms is None or ms < 0:
+            # Not a word timestamp, keeping it in the text...
+            search = start + 1
+            continue
+        chunk = text[copied:start]
+        parts.append(chunk)
+        length += len(chunk)
+        words.append(length)
+        words.append(ms)
+        copied = search = end + 1
+    if not words:
+        return text, None
+    parts.append(text[copied:])
+    return ''.join(parts), words
+
+
+_BOMS: tuple[tuple[bytes, str], ...] = (
+    (codecs.BOM_UTF32_LE, 'utf-32',),
+    (codecs.BOM_UTF32_BE, 'utf-32',),
+    (codecs.BOM_UTF8, 'utf-8-sig',),
+    (codecs.BOM_UTF16_LE, 'utf-16',),
+    (codecs.BOM_UTF16_BE, 'utf-16',),)
+"""Byte order marks and their encodings. UTF-32 marks come first because
+the UTF-32 LE mark starts with the UTF-16 LE mark.
+"""
+
+
+def _DetectEncoding(data: bytes | bytearray | memoryview) -> str | None:
+    """Detects the encoding of the raw content of an LRC file from its
+    first bytes without decoding it. It returns None if the content has
+    no byte order mark and is not BOM-less UTF-16.
+    """
+    head = bytes(data[:4])
+    for bom, encoding in _BOMS:
+        if head.startswith(bom):
+            return encoding
+    # Looking for BOM-less UTF-16, LRC files begin with an ASCII
+    # character so one of the first two bytes is zero...
+    if len(head) >= 2 and len(data) % 2 == 0:
+        if head[0] and not head[1]:
+            return 'utf-16-le'
+        if head[1] and not head[0]:
+            return 'utf-16-be'
+    return None
+
+
+class _ScriptTable(dict[int, str]):
+    """The `str.translate` table which maps letters and combining marks
+    to one Latin-1 character per script from 'À' on, ASCII letters to
+    'a', non-ASCII Latin letters to 'b', other ASCII characters to
+    space, and other characters to '!'. Entries are computed on first
+    use.
+    """
+    def __init__(self) -> None:
+        super().__init__()
+        self.codes: dict[str, str] = {'LATIN': 'b'}
+        """Maps script names to their characters."""
+
+    def __missing__(self, key: int) -> str:
+        char = chr(key)
+        if char.isascii():
+            code = 'a' if char.isalpha() else ' '
+        elif unicodedata.category(char)[0] in 'LM':
+            script = unicodedata.name(char, '').partition(' ')[0]
+            code = self.codes.get(script)
+            if code is None:
+                code = chr(0xbf + len(self.codes))
+                if code > '\xff':
+                    # Too many scripts, considering it a symbol...
+                    code = '!'
+                else:
+                    self.codes[script] = code
+        else:
+            code = '!'
+        self[key] = code
+        return code
+
+
+_scriptTable = _ScriptTable()
+
+_COLLAPSE_TABLE = bytes.maketrans(
+    b'!b' + bytes(range(0xc0, 0x100)),
+    b' ' + b'a' * 0x41)
+"""The `bytes.translate` table which maps the characters of letters of
+`_ScriptTable` to 'a' and other characters to space.
+"""
+
+_UNDEFINED = 0
+"""The code of bytes which are not defined in a single-byte codepage in
+the tables of `_GetByteScriptTable`.
+"""
+
+_byteScriptTables: dict[str, tuple[bytes, int] | None] = {}
+"""Memoizes `_GetByteScriptTable`."""
+
+
+def _GetByteScriptTable(encoding: str) -> tuple[bytes, int] | None:
+    """Returns a 2-tuple of the `bytes.translate` table which maps the
+    bytes of the specified single-byte encoding to the characters of
+    `_ScriptTable`, or to `_UNDEFINED` for undefined bytes, and the code
+    of the script most of its non-ASCII letters belong to. It returns
+    None if the encoding is not a single-byte codepage.
+    """
+    try:
+        return _byteScriptTables[encoding]
+    except KeyError:
+        pass
+    try:
+        name = codecs.lookup(encoding).name.replace('-', '_')
+        decodingTable = import_module(f'encodings.{name}').decoding_table
+    except (ImportError, AttributeError, LookupError):
+        result = None
+    else:
+        table = bytes(
+            _UNDEFINED if char == '\ufffe' else ord(_scriptTable[ord(char)])
+            for char in decodingTable)
+        letters = table[0x80:].translate(None, b'\x00 !')
+        primary = max(set(letters), key=letters.count, default=_UNDEFINED)
+        result = (table, primary,)
+    _byteScriptTables[encoding] = result
+    return result
+
+
+def _ScoreScripts(scripts: bytes) -> int:
+    """Returns how plausible the letters of a text are from the codes of
+    its characters by `_ScriptTable`: adjacent letters of the same
+    script score up, adjacent letters of different scripts score down,
+    and non-ASCII characters which are not letters such as symbols
+    score down. A codepage which decodes the text of another codepage
+    typically mixes scripts within words or produces symbols. Adjacent
+    non-ASCII Latin letters do not score up because they are rare in
+    Latin text but typical of other scripts decoded as Latin. Scores of
+    decodings of the same content are comparable because their ASCII
+    characters are identical.
+    """
+    letters = scripts.translate(_COLLAPSE_TABLE)
+    nPairs = letters.count(b'a') - letters.count(b' a') - \
+        letters.startswith(b'a') - scripts.count(b'bb')
+    present = [
+        ord(code)
+        for code in ('a', *_scriptTable.codes.values(),)
+        if ord(code) in scripts]
+    nChanges = sum(
+        scripts.count(bytes((first, second,)))
+        for first in present
+        for second in present
+        if first != second and {first, second} != {0x61, 0x62})
+    return nPairs - 2 * nChanges - scripts.count(b'!')
+
+
+_NON_ASCII_RE = re.compile(rb'[\x80-\xff]')
+
+_UTF8_SAMPLE_SIZE = 256
+"""The number of bytes from the first non-ASCII byte which are checked
+to be UTF-8 before decoding the whole content as UTF-8. Text of legacy
+codepages rarely forms valid UTF-8 even over a few characters.
+"""
+
+
+def _DecodeLrcData(
+        data: bytes | bytearray | memoryview,
+        fallbacks: Iterable[str],
+        final: bool = True,
+        ) -> tuple[str, str]:
+    """Decodes the raw content of an LRC file and returns a 2-tuple of
+    the text and the name of its encoding. The content is decoded by the
+    encoding of its byte order mark, or as ASCII if all bytes are ASCII,
+    or as UTF-8 if the bytes from the first non-ASCII byte on, at most
+    `_UTF8_SAMPLE_SIZE` bytes, are valid UTF-8, in this order.
+    Otherwise every encoding of `fallbacks` which can decode the content
+    is scored and the text whose letters are the most consistent wins,
+    then the encoding whose main script appears in the text, then the
+    earlier encoding. Scoring is needed because single-byte codepages
+    such as cp1256 decode any content. Single-byte codepages are scored
+    on the raw bytes, so the content is decoded only once by the winner.
+    If `final` is False, `data` is a prefix of the content and an
+    incomplete character at its end is dropped.
+
+    #### Exceptions:
+    * `UnicodeDecodeError`: none of the encodings can decode the content
+    """
+    if final:
+        decode = str
+    else:
+        def decode(data, encoding):
+            return codecs.getincrementaldecoder(encoding)().decode(data)
+    encoding = _DetectEncoding(data)
+    if encoding is not None:
+        return decode(data, encoding), encoding
+    raw = data if isinstance(data, bytes) else bytes(data)
+    if raw.isascii():
+        # ASCII is a subset of UTF-8, saving as UTF-8...
+        return str(raw, 'ascii'), 'utf-8'
+    start = _NON_ASCII_RE.search(raw).start()
+    try:
+        # Checking a sample, allowing an incomplete last character...
+        codecs.utf_8_decode(raw[start:start + _UTF8_SAMPLE_SIZE], None, False)
+        return decode(raw, 'utf-8'), 'utf-8'
+    except UnicodeDecodeError as err:
+        lastErr = err
+    best: tuple[tuple[int, bool], str, str | None] | None = None
+    for encoding in fallbacks:
+        byteTable = _GetByteScriptTable(encoding)
+        if byteTable is None:
+            try:
+                text = decode(raw, encoding)
+            except UnicodeDecodeError as err:
+                lastErr = err
+                continue
+            scripts = text.translate(_scriptTable).encode('latin-1')
+            hasMainScript = True
+        else:
+            table, mainScript = byteTable
+            text = None
+            scripts = raw.translate(table)
+            if _UNDEFINED in scripts:
+                try:
+                    # Getting the error of the undefined byte...
+                    decode(raw, encoding)
+                except UnicodeDecodeError as err:
+                    lastErr = err
+                continue
+            hasMainScript = mainScript in scripts
+        key = (_ScoreScripts(scripts), hasMainScript,)
+        if best is None or key > best[0]:
+            best = (key, encoding, text,)
+    if best is None:
+        raise lastErr
+    _, encoding, text = best
+    if text is None:
+        text = decode(raw, encoding)
+    return text, encoding
+
+
+_LANG_TAG_RE = re.compile(r'[A-Za-z]{2,3}(?:[-_][A-Za-z0-9]{2,8})*')
+"""Matches language tags such as 'fa', 'en-US', and 'zh-Hant'."""
+
+
+def _CopyTags(
+        tags: Mapping[str, str | list[str]],
+        ) -> dict[str, str | list[str]]:
+    """Returns a copy of `tags` which shares none of the lists of values
+    of duplicate tags.
+    """
+    return {
+        tag: (value[:] if isinstance(value, list) else value)
+        for tag, value in tags.items()}
+
+
+def _GetDigest(data: bytes) -> bytes:
+    """Returns the digest of the content of LRC files."""
+    return blake2b(data, digest_size=16).digest()
+
+
+def _GetFileSignature(file: PathLike | int) -> tuple[int, int] | None:
+    """Returns the size and the modification time (in nanoseconds) of
+    the specified file or file descriptor. If the file does not exist,
+    it returns None.
+    """
+    try:
+        stat = os.stat(file)
+    except FileNotFoundError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _GetUmask() -> int:
+    """Returns the file mode creation mask of the process."""
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return umask
+
+
+_UMASK = _GetUmask()
+"""The file mode creation mask of the process, read once at import
+because reading it requires changing it.
+"""
+
+
+def _WriteAtomically(
+        filename: PathLike,
+        data: bytes | Iterable[bytes],
+        ) -> None:
+    """Writes `data`, bytes or an iterable of chunks of bytes, to a
+    temporary file in the folder of `filename` and then replaces
+    `filename` with it, so `filename` has either the old or the new
+    content even if a crash happens in the middle. If iterating `data`
+    raises, `filename` is not touched either. The file
+    keeps the mode of the existing file or, if it is new, gets the
+    default mode of new files rather than the private mode of temporary
+    files. The temporary file is hidden and does not have the extension
+    of `filename`, so it is not taken for an audio or LRC file by folder
+    watchers.
+    """
+    from tempfile import mkstemp
+    pth = Path(filename)
+    fd, tmpName = mkstemp(
+        dir=pth.parent,
+        prefix=f'.{pth.name}.',
+        suffix='.tmp')
+    try:
+        with open(fd, mode='wb') as tmpFile:
+            if isinstance(data, (bytes, bytearray, memoryview,)):
+                tmpFile.write(data)
+            else:
+                tmpFile.writelines(data)
+            tmpFile.flush()
+            os.fsync(tmpFile.fileno())
+        try:
+            shutil.copymode(pth, tmpName)
+        except FileNotFoundError:
+            os.chmod(tmpName, 0o666 & ~_UMASK)
+        os.replace(tmpName, pth)
+    except BaseException:
+        try:
+            os.unlink(tmpName)
+        except OSError:
+            pass
+        raise
+
+
+def _GetTimestampMs(lyrics_item: LyricsItem) -> int:
+    """Returns the total milliseconds of the timestamp of the provided
+    lyrics item to be used as sorting key.
+    """
+    return lyrics_item.timestamp._ms
+
+
+def _CollapseRepeats(
+        lyrics: Iterable[LyricsItem],
+        ) -> list[tuple[list[Timestamp | None], str]]:
+    """Groups the timestamps of lyrics items with the same non-empty text
+    into one line. It returns a list of 2-tuples of timestamps and text
+    in the order of the first occurrence of every text. Lyrics items with
+    no timestamp or with empty text are not grouped.
+    """
+    lines: list[tuple[list[Timestamp | None], str]] = []
+    byText: dict[str, list[Timestamp | None]] = {}
+    for lyricsItem in lyrics:
+        text = lyricsItem.text
+        if lyricsItem.words:
+            lines.append((
+                [lyricsItem.timestamp],
+                lyricsItem.GetEnhancedText(),))
+        elif lyricsItem.timestamp is None or not text:
+            lines.append(([lyricsItem.timestamp], text,))
+        elif text in byText:
+            byText[text].append(lyricsItem.timestamp)
+        else:
+            timestamps = [lyricsItem.timestamp]
+            byText[text] = timestamps
+            lines.append((timestamps, text,))
+    return lines
+
+
+def _ParseLength(value: str) -> int | None:
+    """Parses the value of the `[length:]` tag in the form of mm:ss or
+    mm:ss.xx and returns its total milliseconds or None if it is not
+    valid.
+    """
+    value = value.strip()
+    if '.' not in value:
+        value += '.0'
+    ms = _ParseTimeText(value, 0, len(value))
+    return None if ms is None or ms < 0 else ms
+
+
+def _RetimeMs(
+        times: array[int],
+        scale: float,
+        bias: float,
+        step: int,
+        ) -> array[int]:
+    """Returns a new array of `round(times * scale + bias)` rounded to
+    multiples of `step` and clipped to zero, computed in one pass.
+    """
+    if step > 1:
+        return array('l', [
+            max(0, round((ms * scale + bias) / step) * step)
+            for ms in times])
+    return array('l', [max(0, round(ms * scale + bias)) for ms in times])
+
+
+def _SplitLines(text: str) -> list[str]:
+    """Splits `text` into lines only at CR LF, CR, and LF like reading a
+    file in text mode. Unlike `str.splitlines`, other line boundaries
+    such as vertical tab and LINE SEPARATOR are kept in lines.
+    """
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text.split('\n')
+
+
+_TAG_NAME_REGEX = re.compile(r'\w+')
+"""Matches the name of LRC tags. This pattern is a single character
+class so it never backtracks.
+"""
+
+
+class _LrcParser:
+    """Parses the text of LRC files in a single pass. Every line is
+    scanned once and classified as a timestamp, a tag, or a bare lyrics
+    without any backtracking. After calling `Parse`, the result is
+    available through the attributes of the object.
+    """
+    def __init__(self, known_tags: Iterable[str]) -> None:
+        self._knownTags = frozenset(known_tags)
+        """The tags which are not reported as unknown tags."""
+        self.errors = LrcErrors.No_ERROR
+        """The errors encountered parsing the text."""
+        self.tags: dict[str, str | list[str]] = {}
+        """The known tags found in the text."""
+        self.unknownTags: dict[str, str | list[str]] = {}
+        """The unknown tags found in the text."""
+        self.lyrics: list[LyricsItem] = []
+        """The lyrics items found in the text."""
+        self.nDuplicates: int = 0
+        """The number of tags which exist more than once."""
+        self.nRepeated: int = 0
+        """The number of lines with repeated timestamps such as
+        `[00:12.00][01:40.50]chorus`. Such lines are expanded into
+        lyrics items sharing the same text object.
+        """
+        self._repeats: list[tuple[int, LyricsItem]] = []
+        """The extra lyrics items of lines with repeated timestamps, each
+        alongside the number of lyrics items before it in the file.
+        """
+        self._nonTagMatched = False
+        """Specifies whether a non-tag line has been seen so far."""
+    
+    def Parse(self, text: str) -> None:
+        """Parses the whole `text` of an LRC file. Each line is classified
+        as follow:
+
+        * `[mm:ss.xx]text`: a lyrics item with a timestamp.
+        * `[tag:value]`: a tag.
+        * `[]text` or a line without brackets: a lyrics item with no
+        timestamp.
+        * anything else: bad data.
+        """
+        errors = LrcErrors.No_ERROR
+        appendLyrics = self.lyrics.append
+        nonTagMatched = self._nonTagMatched
+        matchTagName = _TAG_NAME_REGEX.fullmatch
+        FromMilliseconds = Timestamp.FromMilliseconds
+        # Making read-only items for Lrc objects to share...
+        Item = _FrozenLyricsItem
+        for line in _SplitLines(text):
+            # Locating the first pair of brackets...
+            if line[:1] == '[':
+                start = 0
+            else:
+                start = line.find('[')
+                if start < 0 or ']' in line[:start]:
+                    data = line.strip()
+                    if data:
+                        errors |= LrcErrors.NO_TIMESTAMP
+                        appendLyrics(Item(data))
+                        nonTagMatched = True
+                    continue
+            end = line.find(']', start + 1)
+            if end < 0 or line.find('[', start + 1, end) >= 0:
+                # No pair of brackets, a lyrics with no timestamp...
+                errors |= LrcErrors.NO_TIMESTAMP
+                appendLyrics(Item(line.strip()))
+                nonTagMatched = True
+                continue
+            if start and line[:start].strip():
+                errors |= LrcErrors.BAD_DATA
+                continue
+            colon = line.find(':', start + 1, end)
+            if colon < 0 or colon == start + 1:
+                if end == start + 1:
+                    errors |= LrcErrors.NO_TIMESTAMP
+                    appendLyrics(Item(line[end + 1:]))
+                    nonTagMatched = True
+                else:
+                    errors |= LrcErrors.BAD_DATA
+                continue
+            # Matching against timestamp (mm:ss.xx)...
+            mm = line[start + 1:colon]
+            dot = line.find('.', colon + 1, end)
+            if dot > colon + 1 and mm.isdecimal():
+                ss = line[colon + 1:dot]
+                xx = line[dot:end]
+                if ss.isdecimal() and xx[1:].isdecimal():
+                    secs = int(ss)
+                    if secs < 60:
+                        timestamp = FromMilliseconds(
+                            (60 * int(mm) + secs) * 1_000
+                            + round(float(xx) * 1_000))
+                    else:
+                        timestamp = None
+                        errors |= LrcErrors.BAD_TIMESTAMP
+                    nonTagMatched = True
+                    if line.startswith('[', end + 1):
+                        # Probably a line with repeated timestamps...
+                        timestamps, end = self._ParseMoreTimestamps(
+                            line,
+                            end + 1)
+                        if timestamps:
+                            text = intern(line[end + 1:])
+                            timestamps.insert(0, timestamp)
+                            if None not in timestamps:
+                                # Keeping the earliest one in place...
+                                timestamps.sort()
+                            appendLyrics(Item(text, timestamps[0]))
+                            pos = len(self.lyrics)
+                            for timestamp in timestamps[1:]:
+                                self._repeats.append(
+                                    (pos, Item(text, timestamp),))
+                            self.nRepeated += 1
+                            continue
+                    text = line[end + 1:]
+                    if '<' in text:
+                        # Probably an enhanced LRC line...
+                        text, words = _ParseWordTimestamps(text)
+                        appendLyrics(Item(text, timestamp, words))
+                    else:
+                        appendLyrics(Item(text, timestamp))
+                    continue
+            # Matching agianst tag pattern...
+            if matchTagName(mm):
+                self._AddTag(mm, line[colon + 1:end])
+                if nonTagMatched:
+                    errors |= LrcErrors.BAD_LAYOUT
+            else:
+                errors |= LrcErrors.BAD_DATA
+        self._nonTagMatched = nonTagMatched
+        self.errors |= errors
+        if self._repeats:
+            self._MergeRepeats()
+    
+    def _MergeRepeats(self) -> None:
+        """Inserts the extra lyrics items of lines with repeated
+        timestamps into `lyrics`. If all timestamps are valid, every item
+        goes before the first later item of the file so that the order of
+        the other lines is kept and genuine out-of-order lines are still
+        detected. Otherwise items follow their lines.
+        """
+        lyrics = self.lyrics
+        repeats = self._repeats
+        merged: list[LyricsItem] = []
+        if self.errors & (LrcErrors.NO_TIMESTAMP | LrcErrors.BAD_TIMESTAMP):
+            start = 0
+            for pos, item in repeats:
+                merged.extend(lyrics[start:pos])
+                merged.append(item)
+                start = pos
+            merged.extend(lyrics[start:])
+        else:
+            repeats.sort(key=lambda repeat: _GetTimestampMs(repeat[1]))
+            repeatIdx = 0
+            nRepeats = len(repeats)
+            for item in lyrics:
+                while repeatIdx < nRepeats and \
+                        repeats[repeatIdx][1].timestamp < item.timestamp:
+                    merged.append(repeats[repeatIdx][1])
+                    repeatIdx += 1
+                merged.append(item)
+            merged.extend(repeat for _, repeat in repeats[repeatIdx:])
+        self.lyrics = merged
+        repeats.clear()
+    
+    def ParseHeader(self, text: str) -> bool:
+        """Parses only the tags at the beginning of `text` and stops at
+        the first lyrics line which is left unparsed, so no LyricsItem is
+        kept. It returns True if a lyrics line has been found.
+        """
+        for line in _SplitLines(text):
+            errors = self.errors
+            nRepeated = self.nRepeated
+            self.Parse(line)
+            if self._nonTagMatched:
+                # Discarding the lyrics line...
+                self.errors = errors
+                self.nRepeated = nRepeated
+                self.lyrics.clear()
+                self._nonTagMatched = False
+                return True
+        return False
+    
+    def _ParseMoreTimestamps(
+            self,
+            line: str,
+            start: int,
+            ) -> tuple[list[Timestamp | None], int]:
+        """Parses consecutive `[mm:ss.xx]` timestamps of `line` beginning
+        at `start` index and returns a 2-tuple of the parsed timestamps
+        and the index of the closing bracket of the last one. Invalid
+        timestamps are reported as `None`. If there is no timestamp at
+        `start`, the list is empty and the index is `start - 1`.
+        """
+        timestamps: list[Timestamp | None] = []
+        lastEnd = start - 1
+        while line.startswith('[', start):
+            end = line.find(']', start + 1)
+            if end < 0:
+                break
+            ms = _ParseTimeText(line, start + 1, end)
+            if ms is None:
+                break
+            if ms < 0:
+                timestamps.append(None)
+                self.errors |= LrcErrors.BAD_TIMESTAMP
+            else:
+                timestamps.append(Timestamp.FromMilliseconds(ms))
+            lastEnd = end
+            start = end + 1
+        return timestamps, lastEnd
+    
+    def _AddTag(self, tag: str, value: str) -> None:
+        """Adds the tag to either known or unknown tags and detects
+        duplicate tags.
+        """
+        if tag in self._knownTags:
+            tags = self.tags
+        else:
+            tags = self.unknownTags
+            self.errors |= LrcErrors.UNKNOWN_TAGS
+        if tag in tags:
+            self.errors |= LrcErrors.DUPLICATE_TAGS
+            prevValue = tags[tag]
+            if isinstance(prevValue, list):
+                prevValue.append(value)
+            else:
+                tags[tag] = [prevValue, value]
+                self.nDuplicates += 1
+        else:
+            tags[tag] = value
+
+
+class TimestampsValidator:
+    """Finds NO_TIMESTAMP, OUT_OF_ORDER, and DUPLICATE_TIMESTAMPS errors
+    of a sequence of timestamps. Building the validator checks the whole
+    sequence in one O(n) pass. Afterwards the sequence can be edited by
+    `Set`, `Insert`, and `Delete` methods which re-check only the
+    neighbours of the edited rows, so `errors` is always up to date
+    without re-scanning the whole sequence.
+    """
+    ERRORS = (
+        LrcErrors.NO_TIMESTAMP
+        | LrcErrors.OUT_OF_ORDER
+        | LrcErrors.DUPLICATE_TIMESTAMPS)
+    """The errors which this class looks for."""
+
+    def __init__(
+            self,
+            timestamps: Iterable[Timestamp | None] = (),
+            ) -> None:
+        self._ms: list[int] = []
+        """The milliseconds of timestamps. Missing timestamps are
+        specified by -1.
+        """
+        self._nMissing: int = 0
+        """The number of missing timestamps."""
+        self._nInversions: int = 0
+        """The number of consecutive pairs of timestamps (ignoring
+        missing ones) which are out of order.
+        """
+        self._counts: dict[int, int] = {}
+        """The number of occurrences of every timestamp."""
+        self._nExtras: int = 0
+        """The number of extra occurrences of duplicate timestamps."""
+        self.Reset(timestamps)
+    
+    @property
+    def errors(self) -> LrcErrors:
+        """Gets the timestamps errors of the current sequence."""
+        errors = LrcErrors.No_ERROR
+        if self._nMissing:
+            errors |= LrcErrors.NO_TIMESTAMP
+        if self._nInversions:
+            errors |= LrcErrors.OUT_OF_ORDER
+        if self._nExtras:
+            errors |= LrcErrors.DUPLICATE_TIMESTAMPS
+        return errors
+    
+    def Reset(self, timestamps: Iterable[Timestamp | None]) -> None:
+        """Replaces the whole sequence with `timestamps` and checks it in
+        one pass.
+        """
+        ms: list[int] = []
+        nMissing = 0
+        nInversions = 0
+        nExtras = 0
+        counts: dict[int, int] = {}
+        prev = -1
+        for timestamp in timestamps:
+            if timestamp is None:
+                ms.append(-1)
+                nMissing += 1
+                continue
+            value = timestamp._ms
+            ms.append(value)
+            if prev > value:
+                nInversions += 1
+            if value in counts:
+                counts[value] += 1
+                nExtras += 1
+            else:
+                counts[value] = 1
+            prev = value
+        self._ms = ms
+        self._nMissing = nMissing
+        self._nInversions = nInversions
+        self._nExtras = nExtras
+        self._counts = counts
+    
+    def Set(self, idx: int, timestamp: Timestamp | None) -> None:
+        """Sets the timestamp of `idx`th row and re-checks only its
+        neighbours.
+        """
+        if idx < 0:
+            idx += len(self._ms)
+        if self._ms[idx] < 0:
+            self._nMissing -= 1
+        else:
+            self._Unlink(idx)
+        if timestamp is None:
+            self._ms[idx] = -1
+            self._nMissing += 1
+        else:
+            self._ms[idx] = timestamp._ms
+            self._Link(idx)
+    
+    def Insert(self, idx: int, timestamp: Timestamp | None) -> None:
+        """Inserts a row with `timestamp` before `idx`th row."""
+        if idx < 0:
+            idx = max(0, idx + len(self._ms))
+        idx = min(idx, len(self._ms))
+        self._ms.insert(idx, -1)
+        self._nMissing += 1
+        self.Set(idx, timestamp)
+    
+    def Delete(self, idx: int) -> None:
+        """Deletes `idx`th row."""
+        if idx < 0:
+            idx += len(self._ms)
+        self.Set(idx, None)
+        del self._ms[idx]
+        self._nMissing -= 1
+    
+    def _Link(self, idx: int) -> None:
+        """Accounts for the timestamp at `idx` which has just been put in
+        the sequence.
+        """
+        ms = self._ms
+        value = ms[idx]
+        prev = self._GetPrevTimed(idx)
+        next_ = self._GetNextTimed(idx)
+        if prev >= 0 and next_ >= 0 and ms[prev] > ms[next_]:
+            self._nInversions -= 1
+        if prev >= 0 and ms[prev] > value:
+            self._nInversions += 1
+        if next_ >= 0 and value > ms[next_]:
+            self._nInversions += 1
+        count = self._counts.get(value, 0)
+        if count:
+            self._nExtras += 1
+        self._counts[value] = count + 1
+    
+    def _Unlink(self, idx: int) -> None:
+        """Accounts for the timestamp at `idx` which is about to be
+        removed from the sequence.
+        """
+        ms = self._ms
+        value = ms[idx]
+        prev = self._GetPrevTimed(idx)
+        next_ = self._GetNextTimed(idx)
+        if prev >= 0 and ms[prev] > value:
+            self._nInversions -= 1
+        if next_ >= 0 and value > ms[next_]:
+            self._nInversions -= 1
+        if prev >= 0 and next_ >= 0 and ms[prev] > ms[next_]:
+            self._nInversions += 1
+        count = self._counts[value]
+        if count > 1:
+            self._nExtras -= 1
+            self._counts[value] = count - 1
+        else:
+            del self._counts[value]
+    
+    def _GetPrevTimed(self, idx: int) -> int:
+        """Returns the index of the nearest row before `idx` which has a
+        timestamp or -1.
+        """
+        ms = self._ms
+        idx -= 1
+        while idx >= 0 and ms[idx] < 0:
+            idx -= 1
+        return idx
+    
+    def _GetNextTimed(self, idx: int) -> int:
+        """Returns the index of the nearest row after `idx` which has a
+        timestamp or -1.
+        """
+        ms = self._ms
+        idx += 1
+        while idx < len(ms):
+            if ms[idx] >= 0:
+                return idx
+            idx += 1
+        return -1
+    
+    def __len__(self) -> int:
+        return len(self._ms)
+
+
+class WordIndex:
+    """Maps playback positions to the timed words of enhanced LRC lyrics
+    in O(log n). The index is built once from a sequence of LyricsItems
+    and keeps the start times of all words in a flat sorted array.
+    """
+    def __init__(self, lyrics: Iterable[LyricsItem]) -> None:
+        entries: list[tuple[int, int, int]] = []
+        for lineIdx, lyricsItem in enumerate(lyrics):
+            words = lyricsItem.words
+            if words:
+                for wordIdx in range(len(words) >> 1):
+                    entries.append(
+                        (words[(wordIdx << 1) + 1], lineIdx, wordIdx,))
+        entries.sort()
+        self._times = array('l', [entry[0] for entry in entries])
+        """The start times of all words in milliseconds in ascending
+        order.
+        """
+        self._lines = array('l', [entry[1] for entry in entries])
+        """The line index of the word at the same index of `_times`."""
+        self._words = array('l', [entry[2] for entry in entries])
+        """The word index of the word at the same index of `_times`."""
+    
+    def Lookup(self, pos: float) -> tuple[int, int]:
+        """Returns the line index and the word index of the word being
+        sung at `pos` (in seconds) as a 2-tuple. If `pos` is before the
+        first word or the index is empty, it returns `(-1, -1)`.
+        """
+        idx = bisect_right(self._times, round(pos * 1_000)) - 1
+        if idx < 0:
+            return -1, -1
+        return self._lines[idx], self._words[idx]
+    
+    def __len__(self) -> int:
+        return len(self._times)
+
+
+_INF = float('inf')
+
+
+class LyricsTimeline:
+    """Maps playback positions to the index of the current lyrics line.
+    It keeps a cursor on the current line so during normal playback,
+    where the position either stays on the current line or moves to the
+    next one, every update is O(1). Seeks fall back to a binary search.
+    Instances of this class are not thread safe.
+    """
+    def __init__(
+            self,
+            lyrics: Iterable[LyricsItem],
+            offset: int = 0,
+            ) -> None:
+        """Builds the timeline from a sequence of LyricsItems whose
+        timestamps are in ascending order. `offset` is the value of the
+        `[offset:]` tag in milliseconds (see `Lrc.GetOffset`) which is
+        subtracted from all timestamps.
+
+        #### Exceptions:
+        * `ValueError`: some LyricsItems have no timestamp.
+        """
+        self._times = array('l')
+        """The effective start times of lyrics lines in milliseconds."""
+        for lyricsItem in lyrics:
+            if lyricsItem.timestamp is None:
+                raise ValueError('some lyrics do not have a timestamp')
+            self._times.append(lyricsItem.timestamp.ToMilliseconds())
+        if offset:
+            self._times = array('l', [ms - offset for ms in self._times])
+        self._idx: int = -1
+        """The index of the current line."""
+        self._lo: float
+        """The start time of the current line in milliseconds."""
+        self._hi: float
+        """The start time of the next line in milliseconds."""
+        self._nextChange: float | None
+        """The start time of the next line in seconds or None if the
+        current line is the last one.
+        """
+        self._MoveTo(-1)
+    
+    def _MoveTo(self, idx: int) -> None:
+        """Moves the cursor to the specified line index."""
+        self._idx = idx
+        self._lo = self._times[idx] if idx >= 0 else -_INF
+        if idx + 1 < len(self._times):
+            self._hi = self._times[idx + 1]
+            self._nextChange = self._hi / 1_000
+        else:
+            self._hi = _INF
+            self._nextChange = None
+    
+    def Update(self, pos: float) -> tuple[int, float | None]:
+        """Returns a 2-tuple of the index of the lyrics line being sung at
+        `pos` (in seconds) and the position (in seconds) at which the
+        current line will next change, or None if it is the last line.
+        The index is -1 if `pos` is before the first line.
+        """
+        ms = round(pos * 1_000)
+        if self._lo <= ms < self._hi:
+            return self._idx, self._nextChange
+        nextIdx = self._idx + 1
+        if ms >= self._hi and (
+                nextIdx + 1 >= len(self._times)
+                or ms < self._times[nextIdx + 1]):
+            # Moving to the next line in normal playback...
+            self._MoveTo(nextIdx)
+        else:
+            # Seeking...
+            self._MoveTo(bisect_right(self._times, ms) - 1)
+        return self._idx, self._nextChange
+    
+    def Reset(self) -> None:
+        """Moves the cursor before the first line."""
+        self._MoveTo(-1)
+    
+    def __len__(self) -> int:
+        return len(self._times)
+
+
+class LrcState(NamedTuple):
+    """The parsed state of an `Lrc` object which `Lrc.GetState` returns
+    and `Lrc.FromState` accepts, for example to keep it in `LrcCache`.
+    """
+    errors: LrcErrors
+    tags: Mapping[str, str | list[str]]
+    unknownTags: Mapping[str, str | list[str]]
+    lyrics: tuple[LyricsItem, ...]
+    nDuplicates: int
+    """The number of tags which exist more than once."""
+    toCollapseRepeats: bool
+    savedDigest: bytes | None
+    """The digest of the content of the LRC file when it was last loaded
+    or saved.
+    """
+    savedSignature: tuple[int, int] | None
+    """The size and modification time of the LRC file when it was last
+    loaded or saved.
+    """
+    encoding: str = 'utf-8'
+
+
 class Lrc:
     """Parses and manipulates LRC files. To load an LRC file, you must pass
     its file system address to the constructor. To get the LRC file
     associated with a file, pass that file name to the GetLrcFilename class
-    method. Instances of this class are not thread safe.
+    method. To parse LRC content already in memory, use FromBytes,
+    FromStr, or FromStream class methods. Instances of this class are not
+    thread safe.
 
     Use subscript to manipulate tags (read, set, or delete a specified tag)
     but to do operations with LyricsItems, get a snapshot from lyrics
@@ -249,6 +1388,18 @@ class Lrc:
         'by',
         're',
         've',]
+    FALLBACK_ENCODINGS: list[str] = [
+        'cp1256',
+        'cp1252',]
+    """Encodings which are tried to decode LRC files which have no byte
+    order mark and are not valid UTF-8. The text whose letters are the
+    most consistent wins; ties go to the encoding whose main script
+    appears in the text and then to the earlier encoding.
+    """
+    HEADER_PREFIX_SIZE: int = 16 * 1024
+    """The maximum number of bytes which are read from the beginning of
+    LRC files in header-only mode.
+    """
     
     @classmethod
     def GetLrcFilename(cls, filename: PathLike) -> Path:
@@ -258,6 +1409,30 @@ class Lrc:
         pth = filename if isinstance(filename, Path) else Path(filename)
         return pth.with_suffix('.lrc')
     
+    @classmethod
+    def GetLrcFilenames(cls, filename: PathLike) -> list[Path]:
+        """Returns the existing LRC files associated with 'filename'
+        parameter: the main one, as returned by GetLrcFilename, followed
+        by language-specific ones in the form of `stem.<lang>.lrc` such
+        as `song.fa.lrc` or `song.pt-BR.lrc` in alphabetical order.
+        `<lang>` must look like a language tag and `stem.<lang>` must not
+        be the stem of another audio, with the extension of 'filename'
+        or, if 'filename' is an LRC file, AUDIO_EXT, so the LRC file of
+        `song.live.mp3` is not taken for a translation of `song.mp3`.
+        """
+        from media import AUDIO_EXT
+        pth = filename if isinstance(filename, Path) else Path(filename)
+        audioExt = str(AUDIO_EXT) if pth.suffix == '.lrc' else pth.suffix
+        main = cls.GetLrcFilename(pth)
+        others: list[Path] = []
+        for other in main.parent.glob(f'{escape(main.stem)}.*.lrc'):
+            lang = other.stem[len(main.stem) + 1:]
+            if _LANG_TAG_RE.fullmatch(lang) and \
+                    not other.with_suffix(audioExt).exists():
+                others.append(other)
+        others.sort()
+        return [main, *others] if main.exists() else others
+    
     @classmethod
     def CreateLrc(cls, filename: PathLike) -> None:
         """Creates the specified empty LRC file.
@@ -282,38 +1457,230 @@ class Lrc:
         with open(filename, mode='xt') as _:
             pass
 
+    @classmethod
+    def FromBytes(
+            cls,
+            data: bytes | bytearray | memoryview,
+            filename: str | Path | None = None,
+            toSaveUnknownTags: bool = False,
+            toSaveNoTimestamps: bool = False,
+            ) -> Lrc:
+        """Parses the raw content of an LRC file from 'data' and returns
+        an Lrc object. 'data' can be any object supporting the buffer
+        protocol such as bytes, memoryview, or mmap and it is decoded
+        without being copied. 'filename', if provided, is the file
+        system address that 'Save' method writes to.
+
+        #### Exceptions:
+        * `UnicodeDecodeError`: the encoding of 'data' is not supported
+        """
+        lrc = cls.__new__(cls)
+        lrc._InitAttrs(filename, toSaveUnknownTags, toSaveNoTimestamps)
+        lrc._ParseData(data)
+        return lrc
+    
+    @classmethod
+    def FromStr(
+            cls,
+            text: str,
+            filename: str | Path | None = None,
+            toSaveUnknownTags: bool = False,
+            toSaveNoTimestamps: bool = False,
+            ) -> Lrc:
+        """Parses the decoded content of an LRC file from 'text' and
+        returns an Lrc object. 'filename', if provided, is the file
+        system address that 'Save' method writes to.
+        """
+        lrc = cls.__new__(cls)
+        lrc._InitAttrs(filename, toSaveUnknownTags, toSaveNoTimestamps)
+        lrc._ParseText(text)
+        return lrc
+    
+    @classmethod
+    def FromStream(
+            cls,
+            stream: BinaryIO,
+            filename: str | Path | None = None,
+            toSaveUnknownTags: bool = False,
+            toSaveNoTimestamps: bool = False,
+            ) -> Lrc:
+        """Parses the raw content of an LRC file from the current
+        position of the binary 'stream' to its end and returns an Lrc
+        object. The stream is not closed. 'filename', if provided, is
+        the file system address that 'Save' method writes to.
+
+        #### Exceptions:
+        * `UnicodeDecodeError`: the encoding of the content is not
+        supported
+        """
+        return cls.FromBytes(
+            stream.read(),
+            filename,
+            toSaveUnknownTags,
+            toSaveNoTimestamps)
+
+    @classmethod
+    def FromLyrics(
+            cls,
+            lyrics: Iterable[LyricsItem],
+            filename: str | Path | None = None,
+            toSaveUnknownTags: bool = False,
+            toSaveNoTimestamps: bool = False,
+            *,
+            tags: Mapping[str, str] | None = None,
+            ) -> Lrc:
+        """Creates an Lrc object from lyrics items and tags obtained from
+        another source, for example ID3 frames. Unlike setting lyrics
+        property, problems of timestamps are reported by errors property
+        rather than raised. 'filename', if provided, is the file system
+        address that 'Save' method writes to.
+        """
+        lrc = cls.__new__(cls)
+        lrc._InitAttrs(filename, toSaveUnknownTags, toSaveNoTimestamps)
+        lrc._lyrics = _Freeze(lyrics)
+        if tags:
+            for tag, value in tags.items():
+                if tag in Lrc.TAGS:
+                    lrc._tags[tag] = value
+                else:
+                    lrc._unknownTags[tag] = value
+                    lrc._errors |= LrcErrors.UNKNOWN_TAGS
+        lrc._CheckTimestamps(lrc._lyrics)
+        return lrc
+
     def __init__(
             self,
             filename: str | Path,
             toSaveUnknownTags: bool = False,
             toSaveNoTimestamps: bool = False,
+            *,
+            headerOnly: bool = False,
             ) -> None:
         """Loads the specified 'filename' as LRC file and returns an Lrc
-        object. 
+        object. To parse LRC content which is already in memory, use
+        'FromBytes', 'FromStr', or 'FromStream' class methods.
+
+        If 'headerOnly' is True, only the tags at the beginning of the
+        file, at most HEADER_PREFIX_SIZE bytes, are read and parsed. The
+        rest of the file is loaded on the first access to anything other
+        than tags, for example lyrics or errors. Until then, tags after
+        the first lyrics line are not available.
+        """
+        self._InitAttrs(filename, toSaveUnknownTags, toSaveNoTimestamps)
+        if headerOnly:
+            self._ParseHeader()
+        else:
+            self._Parse()
+    
+    def _InitAttrs(
+            self,
+            filename: str | Path | None,
+            toSaveUnknownTags: bool,
+            toSaveNoTimestamps: bool,
+            ) -> None:
+        """Initializes the attributes of a new Lrc object without
+        reading any file.
         """
         self._nDuplicates: int = 0
 
         # Initializing properties...
-        self._filename: str | Path = filename
+        self._filename: str | Path | None = filename
         self._errors = LrcErrors.No_ERROR
         self._tags: dict[str, str | list[str]] = {}
         self._unknownTags: dict[str, str | list[str]] = {}
-        self._lyrics: list[LyricsItem] = []
+        self._lyrics: tuple[LyricsItem, ...] = ()
+        self._tagsShared: bool = False
+        """Specifies whether `_tags` has been handed out as a snapshot
+        and must be copied before any modification.
+        """
+        self._unknownTagsShared: bool = False
+        """Specifies whether `_unknownTags` has been handed out as a
+        snapshot and must be copied before any modification.
+        """
         self._changed: bool = False
+        self._headerOnly: bool = False
+        """Specifies whether only the header of the LRC file has been
+        loaded so far.
+        """
+        self._encoding: str = 'utf-8'
+        """The encoding of the LRC file which is also used to save it."""
 
         # Initializing attributes...
         self._toSaveUnknownTags: bool
         self.toSaveUnknownTags = toSaveUnknownTags
         self._toSaveNoTimestamps: bool
         self.toSaveNoTimestamps = toSaveNoTimestamps
-
-        self._Parse()
+        self._toCollapseRepeats: bool = False
+        self._wordIndex: WordIndex | None = None
+        self._savedDigest: bytes | None = None
+        """The digest of the content of the LRC file when it was last
+        loaded or saved.
+        """
+        self._savedSignature: tuple[int, int] | None = None
+        """The size and modification time of the LRC file when it was
+        last loaded or saved.
+        """
     
+    @classmethod
+    def FromState(
+            cls,
+            filename: str | Path,
+            toSaveUnknownTags: bool,
+            toSaveNoTimestamps: bool,
+            state: LrcState,
+            ) -> Lrc:
+        """Creates an Lrc object from an already parsed state, for
+        example from `LrcCache` or `GetState`, without reading or parsing
+        the file. Lyrics items and tags provided as dictionaries are
+        owned by the new object afterwards; other mappings are copied.
+        """
+        lrc = cls.__new__(cls)
+        lrc._InitAttrs(filename, toSaveUnknownTags, toSaveNoTimestamps)
+        lrc._errors = state.errors
+        lrc._tags = state.tags if type(state.tags) is dict \
+            else _CopyTags(state.tags)
+        lrc._unknownTags = state.unknownTags \
+            if type(state.unknownTags) is dict \
+            else _CopyTags(state.unknownTags)
+        lrc._lyrics = _Freeze(state.lyrics, False)
+        lrc._nDuplicates = state.nDuplicates
+        lrc._toCollapseRepeats = state.toCollapseRepeats
+        lrc._savedDigest = state.savedDigest
+        lrc._savedSignature = state.savedSignature
+        lrc._encoding = state.encoding
+        return lrc
+
+    def GetState(self) -> LrcState:
+        """Returns the parsed state of this object. Like the properties
+        of this object, it shares the underlying storage which is copied
+        only when this object is modified afterwards.
+        """
+        self._LoadBody()
+        return LrcState(
+            self._errors,
+            self.tags,
+            self.unknownTags,
+            self._lyrics,
+            self._nDuplicates,
+            self._toCollapseRepeats,
+            self._savedDigest,
+            self._savedSignature,
+            self._encoding)
+
     @property
-    def filename(self) -> str | Path:
-        """Gets the filename (file system address) of this Lrc object."""
+    def filename(self) -> str | Path | None:
+        """Gets the filename (file system address) of this Lrc object or
+        None if it has been parsed from memory without a filename.
+        """
         return self._filename
     
+    @property
+    def savedDigest(self) -> bytes | None:
+        """Gets the digest of the content of the LRC file when it was
+        last loaded or saved, or None if it has been neither.
+        """
+        return self._savedDigest
+
     @property
     def toSaveUnknownTags(self) -> bool:
         """Gets or sets a boolean value indicating unknown tags must be
@@ -341,27 +1708,57 @@ class Lrc:
         self._toSaveNoTimestamps = __snt
     
     @property
-    def tags(self) -> dict[str, str | list[str]]:
-        """Gets a dictinary containing all tags of this object. Every tag
-        correspond to a string (tag value) or a list of string (in the case
-        of LrcErrors.DUPLICATE_TAGS error). This is a copy of the underlying
-        attribute.
+    def toCollapseRepeats(self) -> bool:
+        """Gets or sets a boolean value indicating LyricsItems with the
+        same text must be saved in one line with repeated timestamps such
+        as `[00:12.00][01:40.50]chorus` via 'Save' method. It is set to
+        True if the loaded LRC file has such lines.
         """
-        return deepcopy(self._tags)
+        self._LoadBody()
+        return self._toCollapseRepeats
+
+    @toCollapseRepeats.setter
+    def toCollapseRepeats(self, __tcr: bool, /) -> None:
+        if not isinstance(__tcr, bool):
+            raise TypeError("'toCollapseRepeats' must be boolean")
+        self._LoadBody()
+        self._toCollapseRepeats = __tcr
     
     @property
-    def unknownTags(self) -> dict[str, str | list[str]]:
-        """Gets a dictinary containing all unknown tags of this object.
+    def tags(self) -> Mapping[str, str | list[str]]:
+        """Gets a read-only mapping containing all tags of this object.
         Every tag correspond to a string (tag value) or a list of string
-        (in the case of LrcErrors.DUPLICATE_TAGS error).  This is a copy of
-        the underlying attribute.
+        (in the case of LrcErrors.DUPLICATE_TAGS error). This is a
+        snapshot sharing the underlying storage which is copied only when
+        this object is modified afterwards.
+        """
+        self._tagsShared = True
+        return MappingProxyType(self._tags)
+    
+    @property
+    def unknownTags(self) -> Mapping[str, str | list[str]]:
+        """Gets a read-only mapping containing all unknown tags of this
+        object. Every tag correspond to a string (tag value) or a list of
+        string (in the case of LrcErrors.DUPLICATE_TAGS error). This is a
+        snapshot sharing the underlying storage which is copied only when
+        this object is modified afterwards.
         """
-        return deepcopy(self._unknownTags)
+        self._unknownTagsShared = True
+        return MappingProxyType(self._unknownTags)
     
     @property
     def errors(self) -> LrcErrors:
+        self._LoadBody()
         return self._errors
     
+    @property
+    def encoding(self) -> str:
+        """Gets the encoding of the LRC file which is detected while
+        loading it and is used to save it. It is 'utf-8' for objects not
+        parsed from raw content.
+        """
+        return self._encoding
+    
     @property
     def changed(self) -> bool:
         """Gets a boolean value specifying whether this object has been
@@ -370,21 +1767,36 @@ class Lrc:
         return self._changed
     
     @property
-    def lyrics(self) -> list[LyricsItem]:
-        """Gets or sets lyrics items of this Lrc object. It returns a copy
-        of the list of LyricsItems of this Lrc object. To change LyricsItems
-        of this object, first get a copy by this property, apply changes you
-        want and set it to this property.
+    def isHeaderOnly(self) -> bool:
+        """Gets a boolean value specifying whether only the header of the
+        LRC file has been loaded so far. See 'headerOnly' parameter of
+        the constructor.
+        """
+        return self._headerOnly
+    
+    @property
+    def lyrics(self) -> tuple[LyricsItem, ...]:
+        """Gets or sets lyrics items of this Lrc object. It returns an
+        immutable snapshot (a tuple) sharing the read-only LyricsItems of
+        this Lrc object, so reading this property does not copy anything
+        and changing the items raises AttributeError or TypeError. To
+        change LyricsItems of this object, get editable copies by the
+        `Copy` method of the items, apply changes you want and set them
+        to this property. Setting copies the provided items, so later
+        changes to them do not affect this object.
         
         Exceptions:
         ⬤ TypeError: The r-value is not a list of LyricsItems.
         ⬤ ValueError: Some timestamps in r-value are either unspecified or
         duplicate or out of order.
         """
-        return deepcopy(self._lyrics)
+        self._LoadBody()
+        return self._lyrics
     
     @lyrics.setter
-    def lyrics(self, lrcs: list[LyricsItem]) -> None:
+    def lyrics(self, lrcs: Iterable[LyricsItem]) -> None:
+        self._LoadBody()
+        lrcs = _Freeze(lrcs)
         # Backing up the errors...
         backup: LrcErrors = self._errors
         # Checking lrcs data accuracy...
@@ -413,6 +1825,7 @@ class Lrc:
                 "Timestamps must be specified, unique, and in order")
         # Setting lyrics...
         self._lyrics = lrcs
+        self._wordIndex = None
         self._changed = True
 
     def _Parse(self) -> None:
@@ -421,145 +1834,257 @@ class Lrc:
             # No file system address is provided, Doing nothing...
             return
 
-        BRAC_REGEX = r'''
-            ^(?P<prefix>[^\[\]]*)
-            \[
-            (?P<inside>[^\[\]]*)
-            \]
-            (?P<suffix>.*)'''
-        TIME_REGEX = r'^(?P<mm>\d+):(?P<ss>\d+)(?P<xx>\.\d+)$'
-        TAG_REGEX = r'^(?P<tag>\w+):(?P<value>.*)$'
-        bracPattern = re.compile(BRAC_REGEX, re.VERBOSE)
-        timePattern = re.compile(TIME_REGEX)
-        tagPattern = re.compile(TAG_REGEX)
-
         # Reading the content of the LRC file...
-        with open(self._filename, mode='rt', encoding='utf-8') as lrcFile:
-            lines = lrcFile.readlines()
-        
-        nonTagMatched = False
-        for line in lines:
-            bracMatch = bracPattern.match(line)
-            if not bracMatch:
-                data = line.strip()
-                if data:
-                    self._errors |= LrcErrors.NO_TIMESTAMP
-                    self._lyrics.append(LyricsItem(line.strip()))
-                    nonTagMatched = True
-            else:
-                prefix = bracMatch['prefix'].strip()
-                if prefix:
-                    self._errors |= LrcErrors.BAD_DATA
-                else:
-                    inside = bracMatch['inside']
-                    # Matching against timestamp (mm:ss.xx)...
-                    timeMatch = timePattern.match(inside)
-                    if timeMatch:
-                        try:
-                            timestamp = Timestamp(
-                                minutes=int(timeMatch['mm']),
-                                seconds=int(timeMatch['ss']),
-                                milliseconds=float(timeMatch['xx']))
-                        except ValueError:
-                            timestamp = None
-                            self._errors |= LrcErrors.BAD_TIMESTAMP
-                        self._lyrics.append(LyricsItem(
-                            timestamp=timestamp,
-                            text=bracMatch['suffix']))
-                        nonTagMatched = True
-                    else:
-                        # Matching agianst tag pattern...
-                        tagMatch = tagPattern.match(inside)
-                        if tagMatch:
-                            tag = tagMatch['tag']
-                            if tag not in Lrc.TAGS:
-                                self._errors |= LrcErrors.UNKNOWN_TAGS
-                                if tag in self._unknownTags:
-                                    try:
-                                        self._unknownTags[tag].append(
-                                            tagMatch['value'])
-                                    except AttributeError:
-                                        self._unknownTags[tag] = [
-                                            self._unknownTags[tag],
-                                            tagMatch['value']]
-                                        self._nDuplicates += 1
-                                    self._errors |= LrcErrors.DUPLICATE_TAGS
-                                else:
-                                    self._unknownTags[tag] = tagMatch['value']
-                            elif tag in self._tags:
-                                self._errors |= LrcErrors.DUPLICATE_TAGS
-                                try:
-                                    self._tags.append(tagMatch['value'])
-                                except AttributeError:
-                                    self._tags[tag] = [
-                                            self._tags[tag],
-                                            tagMatch['value']]
-                            else:
-                                self._tags[tag] = tagMatch['value']
-                            if nonTagMatched:
-                                self._errors |= LrcErrors.BAD_LAYOUT
-                        elif not inside:
-                            self._errors |= LrcErrors.NO_TIMESTAMP
-                            self._lyrics.append(LyricsItem(
-                                text=bracMatch['suffix']))
-                            nonTagMatched = True
-                        else:
-                            self._errors |= LrcErrors.BAD_DATA
+        with open(self._filename, mode='rb') as lrcFile:
+            data = lrcFile.read()
+            self._savedSignature = _GetFileSignature(lrcFile.fileno())
+        self._ParseData(data)
+    
+    def _ParseHeader(self) -> None:
+        """Parses only the tags at the beginning of the file and marks
+        this object as header-only.
+        """
+        with open(self._filename, mode='rb') as lrcFile:
+            data = lrcFile.read(Lrc.HEADER_PREFIX_SIZE)
+        isComplete = len(data) < Lrc.HEADER_PREFIX_SIZE
+        text, self._encoding = _DecodeLrcData(
+            data,
+            Lrc.FALLBACK_ENCODINGS,
+            isComplete)
+        if not isComplete:
+            # Dropping the last line which might be incomplete...
+            text = text[:max(text.rfind('\n'), text.rfind('\r')) + 1]
+        parser = _LrcParser(Lrc.TAGS)
+        parser.ParseHeader(text)
+        self._tags = parser.tags
+        self._unknownTags = parser.unknownTags
+        self._errors = parser.errors
+        self._nDuplicates = parser.nDuplicates
+        self._headerOnly = True
+    
+    def _LoadBody(self) -> None:
+        """Loads the whole file if this object is header-only."""
+        if self._headerOnly:
+            self._headerOnly = False
+            self._errors = LrcErrors.No_ERROR
+            self._tagsShared = False
+            self._unknownTagsShared = False
+            self._Parse()
+    
+    def _ParseData(self, data: bytes | bytearray | memoryview) -> None:
+        """Parses the raw content of an LRC file, which can be any object
+        supporting the buffer protocol, and initializes the attributes.
+        The encoding of the content is detected and kept for saving.
+        """
+        self._savedDigest = _GetDigest(data)
+        text, self._encoding = _DecodeLrcData(data, Lrc.FALLBACK_ENCODINGS)
+        self._ParseText(text)
+    
+    def _ParseText(self, text: str) -> None:
+        """Parses the decoded content of an LRC file and initializes the
+        attributes.
+        """
+        parser = _LrcParser(Lrc.TAGS)
+        parser.Parse(text)
+        self._tags = parser.tags
+        self._unknownTags = parser.unknownTags
+        self._lyrics = tuple(parser.lyrics)
+        self._errors |= parser.errors
+        self._nDuplicates = parser.nDuplicates
+        self._toCollapseRepeats = parser.nRepeated > 0
         
         # Looking for timestamps errors...
         self._CheckTimestamps(self._lyrics)
     
-    def _CheckTimestamps(self, lrcs: list[LyricsItem]) -> None:
+    def _OwnTags(self) -> dict[str, str | list[str]]:
+        """Returns the tags dictionary ready for modification. If it has
+        been shared as a snapshot, it is copied first.
+        """
+        if self._tagsShared:
+            self._tags = _CopyTags(self._tags)
+            self._tagsShared = False
+        return self._tags
+    
+    def _OwnUnknownTags(self) -> dict[str, str | list[str]]:
+        """Returns the unknown tags dictionary ready for modification. If
+        it has been shared as a snapshot, it is copied first.
+        """
+        if self._unknownTagsShared:
+            self._unknownTags = _CopyTags(self._unknownTags)
+            self._unknownTagsShared = False
+        return self._unknownTags
+    
+    def _CheckTimestamps(self, lrcs: Sequence[LyricsItem]) -> None:
         """Checks a list of LyricsItems for NO_TIMESTAMP, OUT_OF_ORDER,
-        and DUPLICATE_TIMESTAMPS errors.
+        and DUPLICATE_TIMESTAMPS errors in one pass.
         """
-        lrcs_ = [
+        validator = TimestampsValidator(
             lrcItem.timestamp
-            for lrcItem in lrcs
-            if lrcItem.timestamp is not None]
-        # Looking for NO_TIMESTAMP...
-        if len(lrcs_) < len(lrcs):
-            self._errors |= LrcErrors.NO_TIMESTAMP
-        else:
-            self._errors &= (~LrcErrors.NO_TIMESTAMP)
-        # Looking for OUT_OF_ORDER...
-        idx = 0
-        while True:
-            try:
-                if lrcs_[idx] > lrcs_[idx + 1]:
-                    self._errors |= LrcErrors.OUT_OF_ORDER
-                    break
-                idx += 1
-            except IndexError:
-                self._errors &= (~LrcErrors.OUT_OF_ORDER)
-                break
-        # Looking for DUPLICATE_TIMESTAMPS...
-        lrcs_.sort()
-        idx = 0
-        while True:
-            try:
-                if lrcs_[idx] == lrcs_[idx + 1]:
-                    self._errors |= LrcErrors.DUPLICATE_TIMESTAMPS
-                    break
-                idx += 1
-            except IndexError:
-                self._errors &= (~LrcErrors.DUPLICATE_TIMESTAMPS)
-                break
+            for lrcItem in lrcs)
+        self._errors = (
+            self._errors & ~TimestampsValidator.ERRORS
+            | validator.errors)
     
     def AreTimstampsOk(self) -> bool:
         """Specifies whether timestamps are Ok and there is no error
         associated with them.
         """
+        self._LoadBody()
         return not(
             self._errors & LrcErrors.NO_TIMESTAMP
             | self._errors & LrcErrors.BAD_TIMESTAMP
             | self._errors & LrcErrors.DUPLICATE_TIMESTAMPS
             | self._errors & LrcErrors.OUT_OF_ORDER)
     
+    def GetWordIndex(self) -> WordIndex:
+        """Returns the word-level timing index of the enhanced LRC lyrics
+        of this object. The index is built on the first call and reused
+        until the lyrics change.
+        """
+        self._LoadBody()
+        if self._wordIndex is None:
+            self._wordIndex = WordIndex(self._lyrics)
+        return self._wordIndex
+    
+    def GetOffset(self) -> int:
+        """Returns the value of the `[offset:]` tag in milliseconds. A
+        positive offset makes lyrics appear sooner, so the effective time
+        of every timestamp is `timestamp - offset`. If the tag does not
+        exist or is not an integer, it returns 0.
+        """
+        value = self._tags.get('offset', '')
+        if not isinstance(value, str):
+            value = value[-1]
+        try:
+            return int(value.strip())
+        except ValueError:
+            return 0
+    
+    def GetLength(self) -> int | None:
+        """Returns the value of the `[length:]` tag in milliseconds. If
+        the tag does not exist or is not in the form of mm:ss or
+        mm:ss.xx, it returns None.
+        """
+        value = self._tags.get('length', '')
+        if not isinstance(value, str):
+            value = value[-1]
+        return _ParseLength(value)
+    
+    def Retimed(
+            self,
+            *,
+            bakeOffset: bool = False,
+            shift: int = 0,
+            start: int = 0,
+            stop: int | None = None,
+            duration: float | None = None,
+            oldDuration: float | None = None,
+            step: int = 1,
+            ) -> Lrc:
+        """Returns a new Lrc object with the timeline of this object
+        transformed in one pass over arrays of integer milliseconds. Word
+        timestamps of enhanced LRC lines are transformed alike. This
+        object is not modified. The transforms are applied in this
+        order:
+
+        1. `bakeOffset`: subtracts the `[offset:]` tag from all timestamps
+        and removes the tag.
+        2. `shift`: adds `shift` milliseconds to the lines in the range
+        of `[start, stop)` indices.
+        3. `duration`: linearly rescales the timeline from `oldDuration`
+        to `duration`, both in seconds such as `AbstractMp3.Duration`.
+        `oldDuration` defaults to the `[length:]` tag which is updated
+        to the new duration.
+        4. `step`: rounds timestamps to multiples of `step` milliseconds.
+
+        Negative results are clipped to zero. Timestamp errors of the new
+        object are checked again because shifting a range can put
+        timestamps out of order.
+
+        #### Exceptions:
+        * `ValueError`: some lyrics do not have a timestamp, or
+        `oldDuration` is not provided and the `[length:]` tag is not
+        available, or durations or `step` are not positive.
+        """
+        self._LoadBody()
+        if any(item.timestamp is None for item in self._lyrics):
+            raise ValueError('some lyrics do not have a timestamp')
+        if step < 1:
+            raise ValueError("'step' must be positive")
+        tags = _CopyTags(self._tags)
+        offset = 0
+        if bakeOffset:
+            offset = self.GetOffset()
+            tags.pop('offset', None)
+        scale = 1.0
+        if duration is not None:
+            if oldDuration is None:
+                lengthMs = self.GetLength()
+                if lengthMs is None:
+                    raise ValueError(
+                        "'oldDuration' is required without a valid "
+                        "'length' tag")
+                oldDuration = lengthMs / 1_000
+            if duration <= 0 or oldDuration <= 0:
+                raise ValueError('durations must be positive')
+            scale = duration / oldDuration
+            if 'length' in tags:
+                mm, ss = divmod(round(duration), 60)
+                tags['length'] = f'{mm:02}:{ss:02}'
+        # Gathering the timeline into flat arrays...
+        nLyrics = len(self._lyrics)
+        start, stop, _ = slice(start, stop).indices(nLyrics)
+        times = array('l', [
+            item.timestamp.ToMilliseconds()
+            for item in self._lyrics])
+        bias = -offset * scale
+        shiftedBias = (shift - offset) * scale
+        newTimes = _RetimeMs(times[:start], scale, bias, step)
+        newTimes.extend(_RetimeMs(
+            times[start:stop],
+            scale,
+            shiftedBias,
+            step))
+        newTimes.extend(_RetimeMs(times[stop:], scale, bias, step))
+        # Building the new lyrics items...
+        FromMilliseconds = Timestamp.FromMilliseconds
+        lyrics: list[LyricsItem] = []
+        for idx, item in enumerate(self._lyrics):
+            words = item.words
+            if words:
+                words = array('l', words)
+                words[1::2] = _RetimeMs(
+                    words[1::2],
+                    scale,
+                    shiftedBias if start <= idx < stop else bias,
+                    step)
+            lyrics.append(_FrozenLyricsItem(
+                item.text,
+                FromMilliseconds(newTimes[idx]),
+                words))
+        lrc = Lrc.FromState(
+            self._filename,
+            self._toSaveUnknownTags,
+            self._toSaveNoTimestamps,
+            LrcState(
+                self._errors,
+                tags,
+                _CopyTags(self._unknownTags),
+                tuple(lyrics),
+                self._nDuplicates,
+                self._toCollapseRepeats,
+                self._savedDigest,
+                self._savedSignature,
+                self._encoding))
+        lrc._CheckTimestamps(lrc._lyrics)
+        lrc._changed = True
+        return lrc
+    
     def GetErrors(self) -> list[str]:
         """Returns a list of errors encountered parsing the LRC file. If
         no error was found, it returns an empty list.
         """
+        self._LoadBody()
         errors: list[str] = []
         ERRORS: list[LrcErrors] = list(LrcErrors)[1:]
         for flag in ERRORS:
@@ -567,52 +2092,150 @@ class Lrc:
                 errors.append(_lrcErrorMessages[flag])
         return errors
 
-    def Save(self) -> None:
-        """Saves this object to the filename and sets changed property to
-        False. It also resolves BAD_DATA, BAD_LAYOUT, and DUPLICATE_TAGS if
-        there are, and hence removes their flags. Before calling this API,
-        it is possible to change toSaveUnknownTags attribute.
+    def Normalize(self) -> None:
+        """Puts tags in a canonical form: known tags in the order of TAGS
+        followed by unknown tags in alphabetical order, keeping the last
+        value of duplicate tags. It clears DUPLICATE_TAGS flag and sets
+        changed property if anything changes.
+        """
+        self._LoadBody()
+        order = {tag: idx for idx, tag in enumerate(Lrc.TAGS)}
+        tags = {
+            tag: value if isinstance(value, str) else value[-1]
+            for tag, value in sorted(
+                self._tags.items(),
+                key=lambda item: order[item[0]])}
+        unknownTags = {
+            tag: value if isinstance(value, str) else value[-1]
+            for tag, value in sorted(self._unknownTags.items())}
+        if list(tags.items()) != list(self._tags.items()):
+            self._tags = tags
+            self._tagsShared = False
+            self._changed = True
+        if list(unknownTags.items()) != list(self._unknownTags.items()):
+            self._unknownTags = unknownTags
+            self._unknownTagsShared = False
+            self._changed = True
+        self._nDuplicates = 0
+        self._errors &= (~LrcErrors.DUPLICATE_TAGS)
+    
+    def ToBytes(self) -> bytes:
+        """Returns the raw content of this object as 'Save' method would
+        write it, without writing anything or changing this object.
+        """
+        self._LoadBody()
+        return self._Serialize()[0]
+    
+    def NeedsSaving(self) -> bool:
+        """Returns True if 'Save' method would write the file, that is
+        the content differs from what was last loaded or saved, the file
+        has changed since, or this object has not been loaded from or
+        saved to its file. The file is not read.
+        """
+        self._LoadBody()
+        return self._NeedsWriting(_GetDigest(self._Serialize()[0]))
+    
+    def _NeedsWriting(self, digest: bytes) -> bool:
+        """Returns True if the content with the specified digest must be
+        written to the file.
+        """
+        return digest != self._savedDigest or \
+            self._savedSignature is None or \
+            _GetFileSignature(self._filename) != self._savedSignature
+    
+    def _Serialize(self) -> tuple[bytes, str]:
+        """Builds the raw content of this object and returns a 2-tuple of
+        the content and its encoding. The encoding is that of the LRC
+        file unless it cannot represent the content in which case it is
+        UTF-8.
         """
-        with open(self._filename, mode='wt', encoding='utf-8') as lrcFile:
-            # Writing tags to the file...
-            for tag, value in self._tags.items():
+        lines: list[str] = []
+        # Adding tags to the content...
+        for tag, value in self._tags.items():
+            if isinstance(value, str):
+                lines.append(f'[{tag}:{value}]\n')
+            else:
+                lines.append(f'[{tag}:{value[-1]}]\n')
+        nAllTags = len(self._tags)
+
+        # Adding unknown tags to the content...
+        if self.toSaveUnknownTags and self._unknownTags:
+            for tag, value in self._unknownTags.items():
                 if isinstance(value, str):
-                    lrcFile.write(f'[{tag}:{value}]\n')
+                    lines.append(f'[{tag}:{value}]\n')
                 else:
-                    lrcFile.write(f'[{tag}:{value[-1]}]\n')
-            nAllTags = len(self._tags)
-
-            # Writing unknown tags to the file...
-            if self.toSaveUnknownTags and self._unknownTags:
-                for tag, value in self._unknownTags.items():
-                    if isinstance(value, str):
-                        lrcFile.write(f'[{tag}:{value}]\n')
-                    else:
-                        lrcFile.write(f'[{tag}:{value[-1]}]\n')
-                nAllTags += len(self._unknownTags)
-                self._errors |= LrcErrors.UNKNOWN_TAGS
-            else:
-                # Removing UNKNOWN_TAGS flag...
-                self._errors &= (~LrcErrors.UNKNOWN_TAGS)
-            
-            # Printing an empty line between tags & lyrics...
-            if nAllTags:
-                lrcFile.write('\n')
-
-            # Writing lyrics to the file...
+                    lines.append(f'[{tag}:{value[-1]}]\n')
+            nAllTags += len(self._unknownTags)
+        
+        # Adding an empty line between tags & lyrics...
+        if nAllTags:
+            lines.append('\n')
+
+        # Adding lyrics to the content...
+        if self._toCollapseRepeats:
+            for timestamps, text in _CollapseRepeats(self._lyrics):
+                lines.append(''.join(
+                    '[]' if timestamp is None else f'[{timestamp}]'
+                    for timestamp in timestamps))
+                lines.append(f'{text}\n')
+        else:
             for lyricsItem in self._lyrics:
                 if lyricsItem.timestamp is None:
                     timestamp = ''
                 else:
                     timestamp = lyricsItem.timestamp
-                lrcFile.write(
-                    f'[{str(timestamp)}]{lyricsItem.text}\n')
+                lines.append(
+                    f'[{str(timestamp)}]{lyricsItem.GetEnhancedText()}\n')
+        
+        content = ''.join(lines)
+        try:
+            return content.encode(encoding=self._encoding), self._encoding
+        except UnicodeEncodeError:
+            # The legacy encoding cannot represent the content, switching
+            # to UTF-8...
+            return content.encode(encoding='utf-8'), 'utf-8'
+    
+    def Save(self) -> bool:
+        """Saves this object to the filename and sets changed property to
+        False. It also resolves BAD_DATA, BAD_LAYOUT, and DUPLICATE_TAGS if
+        there are, and hence removes their flags. Before calling this API,
+        it is possible to change toSaveUnknownTags attribute.
+
+        The whole content is built in memory and written to a temporary
+        file which then replaces the LRC file, so a crash never leaves a
+        truncated file. If the content is identical to what was last
+        loaded or saved and the file has not changed since, the file is
+        not touched at all. Objects which have not been loaded from or
+        saved to their file, for example by `FromBytes`, always write. It
+        returns True if the file has been written.
+
+        #### Exceptions:
+        * `ValueError`: this object has no file system address
+        """
+        if self._filename is None:
+            raise ValueError('this Lrc object has no filename to save to')
+        self._LoadBody()
+        data, self._encoding = self._Serialize()
+        if self.toSaveUnknownTags and self._unknownTags:
+            self._errors |= LrcErrors.UNKNOWN_TAGS
+        else:
+            # Removing UNKNOWN_TAGS flag...
+            self._errors &= (~LrcErrors.UNKNOWN_TAGS)
+        digest = _GetDigest(data)
+        written = False
+        if self._NeedsWriting(digest):
+            # Writing the content to the file...
+            _WriteAtomically(self._filename, data)
+            self._savedDigest = digest
+            self._savedSignature = _GetFileSignature(self._filename)
+            written = True
 
         # Removing some flags...
         self._changed = False
         self._errors &= (~LrcErrors.BAD_DATA)
         self._errors &= (~LrcErrors.BAD_LAYOUT)
         self._errors &= (~LrcErrors.DUPLICATE_TAGS)
+        return written
     
     @overload
     def __getitem__(self, __tag: str, /) -> str | list[str]:
@@ -652,6 +2275,7 @@ class Lrc:
             allTags = {**self._tags, **self._unknownTags}
             return allTags[__value]
         elif isinstance(__value, int):
+            self._LoadBody()
             return self._lyrics[__value]
         else:
             raise TypeError(
@@ -666,40 +2290,44 @@ class Lrc:
         if not isinstance(__text, str):
             raise TypeError(
                 "Only strings are allowed to be assigned to subscript")
+        self._LoadBody()
         if __tag in Lrc.TAGS:
             try:
                 if __text != self._tags[__tag]:
                     self._changed = True
             except Exception:
                 self._changed = True
-            self._tags[__tag] = __text
+            self._OwnTags()[__tag] = __text
         else:
             try:
                 if __text != self._unknownTags[__tag]:
                     self._changed = True
             except Exception:
                 self._changed = True
-            self._unknownTags[__tag] = __text
+            self._OwnUnknownTags()[__tag] = __text
             self._errors |= LrcErrors.UNKNOWN_TAGS
     
     def __delitem__(self, __value: str | int) -> None:
         """Deletes the specified tag or index at lyrics property."""
+        self._LoadBody()
         if isinstance(__value, str):
-            try:
-                del self._tags[__value]
+            if __value in self._tags:
+                del self._OwnTags()[__value]
                 self._changed = True
-            except KeyError:
-                try:
-                    del self._unknownTags[__value]
-                    self._changed = True
-                    if not self._unknownTags:
-                        self._errors &= (~LrcErrors.UNKNOWN_TAGS)
-                except KeyError:
-                    raise KeyError(
-                        f"'{__value}' does not exist"
-                        + " in tags nor unknown tags.")
+            elif __value in self._unknownTags:
+                del self._OwnUnknownTags()[__value]
+                self._changed = True
+                if not self._unknownTags:
+                    self._errors &= (~LrcErrors.UNKNOWN_TAGS)
+            else:
+                raise KeyError(
+                    f"'{__value}' does not exist"
+                    + " in tags nor unknown tags.")
         elif isinstance(__value, int):
-            del self._lyrics[__value]
+            lyrics = list(self._lyrics)
+            del lyrics[__value]
+            self._lyrics = tuple(lyrics)
+            self._wordIndex = None
             self._changed = True
         else:
             raise TypeError(
@@ -716,20 +2344,27 @@ class Lrc:
             raise TypeError("'tag' must be a string")
         if not isinstance(idx, int):
             raise TypeError("'idx' must be an integer")
-        allTags = {**self._tags, **self._unknownTags}
-        if tag in allTags:
-            if isinstance(allTags, str):
-                raise ValueError("'tag' is not duplicate")
-            del allTags[tag][idx]
-            if len(allTags[tag]) == 1:
-                allTags[tag] = allTags[tag][0]
-                self._nDuplicates -= 1
-                if self._nDuplicates == 0:
-                    self._errors &= (~LrcErrors.DUPLICATE_TAGS)
+        self._LoadBody()
+        if tag in self._tags:
+            tags = self._tags
+        elif tag in self._unknownTags:
+            tags = self._unknownTags
         else:
             raise ValueError("'tag' is not available")
+        if isinstance(tags[tag], str):
+            raise ValueError("'tag' is not duplicate")
+        tags = self._OwnTags() if tags is self._tags \
+            else self._OwnUnknownTags()
+        del tags[tag][idx]
+        self._changed = True
+        if len(tags[tag]) == 1:
+            tags[tag] = tags[tag][0]
+            self._nDuplicates -= 1
+            if self._nDuplicates == 0:
+                self._errors &= (~LrcErrors.DUPLICATE_TAGS)
     
     def __repr__(self) -> str:
+        self._LoadBody()
         return (
             f'{super().__repr__()}'
             + f'\nFile name: {self._filename}'
@@ -737,3 +2372,186 @@ class Lrc:
             + f'\nTags: {self._tags}'
             + f'\nUnknown tags: {self._unknownTags}'
             + f'\nLyrics: {self._lyrics}')
+
+
+def RetimeAlbum(
+        lrcs: Iterable[Lrc],
+        durations: Iterable[float | None] | None = None,
+        **kwargs,
+        ) -> list[Lrc]:
+    """Applies `Lrc.Retimed` to all Lrc objects of an album and returns
+    the list of new objects. If `durations` is provided, it must be the
+    durations of the tracks in the same order as `lrcs` and each one is
+    passed as `duration` to `Lrc.Retimed`. Other keyword arguments are
+    passed to `Lrc.Retimed` for all objects.
+    """
+    if durations is None:
+        return [lrc.Retimed(**kwargs) for lrc in lrcs]
+    return [
+        lrc.Retimed(duration=duration, **kwargs)
+        for lrc, duration in zip(lrcs, durations, strict=True)]
+
+
+_NON_WORD_REGEX = re.compile(r'[^\w\s]+')
+
+
+def _NormalizeText(text: str) -> str:
+    """Normalizes the text of lyrics for alignment by case folding,
+    removing punctuation, and collapsing white spaces.
+    """
+    return ' '.join(_NON_WORD_REGEX.sub('', text.casefold()).split())
+
+
+def _AlignTexts(
+        source: Sequence[str],
+        target: Sequence[str],
+        ) -> list[tuple[int, int]]:
+    """Aligns two sequences of normalized texts and returns the list of
+    matched pairs of (source index, target index) in ascending order.
+    The common prefix and suffix are matched in linear time and only the
+    remaining middle part is passed to `SequenceMatcher`, so near
+    identical inputs are aligned in near-linear time.
+    """
+    nSource = len(source)
+    nTarget = len(target)
+    # Matching the common prefix...
+    head = 0
+    limit = min(nSource, nTarget)
+    while head < limit and source[head] == target[head]:
+        head += 1
+    # Matching the common suffix...
+    tail = 0
+    limit -= head
+    while tail < limit and \
+            source[nSource - 1 - tail] == target[nTarget - 1 - tail]:
+        tail += 1
+    pairs = [(idx, idx,) for idx in range(head)]
+    # Aligning the middle part...
+    matcher = SequenceMatcher(
+        None,
+        source[head:nSource - tail],
+        target[head:nTarget - tail],
+        autojunk=False)
+    for srcIdx, tgtIdx, size in matcher.get_matching_blocks():
+        for offset in range(size):
+            pairs.append((
+                head + srcIdx + offset,
+                head + tgtIdx + offset,))
+    pairs.extend(
+        (nSource - tail + idx, nTarget - tail + idx,)
+        for idx in range(tail))
+    return pairs
+
+
+def TransferTimestamps(
+        source: Sequence[LyricsItem],
+        target: Sequence[LyricsItem],
+        ) -> list[LyricsItem]:
+    """Copies timestamps from the timed `source` lyrics items to the
+    `target` lyrics items, for example from a well-timed LRC file to one
+    with corrected text, and returns new LyricsItems with the text of
+    `target`. Rows are aligned by their normalized text. Matched rows get
+    the timestamp of their source row and, if the texts are identical,
+    its word timestamps. Unmatched rows are linearly interpolated
+    between the neighbouring matched rows and rounded to 10
+    milliseconds; rows after the last matched row are extrapolated by
+    the average gap of matched rows.
+
+    #### Exceptions:
+    * `ValueError`: `source` has no timed row.
+    """
+    # Considering only timed source rows as anchors...
+    timed = [item for item in source if item.timestamp is not None]
+    if not timed:
+        raise ValueError("'source' has no timed lyrics")
+    pairs = _AlignTexts(
+        [_NormalizeText(item.text) for item in timed],
+        [_NormalizeText(item.text) for item in target])
+    nTarget = len(target)
+    times: list[float | None] = [None] * nTarget
+    words: list[array[int] | None] = [None] * nTarget
+    for srcIdx, tgtIdx in pairs:
+        srcItem = timed[srcIdx]
+        times[tgtIdx] = srcItem.timestamp.ToMilliseconds()
+        if srcItem.words and srcItem.text == target[tgtIdx].text:
+            words[tgtIdx] = array('l', srcItem.words)
+    # Interpolating unmatched rows...
+    anchors = [idx for idx, ms in enumerate(times) if ms is not None]
+    if len(anchors) >= 2:
+        gap = (times[anchors[-1]] - times[anchors[0]]) / \
+            (anchors[-1] - anchors[0])
+    else:
+        gap = 1_000
+    # Rows before the first anchor are interpolated from zero...
+    prevIdx, prevMs = -1, 0
+    for nextIdx in anchors:
+        nextMs = times[nextIdx]
+        step = (nextMs - prevMs) / (nextIdx - prevIdx)
+        for idx in range(prevIdx + 1, nextIdx):
+            times[idx] = round(prevMs + (idx - prevIdx) * step, -1)
+        prevIdx, prevMs = nextIdx, nextMs
+    for idx in range(prevIdx + 1, nTarget):
+        times[idx] = round(prevMs + (idx - prevIdx) * gap, -1)
+    FromMilliseconds = Timestamp.FromMilliseconds
+    return [
+        LyricsItem(item.text, FromMilliseconds(int(ms)), itemWords)
+        for item, ms, itemWords in zip(target, times, words)]
+
+
+def _IterTrack(
+        lyrics: Iterable[LyricsItem],
+        track_idx: int,
+        ) -> Iterable[tuple[int, int, str]]:
+    """Yields 3-tuples of milliseconds, `track_idx`, and text of the
+    specified lyrics items.
+
+    #### Exceptions:
+    * `ValueError`: some LyricsItems have no timestamp.
+    """
+    for item in lyrics:
+        if item.timestamp is None:
+            raise ValueError('some lyrics do not have a timestamp')
+        yield item.timestamp.ToMilliseconds(), track_idx, item.text
+
+
+def MergeLyrics(
+        tracks: Sequence[Iterable[LyricsItem]],
+        tolerance: int = 0,
+        ) -> list[LyricsItem]:
+    """Merges several lyrics of the same audio, for example the original
+    lyrics and its translations, into one timeline by a merge-join on
+    timestamps. Every track must be in ascending order of timestamps.
+    Items of different tracks whose timestamps are within `tolerance`
+    milliseconds of the first item of a group are stacked into one
+    LyricsItem at the timestamp of that item, their texts joined by new
+    lines in the order of `tracks`.
+
+    #### Exceptions:
+    * `ValueError`: some LyricsItems have no timestamp.
+    """
+    nTracks = len(tracks)
+    FromMilliseconds = Timestamp.FromMilliseconds
+    merged: list[LyricsItem] = []
+    groupMs = -1
+    texts: list[str | None] = [None] * nTracks
+
+    def FlushGroup() -> None:
+        merged.append(LyricsItem(
+            '\n'.join(text for text in texts if text),
+            FromMilliseconds(groupMs)))
+
+    for ms, trackIdx, text in merge(*(
+            _IterTrack(lyrics, trackIdx)
+            for trackIdx, lyrics in enumerate(tracks))):
+        if groupMs < 0 or ms - groupMs > tolerance:
+            if groupMs >= 0:
+                FlushGroup()
+            groupMs = ms
+            texts = [None] * nTracks
+        if texts[trackIdx] is None:
+            texts[trackIdx] = text
+        else:
+            texts[trackIdx] += '\n' + text
+    if groupMs >= 0:
+        FlushGroup()
+    return merged
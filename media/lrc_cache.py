@@ -0,0 +1,484 @@
+#
+#
+#
+"""This module offers `LrcCache` class which keeps the parsed state of
+LRC files on the disk in a compact binary layout so loading an
+unchanged LRC file does not need to parse it again.
+
+Every LRC file has one entry in the cache folder. An entry is keyed by
+the absolute path, the size, and the modification time (in nanoseconds)
+of the LRC file so any change to the file invalidates its entry. The
+total size of the entries is capped and the least recently used
+entries are evicted first. Entries are in the native byte order so the
+cache folder must not be shared between different machines.
+"""
+
+from __future__ import annotations
+from array import array
+from hashlib import blake2b
+import logging
+import os
+from os import PathLike
+from pathlib import Path
+import struct
+from tempfile import mkstemp
+from threading import RLock
+from time import time_ns
+from typing import Mapping
+
+from media.lrc import Lrc, LrcErrors, LrcState, LyricsItem, Timestamp
+
+
+_MAGIC = b'LRCC'
+_VERSION = 2
+
+_HEADER = struct.Struct('=4sHqqHIB16s')
+"""The layout of the header of entries: magic, version, size of the
+LRC file, modification time of the LRC file in nanoseconds, errors,
+number of duplicate tags, flags, and the digest of the LRC file.
+"""
+_U32 = struct.Struct('=I')
+
+_FLAG_COLLAPSE_REPEATS = 0x01
+_FLAG_HAS_DIGEST = 0x02
+
+_NO_TIMESTAMP = -1
+"""Specifies a lyrics item without a timestamp in the timestamps
+array of entries.
+"""
+
+
+def _PackStr(chunks: list[bytes], text: str) -> None:
+    """Appends the length-prefixed UTF-8 representation of `text` to
+    `chunks`.
+    """
+    data = text.encode('utf-8', 'surrogatepass')
+    chunks.append(_U32.pack(len(data)))
+    chunks.append(data)
+
+
+def _PackArray(chunks: list[bytes], arr: array) -> None:
+    """Appends the length-prefixed raw bytes of `arr` to `chunks`."""
+    chunks.append(_U32.pack(len(arr)))
+    chunks.append(arr.tobytes())
+
+
+def _PackTags(
+        chunks: list[bytes],
+        tags: Mapping[str, str | list[str]],
+        ) -> None:
+    """Appends the binary representation of `tags` to `chunks`. Every
+    value is stored as a list of strings alongside a flag indicating
+    whether it was a single string.
+    """
+    chunks.append(_U32.pack(len(tags)))
+    for name, value in tags.items():
+        _PackStr(chunks, name)
+        if isinstance(value, str):
+            chunks.append(_U32.pack(0))
+            _PackStr(chunks, value)
+        else:
+            chunks.append(_U32.pack(len(value)))
+            for item in value:
+                _PackStr(chunks, item)
+
+
+class _Reader:
+    """Reads the binary representation of entries sequentially."""
+    __slots__ = ('_data', '_pos',)
+
+    def __init__(self, data: bytes, pos: int = 0) -> None:
+        self._data = memoryview(data)
+        self._pos = pos
+
+    def ReadU32(self) -> int:
+        value, = _U32.unpack_from(self._data, self._pos)
+        self._pos += _U32.size
+        return value
+
+    def ReadStr(self) -> str:
+        length = self.ReadU32()
+        end = self._pos + length
+        if end > len(self._data):
+            raise ValueError('truncated cache entry')
+        text = str(self._data[self._pos:end], 'utf-8', 'surrogatepass')
+        self._pos = end
+        return text
+
+    def ReadArray(self, typecode: str) -> array:
+        arr = array(typecode)
+        length = self.ReadU32() * arr.itemsize
+        end = self._pos + length
+        if end > len(self._data):
+            raise ValueError('truncated cache entry')
+        arr.frombytes(self._data[self._pos:end])
+        self._pos = end
+        return arr
+
+    def ReadTags(self) -> dict[str, str | list[str]]:
+        tags: dict[str, str | list[str]] = {}
+        for _ in range(self.ReadU32()):
+            name = self.ReadStr()
+            nValues = self.ReadU32()
+            if nValues == 0:
+                tags[name] = self.ReadStr()
+            else:
+                tags[name] = [self.ReadStr() for _ in range(nValues)]
+        return tags
+
+    def IsAtEnd(self) -> bool:
+        return self._pos == len(self._data)
+
+
+class LrcCache:
+    """Keeps the parsed state of LRC files in a folder. To load an LRC
+    file through the cache, call `Load` method instead of the `Lrc`
+    constructor. Instances of this class are thread safe but the cache
+    folder must be used by only one instance at a time.
+    """
+    def __init__(
+            self,
+            folder: str | PathLike,
+            max_size: int = 32 * 1024 * 1024,
+            ) -> None:
+        """Initializes a new instance with the specified `folder` in
+        which entries are kept. The folder is created if it does not
+        exist. `max_size` specifies the maximum total size of entries in
+        bytes.
+        """
+        self._folder = Path(folder)
+        """The folder in which entries are kept."""
+        self._maxSize = max_size
+        """The maximum total size of entries in bytes."""
+        self._entries: dict[str, tuple[int, int]] | None = None
+        """The mapping of entry names to 2-tuples of their sizes and
+        last use times in nanoseconds. It is populated lazily on the
+        first write to the cache.
+        """
+        self._totalSize = 0
+        """The total size of entries in bytes."""
+        self._lock = RLock()
+        self._folder.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def folder(self) -> Path:
+        """Gets the folder in which entries are kept."""
+        return self._folder
+
+    @property
+    def maxSize(self) -> int:
+        """Gets the maximum total size of entries in bytes."""
+        return self._maxSize
+
+    def Load(
+            self,
+            filename: str | PathLike,
+            toSaveUnknownTags: bool = False,
+            toSaveNoTimestamps: bool = False,
+            ) -> Lrc:
+        """Returns the Lrc object of the specified LRC file. If the
+        cache has a valid entry for the file, the object is built from
+        the entry without parsing the file, otherwise the file is parsed
+        and its entry is stored for later.
+
+        #### Exceptions:
+        Any exception raised by `Lrc` constructor.
+        """
+        lrc = self.Get(filename, toSaveUnknownTags, toSaveNoTimestamps)
+        if lrc is None:
+            lrc = Lrc(filename, toSaveUnknownTags, toSaveNoTimestamps)
+            self.Put(lrc)
+        return lrc
+
+    def Get(
+            self,
+            filename: str | PathLike,
+            toSaveUnknownTags: bool = False,
+            toSaveNoTimestamps: bool = False,
+            ) -> Lrc | None:
+        """Returns the Lrc object of the specified LRC file from its
+        entry or None if there is no valid entry.
+
+        #### Exceptions:
+        `OSError`: the LRC file is not accessible.
+        """
+        path = os.path.abspath(filename)
+        stat = os.stat(path)
+        entry = self._GetEntryPath(path)
+        try:
+            with open(entry, mode='rb') as entryFile:
+                data = entryFile.read()
+        except OSError:
+            return None
+        try:
+            lrc = self._Decode(
+                data,
+                path,
+                (stat.st_size, stat.st_mtime_ns,),
+                filename,
+                toSaveUnknownTags,
+                toSaveNoTimestamps)
+        except (ValueError, struct.error, UnicodeDecodeError) as err:
+            logging.error(f"Corrupted LRC cache entry '{entry}': {err}")
+            self._Remove(entry)
+            return None
+        if lrc is None:
+            # The entry is stale, removing it...
+            self._Remove(entry)
+            return None
+        self._Touch(entry)
+        return lrc
+
+    def Put(self, lrc: Lrc) -> None:
+        """Stores the parsed state of the specified Lrc object in the
+        cache. Objects that are not loaded from a file, header-only
+        objects, or modified objects are ignored because their state
+        does not reflect their files.
+        """
+        if lrc.filename is None or lrc.isHeaderOnly or lrc.changed:
+            return
+        state = lrc.GetState()
+        if state.savedSignature is None:
+            return
+        path = os.path.abspath(lrc.filename)
+        data = self._Encode(state, path)
+        entry = self._GetEntryPath(path)
+        with self._lock:
+            self._LoadEntries()
+            try:
+                fd, tmpName = mkstemp(
+                    dir=self._folder,
+                    prefix='.',
+                    suffix='.tmp')
+                try:
+                    with os.fdopen(fd, mode='wb') as tmpFile:
+                        tmpFile.write(data)
+                    os.replace(tmpName, entry)
+                except BaseException:
+                    os.unlink(tmpName)
+                    raise
+            except OSError as err:
+                logging.error(f"Failed to write LRC cache entry: {err}")
+                return
+            oldSize, _ = self._entries.get(entry.name, (0, 0,))
+            self._entries[entry.name] = (len(data), time_ns(),)
+            self._totalSize += len(data) - oldSize
+            self._Evict()
+
+    def Clear(self) -> None:
+        """Removes all entries of the cache."""
+        with self._lock:
+            for entry in self._folder.glob('*.lrcc'):
+                try:
+                    entry.unlink()
+                except OSError:
+                    pass
+            self._entries = {}
+            self._totalSize = 0
+
+    def _GetEntryPath(self, path: str) -> Path:
+        """Returns the address of the entry of the specified absolute
+        path of an LRC file.
+        """
+        key = blake2b(
+            os.fsencode(os.path.normcase(path)),
+            digest_size=16).hexdigest()
+        return self._folder / f'{key}.lrcc'
+
+    def _LoadEntries(self) -> None:
+        """Populates the entries index by scanning the cache folder if
+        it has not been populated yet.
+        """
+        if self._entries is not None:
+            return
+        self._entries = {}
+        self._totalSize = 0
+        with os.scandir(self._folder) as it:
+            for dirEntry in it:
+                if not dirEntry.name.endswith('.lrcc'):
+                    continue
+                try:
+                    stat = dirEntry.stat()
+                except OSError:
+                    continue
+                self._entries[dirEntry.name] = (
+                    stat.st_size,
+                    stat.st_mtime_ns,)
+                self._totalSize += stat.st_size
+
+    def _Touch(self, entry: Path) -> None:
+        """Marks the specified entry as recently used. The modification
+        time of entries is used as their last use time so the LRU order
+        survives restarts.
+        """
+        try:
+            os.utime(entry)
+        except OSError:
+            return
+        with self._lock:
+            if self._entries is not None and entry.name in self._entries:
+                size, _ = self._entries[entry.name]
+                self._entries[entry.name] = (size, time_ns(),)
+
+    def _Remove(self, entry: Path) -> None:
+        """Removes the specified entry from the cache."""
+        with self._lock:
+            try:
+                entry.unlink()
+            except OSError:
+                pass
+            if self._entries is not None:
+                size, _ = self._entries.pop(entry.name, (0, 0,))
+                self._totalSize -= size
+
+    def _Evict(self) -> None:
+        """Removes the least recently used entries until the total size
+        falls below 90% of the maximum size. Evicting to below the
+        maximum avoids evicting on every write of a full cache.
+        """
+        if self._totalSize <= self._maxSize:
+            return
+        target = self._maxSize * 9 // 10
+        lruNames = sorted(
+            self._entries,
+            key=lambda name: self._entries[name][1])
+        for name in lruNames:
+            if self._totalSize <= target:
+                break
+            try:
+                (self._folder / name).unlink()
+            except FileNotFoundError:
+                pass
+            except OSError:
+                continue
+            size, _ = self._entries.pop(name)
+            self._totalSize -= size
+
+    def _Encode(self, state: LrcState, path: str) -> bytes:
+        """Returns the binary representation of the entry of the
+        specified state of an Lrc object loaded from a file.
+        """
+        flags = 0
+        if state.toCollapseRepeats:
+            flags |= _FLAG_COLLAPSE_REPEATS
+        signature = state.savedSignature
+        digest = state.savedDigest
+        if digest is not None:
+            flags |= _FLAG_HAS_DIGEST
+        else:
+            digest = b''
+        chunks: list[bytes] = [
+            _HEADER.pack(
+                _MAGIC,
+                _VERSION,
+                signature[0],
+                signature[1],
+                int(state.errors),
+                state.nDuplicates,
+                flags,
+                digest)]
+        _PackStr(chunks, path)
+        _PackStr(chunks, state.encoding)
+        _PackTags(chunks, state.tags)
+        _PackTags(chunks, state.unknownTags)
+        # Packing lyrics items as parallel arrays and a table of unique
+        # texts so texts shared by repeated lines are stored once...
+        lyrics = state.lyrics
+        textIndices: dict[str, int] = {}
+        texts: list[str] = []
+        textIdxs = array('I')
+        timestamps = array('q')
+        wordCounts = array('I')
+        words = array('q')
+        for item in lyrics:
+            idx = textIndices.get(item.text)
+            if idx is None:
+                idx = textIndices[item.text] = len(texts)
+                texts.append(item.text)
+            textIdxs.append(idx)
+            timestamps.append(
+                _NO_TIMESTAMP if item.timestamp is None
+                else item.timestamp.ToMilliseconds())
+            if item.words is None:
+                wordCounts.append(0)
+            else:
+                wordCounts.append(len(item.words))
+                # Converting because the typecode of words of lyrics
+                # items, 'l', varies across platforms...
+                words.fromlist(item.words.tolist())
+        chunks.append(_U32.pack(len(texts)))
+        for text in texts:
+            _PackStr(chunks, text)
+        _PackArray(chunks, textIdxs)
+        _PackArray(chunks, timestamps)
+        _PackArray(chunks, wordCounts)
+        _PackArray(chunks, words)
+        return b''.join(chunks)
+
+    def _Decode(
+            self,
+            data: bytes,
+            path: str,
+            signature: tuple[int, int],
+            filename: str | PathLike,
+            toSaveUnknownTags: bool,
+            toSaveNoTimestamps: bool,
+            ) -> Lrc | None:
+        """Builds an Lrc object from the binary representation of an
+        entry. It returns None if the entry does not belong to the
+        specified path and signature.
+
+        #### Exceptions:
+        `ValueError`, `struct.error`, or `UnicodeDecodeError`: the entry
+        is corrupted.
+        """
+        (magic, version, size, mtime, errors, nDuplicates, flags,
+            digest) = _HEADER.unpack_from(data)
+        if magic != _MAGIC or version != _VERSION:
+            return None
+        if (size, mtime,) != signature:
+            return None
+        reader = _Reader(data, _HEADER.size)
+        if reader.ReadStr() != path:
+            return None
+        encoding = reader.ReadStr()
+        tags = reader.ReadTags()
+        unknownTags = reader.ReadTags()
+        texts = [reader.ReadStr() for _ in range(reader.ReadU32())]
+        textIdxs = reader.ReadArray('I')
+        timestamps = reader.ReadArray('q')
+        wordCounts = reader.ReadArray('I')
+        words = reader.ReadArray('q')
+        if not reader.IsAtEnd() or \
+                len(timestamps) != len(textIdxs) or \
+                len(wordCounts) != len(textIdxs) or \
+                sum(wordCounts) != len(words):
+            raise ValueError('inconsistent cache entry')
+        lyrics: list[LyricsItem] = []
+        wordsStart = 0
+        for textIdx, ms, nWords in zip(textIdxs, timestamps, wordCounts):
+            if nWords:
+                wordsEnd = wordsStart + nWords
+                itemWords = array('l', words[wordsStart:wordsEnd])
+                wordsStart = wordsEnd
+            else:
+                itemWords = None
+            lyrics.append(LyricsItem(
+                texts[textIdx],
+                None if ms == _NO_TIMESTAMP
+                    else Timestamp.FromMilliseconds(ms),
+                itemWords))
+        return Lrc.FromState(
+            filename,
+            toSaveUnknownTags,
+            toSaveNoTimestamps,
+            LrcState(
+                LrcErrors(errors),
+                tags,
+                unknownTags,
+                tuple(lyrics),
+                nDuplicates,
+                bool(flags & _FLAG_COLLAPSE_REPEATS),
+                digest if flags & _FLAG_HAS_DIGEST else None,
+                signature,
+                encoding))
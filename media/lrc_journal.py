@@ -0,0 +1,281 @@
+#
+#
+#
+"""This module offers `LrcJournal` class which records edits of the
+lyrics of an LRC file in an append-only sidecar file, `song.lrc.journal`
+for `song.lrc`, so unsaved edits survive a crash.
+
+Every record is one JSON array in one line. The first record is the
+base record which keeps the digest of the content of the LRC file the
+edits apply to. Recording an edit is O(1): the record is appended to an
+in-memory batch which is written to the sidecar file when the batch is
+full or old enough. A checkpoint compacts the journal into the base
+record and one record of all rows, and saving the LRC file starts a new
+journal.
+"""
+
+from __future__ import annotations
+from array import array
+import json
+import logging
+import os
+from os import PathLike
+from pathlib import Path
+from time import monotonic
+import tkinter as tk
+from typing import Any, Callable, Iterable, Sequence
+
+from media.lrc import Lrc, LyricsItem, Timestamp, _WriteAtomically
+
+
+_BASE = 'b'
+_INSERT = 'i'
+_DELETE = 'd'
+_SET_CELL = 's'
+_RESET = 'r'
+
+
+def _EncodeItem(item: LyricsItem) -> list[Any]:
+    """Returns the JSON-compatible representation of a LyricsItem."""
+    return [
+        None if item.timestamp is None else item.timestamp.ToMilliseconds(),
+        item.text,
+        None if item.words is None else list(item.words),]
+
+
+def _DecodeItem(value: Sequence[Any]) -> LyricsItem:
+    """Builds a LyricsItem from its JSON-compatible representation."""
+    ms, text, words = value
+    return LyricsItem(
+        text,
+        None if ms is None else Timestamp.FromMilliseconds(ms),
+        None if words is None else array('l', words))
+
+
+class LrcJournal:
+    """Records edits of the rows of the lyrics of an LRC file in a
+    sidecar file. Rows are LyricsItems and columns are 0 for timestamps
+    and 1 for texts, the same as `LyricsItem` subscripts. Instances of
+    this class are not thread safe.
+    """
+    @classmethod
+    def GetJournalFilename(cls, lrc_file: str | PathLike) -> Path:
+        """Returns the sidecar journal file of the specified LRC file."""
+        return Path(f'{os.fspath(lrc_file)}.journal')
+
+    def __init__(
+            self,
+            lrc_file: str | PathLike,
+            batch_size: int = 16,
+            max_delay: float = 2.0,
+            master: tk.Misc | None = None,
+            rows_cb: Callable[[], Iterable[LyricsItem]] | None = None,
+            compact_size: int = 1024,
+            ) -> None:
+        """Initializes a new journal for the specified LRC file. Records
+        are written to the sidecar file in batches of `batch_size`
+        records or when the oldest pending record is `max_delay` seconds
+        old. If `master`, a widget exposing Tk/Tcl APIs, is provided, a
+        timer writes the batch at that time, otherwise it is written at
+        the time of the next record. If `rows_cb`, which returns all
+        current rows, is provided, the journal is compacted by
+        `Checkpoint` once `compact_size` records have been written.
+        """
+        self._filename = LrcJournal.GetJournalFilename(lrc_file)
+        """The sidecar file of this journal."""
+        self._batchSize = batch_size
+        self._maxDelay = max_delay
+        self._master = master
+        """A widget that exposes Tk/Tcl APIs to arm the flush timer."""
+        self._rowsCb = rows_cb
+        """The callback which returns all current rows for compaction."""
+        self._compactSize = compact_size
+        self._afterId: str | None = None
+        """The ID of the armed flush timer, if any."""
+        self._nWritten = 0
+        """The number of records in the sidecar file."""
+        self._baseRecord: str | None = None
+        """The encoded base record or None if the journal has not begun
+        yet, in which case edits are not recorded.
+        """
+        self._isBaseWritten = False
+        """Specifies whether the base record has been written."""
+        self._pending: list[str] = []
+        """The encoded edit records which have not been written yet."""
+        self._pendingSince: float = 0.0
+        """The time of the oldest pending record."""
+
+    @property
+    def filename(self) -> Path:
+        """Gets the sidecar file of this journal."""
+        return self._filename
+
+    def Begin(self, lrc: Lrc) -> None:
+        """Starts a new journal whose edits apply to the content of the
+        LRC file of `lrc` as last loaded or saved. The sidecar file is
+        created lazily with the first flushed edit.
+        """
+        self.Discard()
+        digest = lrc.savedDigest
+        self._baseRecord = json.dumps(
+            [_BASE, digest.hex() if digest else ''])
+
+    def RecordInsert(self, idx: int, item: LyricsItem) -> None:
+        """Records the insertion of `item` at the `idx` row."""
+        self._Record([_INSERT, idx, _EncodeItem(item)])
+
+    def RecordDelete(self, start: int, stop: int) -> None:
+        """Records the deletion of rows in the range of `[start, stop)`.
+        """
+        self._Record([_DELETE, start, stop])
+
+    def RecordSetCell(
+            self,
+            row: int,
+            col: int,
+            value: str | Timestamp | None,
+            ) -> None:
+        """Records setting the cell at `row` and `col` to `value`."""
+        if value is None:
+            value = ''
+        self._Record([_SET_CELL, row, col, str(value)])
+
+    def RecordReset(self, items: Iterable[LyricsItem]) -> None:
+        """Records replacing all rows with `items`. This is meant for
+        edits, such as moving rows, which have no dedicated record.
+        """
+        self._Record([_RESET, [_EncodeItem(item) for item in items]])
+
+    def _Record(self, record: list[Any]) -> None:
+        """Appends the record to the pending batch and flushes the batch
+        if it is full or old enough.
+        """
+        if self._baseRecord is None:
+            return
+        now = monotonic()
+        if not self._pending:
+            self._pendingSince = now
+            if self._master is not None:
+                self._afterId = self._master.after(
+                    round(self._maxDelay * 1_000),
+                    self._OnFlushTimer)
+        self._pending.append(json.dumps(record, ensure_ascii=False))
+        if len(self._pending) >= self._batchSize or \
+                now - self._pendingSince >= self._maxDelay:
+            self.Flush()
+
+    def _OnFlushTimer(self) -> None:
+        self._afterId = None
+        self.Flush()
+
+    def _CancelFlushTimer(self) -> None:
+        if self._afterId is not None:
+            self._master.after_cancel(self._afterId)
+            self._afterId = None
+
+    def Flush(self) -> None:
+        """Writes pending records to the sidecar file and makes them
+        durable. The journal is compacted afterwards if it has grown
+        beyond the compaction size.
+        """
+        self._CancelFlushTimer()
+        if not self._pending:
+            # No edit to write, returning...
+            return
+        records = self._pending if self._isBaseWritten \
+            else [self._baseRecord, *self._pending]
+        data = ''.join(f'{record}\n' for record in records)
+        try:
+            with open(self._filename, mode='a', encoding='utf-8') as file:
+                file.write(data)
+                file.flush()
+                os.fsync(file.fileno())
+        except OSError as err:
+            logging.error(f"Failed to write the LRC journal: {err}")
+            return
+        self._nWritten += len(records)
+        self._pending.clear()
+        self._isBaseWritten = True
+        if self._rowsCb is not None and \
+                self._nWritten >= self._compactSize:
+            self.Checkpoint(self._rowsCb())
+
+    def Checkpoint(self, items: Iterable[LyricsItem]) -> None:
+        """Compacts the journal into the base record and one record which
+        resets the rows to `items`, all current rows, replacing the
+        sidecar file atomically. The LRC file is not touched; after
+        saving it, call `Begin` to start a new journal.
+        """
+        if self._baseRecord is None:
+            return
+        self._CancelFlushTimer()
+        reset = json.dumps(
+            [_RESET, [_EncodeItem(item) for item in items]],
+            ensure_ascii=False)
+        data = f'{self._baseRecord}\n{reset}\n'.encode('utf-8')
+        try:
+            _WriteAtomically(self._filename, data)
+        except OSError as err:
+            logging.error(f"Failed to compact the LRC journal: {err}")
+            return
+        self._pending.clear()
+        self._isBaseWritten = True
+        self._nWritten = 2
+
+    def Discard(self) -> None:
+        """Deletes the sidecar file and pending records. Edits recorded
+        afterwards are still based on the base of the last `Begin`.
+        """
+        self._CancelFlushTimer()
+        self._pending.clear()
+        self._isBaseWritten = False
+        self._nWritten = 0
+        try:
+            self._filename.unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as err:
+            logging.error(f"Failed to delete the LRC journal: {err}")
+
+    def Replay(self, lrc: Lrc) -> list[LyricsItem] | None:
+        """Replays the records of the sidecar file onto the lyrics of
+        `lrc` and returns the recovered rows. It returns None if there
+        is no journal, it has no edit, or its base is not the content of
+        the LRC file of `lrc`. An incomplete last record, for example
+        because of a crash while writing it, is ignored. `lrc` is not
+        modified.
+        """
+        try:
+            with open(self._filename, mode='r', encoding='utf-8') as file:
+                # Splitting only at line feeds since records keep line
+                # separators such as U+2028 of lyrics unescaped...
+                lines = file.read().split('\n')
+        except OSError:
+            return None
+        records: list[list[Any]] = []
+        for line in lines:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                break
+        if len(records) < 2 or records[0][0] != _BASE:
+            return None
+        digest = lrc.savedDigest
+        if records[0][1] != (digest.hex() if digest else ''):
+            return None
+        rows = [item.Copy() for item in lrc.lyrics]
+        try:
+            for record in records[1:]:
+                kind = record[0]
+                if kind == _INSERT:
+                    rows.insert(record[1], _DecodeItem(record[2]))
+                elif kind == _DELETE:
+                    del rows[record[1]:record[2]]
+                elif kind == _SET_CELL:
+                    rows[record[1]][record[2]] = record[3]
+                elif kind == _RESET:
+                    rows = [_DecodeItem(value) for value in record[1]]
+        except (IndexError, TypeError, ValueError) as err:
+            logging.error(f"Corrupted LRC journal '{self._filename}': {err}")
+            return None
+        return rows
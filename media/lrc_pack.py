@@ -0,0 +1,359 @@
+#
+#
+#
+"""This module offers `LrcPack` class which reads LRC files directly
+from zip lyrics packs without extracting them. The central directory of
+every pack is read once into an index from the stems of LRC members to
+their location in the archive. Indexes are shared between instances and
+kept until the modification time or size of the archive changes.
+Encrypted members and members compressed by methods which `zipfile`
+cannot decompress here are left out of indexes.
+"""
+
+from __future__ import annotations
+import os
+from os import PathLike
+from pathlib import Path
+import struct
+from threading import Lock
+from typing import BinaryIO, NamedTuple
+from zipfile import (
+    BadZipFile, ZIP_BZIP2, ZIP_DEFLATED, ZIP_LZMA, ZIP_STORED, ZipFile)
+import zlib
+
+from media.lrc import Lrc
+
+
+class _Member(NamedTuple):
+    """The location of an LRC member in a zip archive."""
+    name: str
+    headerOffset: int
+    compressType: int
+    compressSize: int
+    fileSize: int
+    crc: int
+    flags: int
+
+
+_LOCAL_HEADER = struct.Struct('<4s2B4HL2L2H')
+"""The structure of the local file header of zip members."""
+
+_LOCAL_HEADER_SIGNATURE = b'PK\x03\x04'
+
+_CENTRAL_HEADER = struct.Struct('<4s4B4HL2L5H2L')
+"""The structure of the entries of the central directory."""
+
+_CENTRAL_HEADER_SIGNATURE = b'PK\x01\x02'
+
+_END_RECORD = struct.Struct('<4s4H2LH')
+"""The structure of the end of central directory record."""
+
+_END_RECORD_SIGNATURE = b'PK\x05\x06'
+
+_ZIP64_LOCATOR = struct.Struct('<4sLQL')
+"""The structure of the ZIP64 end of central directory locator."""
+
+_ZIP64_LOCATOR_SIGNATURE = b'PK\x06\x07'
+
+_ZIP64_END_RECORD = struct.Struct('<4sQ2H2L4Q')
+"""The structure of the ZIP64 end of central directory record."""
+
+_ZIP64_END_RECORD_SIGNATURE = b'PK\x06\x06'
+
+_ZIP64_EXTRA_ID = 0x0001
+
+_MAX_COMMENT = 0xFFFF
+
+_UTF8_FLAG = 0x800
+
+_ENCRYPTED_FLAG = 0x1
+
+
+def _GetSupportedMethods() -> frozenset[int]:
+    """Returns the compression methods which members can be read with:
+    stored and deflated members, which are read directly, and those of
+    optional modules of `zipfile` which are available.
+    """
+    methods = {ZIP_STORED, ZIP_DEFLATED}
+    try:
+        import bz2
+    except ImportError:
+        pass
+    else:
+        methods.add(ZIP_BZIP2)
+    try:
+        import lzma
+    except ImportError:
+        pass
+    else:
+        methods.add(ZIP_LZMA)
+    return frozenset(methods)
+
+
+_SUPPORTED_METHODS = _GetSupportedMethods()
+
+
+def _ScanCentralDirectory(fileobj: BinaryIO) -> dict[str, _Member]:
+    """Reads the central directory of the zip archive in one read and
+    indexes its LRC members in a single pass, which is several times
+    faster than building `ZipInfo` objects for every member. ZIP64
+    archives, which packs of more than 65,535 members are, are
+    supported. Members which cannot be read, encrypted ones or those of
+    unsupported compression methods, are skipped.
+
+    #### Exceptions:
+    * `BadZipFile`: the file is not a zip archive
+    """
+    # Finding the end of central directory record...
+    fileSize = fileobj.seek(0, os.SEEK_END)
+    tailSize = min(fileSize, _END_RECORD.size + _MAX_COMMENT)
+    tailStart = fileSize - tailSize
+    fileobj.seek(tailStart)
+    tail = fileobj.read(tailSize)
+    endPos = tail.rfind(_END_RECORD_SIGNATURE)
+    if endPos < 0 or len(tail) - endPos < _END_RECORD.size:
+        raise BadZipFile('the end of central directory was not found')
+    (_, _, _, _, nEntries, cdSize, cdOffset, _,) = _END_RECORD.unpack_from(
+        tail,
+        endPos)
+    cdEnd = tailStart + endPos
+    # Looking for the ZIP64 locator which some writers add even if no
+    # field of the end record is saturated...
+    locatorPos = endPos - _ZIP64_LOCATOR.size
+    hasLocator = locatorPos >= 0 and tail.startswith(
+        _ZIP64_LOCATOR_SIGNATURE,
+        locatorPos)
+    if nEntries == 0xFFFF or cdSize == 0xFFFFFFFF or \
+            cdOffset == 0xFFFFFFFF or hasLocator:
+        # Reading the ZIP64 end of central directory record...
+        if not hasLocator:
+            raise BadZipFile('the ZIP64 locator was not found')
+        fileobj.seek(tailStart + locatorPos - _ZIP64_END_RECORD.size)
+        record = fileobj.read(_ZIP64_END_RECORD.size)
+        if len(record) != _ZIP64_END_RECORD.size:
+            raise BadZipFile('the ZIP64 end of central directory is bad')
+        (signature, _, _, _, _, _, _, nEntries, cdSize,
+            cdOffset,) = _ZIP64_END_RECORD.unpack(record)
+        if signature != _ZIP64_END_RECORD_SIGNATURE:
+            raise BadZipFile('the ZIP64 end of central directory is bad')
+        cdEnd = tailStart + locatorPos - _ZIP64_END_RECORD.size
+    # Accounting for data prepended to the archive...
+    cdStart = cdEnd - cdSize
+    concat = cdStart - cdOffset
+    if concat < 0:
+        raise BadZipFile('bad central directory offset')
+    fileobj.seek(cdStart)
+    cd = fileobj.read(cdSize)
+    index: dict[str, _Member] = {}
+    pos = 0
+    headerSize = _CENTRAL_HEADER.size
+    unpack_from = _CENTRAL_HEADER.unpack_from
+    try:
+        for _ in range(nEntries):
+            (signature, _, _, _, _, flags, compressType, _, _, crc,
+                compressSize, memberSize, nameLen, extraLen, commentLen, _,
+                _, _, headerOffset,) = unpack_from(cd, pos)
+            if signature != _CENTRAL_HEADER_SIGNATURE:
+                raise BadZipFile('bad central directory entry')
+            nameStart = pos + headerSize
+            extraStart = nameStart + nameLen
+            pos = extraStart + extraLen + commentLen
+            rawName = cd[nameStart:extraStart]
+            if not rawName.lower().endswith(b'.lrc') or \
+                    flags & _ENCRYPTED_FLAG or \
+                    compressType not in _SUPPORTED_METHODS:
+                continue
+            if compressSize == 0xFFFFFFFF or memberSize == 0xFFFFFFFF or \
+                    headerOffset == 0xFFFFFFFF:
+                memberSize, compressSize, headerOffset = _ReadZip64Extra(
+                    cd[extraStart:extraStart + extraLen],
+                    memberSize,
+                    compressSize,
+                    headerOffset)
+            name = rawName.decode(
+                'utf-8' if flags & _UTF8_FLAG else 'cp437')
+            # Taking the base name without '.lrc' as the stem...
+            stem = name.rpartition('/')[2][:-4].casefold()
+            if stem not in index:
+                index[stem] = _Member(
+                    name,
+                    headerOffset + concat,
+                    compressType,
+                    compressSize,
+                    memberSize,
+                    crc,
+                    flags)
+    except struct.error as err:
+        raise BadZipFile(f'truncated central directory: {err}')
+    return index
+
+
+def _ReadZip64Extra(
+        extra: bytes,
+        memberSize: int,
+        compressSize: int,
+        headerOffset: int,
+        ) -> tuple[int, int, int]:
+    """Returns the 64-bit member size, compressed size, and header offset
+    from the ZIP64 extra field for those which are saturated in the
+    central directory entry.
+    """
+    pos = 0
+    while pos + 4 <= len(extra):
+        fieldId, fieldSize = struct.unpack_from('<2H', extra, pos)
+        pos += 4
+        if fieldId == _ZIP64_EXTRA_ID:
+            values = [memberSize, compressSize, headerOffset]
+            for idx in range(3):
+                if values[idx] == 0xFFFFFFFF:
+                    values[idx], = struct.unpack_from('<Q', extra, pos)
+                    pos += 8
+            return values[0], values[1], values[2]
+        pos += fieldSize
+    raise BadZipFile('the ZIP64 extra field was not found')
+
+
+class LrcPack:
+    """Reads LRC members of a zip lyrics pack by the stem of their audio
+    files, for example `song` for `album/song.lrc`. Stems are matched
+    case-insensitively and if several members have the same stem, the
+    first one in the archive wins. Instances of this class are thread
+    safe.
+    """
+    _indexes: dict[str, tuple[int, int, dict[str, _Member]]] = {}
+    """The indexes of all packs keyed by their absolute paths. Values are
+    3-tuples of the modification time in nanoseconds, the size, and the
+    index of the archive.
+    """
+    _indexesLock = Lock()
+
+    @classmethod
+    def ClearIndexes(cls) -> None:
+        """Forgets the indexes of all packs."""
+        with cls._indexesLock:
+            cls._indexes.clear()
+
+    def __init__(self, filename: str | PathLike) -> None:
+        """Opens the specified zip lyrics pack. Its index is built unless
+        it has been built since the archive was last modified.
+
+        #### Exceptions:
+        * `OSError`: the archive cannot be accessed
+        * `BadZipFile`: the file is not a zip archive
+        """
+        self._filename = Path(filename).resolve()
+        """The file system address of the archive."""
+        self._index = self._GetIndex()
+        """The mapping of the case-folded stems of LRC members to their
+        locations in the archive.
+        """
+
+    @property
+    def filename(self) -> Path:
+        """Gets the file system address of the archive."""
+        return self._filename
+
+    def _GetIndex(self) -> dict[str, _Member]:
+        key = os.fspath(self._filename)
+        stat = os.stat(key)
+        with LrcPack._indexesLock:
+            try:
+                mtime, size, index = LrcPack._indexes[key]
+            except KeyError:
+                pass
+            else:
+                if mtime == stat.st_mtime_ns and size == stat.st_size:
+                    return index
+        index = self._BuildIndex()
+        with LrcPack._indexesLock:
+            LrcPack._indexes[key] = (stat.st_mtime_ns, stat.st_size, index,)
+        return index
+
+    def _BuildIndex(self) -> dict[str, _Member]:
+        """Reads the central directory of the archive and returns the
+        index of its LRC members.
+        """
+        with open(self._filename, mode='rb') as fileobj:
+            return _ScanCentralDirectory(fileobj)
+
+    def __contains__(self, stem: str) -> bool:
+        return stem.casefold() in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def GetMemberName(self, stem: str) -> str | None:
+        """Returns the name of the LRC member of `stem` in the archive or
+        None if there is no such member.
+        """
+        member = self._index.get(stem.casefold())
+        return None if member is None else member.name
+
+    def ReadBytes(self, stem: str) -> bytes | None:
+        """Returns the raw content of the LRC member of `stem` or None if
+        there is no such member. Stored and deflated members are read
+        straight from their offset in the archive; other compression
+        methods are delegated to `zipfile`.
+
+        #### Exceptions:
+        * `OSError`: the archive cannot be read
+        * `BadZipFile`: the member is corrupted or cannot be read
+        """
+        member = self._index.get(stem.casefold())
+        if member is None:
+            return None
+        if member.compressType not in (ZIP_STORED, ZIP_DEFLATED,):
+            try:
+                with ZipFile(self._filename) as zipFile:
+                    return zipFile.read(member.name)
+            except (RuntimeError, NotImplementedError) as err:
+                # Encryption or unsupported compression, which indexes
+                # skip, of a member changed by another process...
+                raise BadZipFile(f"cannot read '{member.name}': {err}")
+        with open(self._filename, mode='rb') as fileobj:
+            fileobj.seek(member.headerOffset)
+            header = fileobj.read(_LOCAL_HEADER.size)
+            if len(header) != _LOCAL_HEADER.size:
+                raise BadZipFile(f"truncated member '{member.name}'")
+            fields = _LOCAL_HEADER.unpack(header)
+            if fields[0] != _LOCAL_HEADER_SIGNATURE:
+                raise BadZipFile(f"bad local header of '{member.name}'")
+            # Skipping the name and the extra field of the local header...
+            fileobj.seek(fields[10] + fields[11], os.SEEK_CUR)
+            data = fileobj.read(member.compressSize)
+        if member.compressType == ZIP_DEFLATED:
+            try:
+                data = zlib.decompress(data, -zlib.MAX_WBITS)
+            except zlib.error as err:
+                raise BadZipFile(f"bad data of '{member.name}': {err}")
+        if len(data) != member.fileSize or \
+                zlib.crc32(data) != member.crc:
+            raise BadZipFile(f"bad CRC of '{member.name}'")
+        return data
+
+    def Get(
+            self,
+            stem: str,
+            filename: str | Path | None = None,
+            toSaveUnknownTags: bool = False,
+            toSaveNoTimestamps: bool = False,
+            ) -> Lrc | None:
+        """Parses the LRC member of `stem` and returns it as an Lrc object
+        or None if there is no such member. `filename`, if provided, is
+        where `Lrc.Save` writes the lyrics, for example the LRC file next
+        to the audio, because the archive is never modified.
+
+        #### Exceptions:
+        * `OSError`: the archive cannot be read
+        * `BadZipFile`: the member is corrupted
+        * `UnicodeDecodeError`: the encoding of the member is not
+        supported
+        """
+        data = self.ReadBytes(stem)
+        if data is None:
+            return None
+        return Lrc.FromBytes(
+            data,
+            filename,
+            toSaveUnknownTags,
+            toSaveNoTimestamps)
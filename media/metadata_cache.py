@@ -0,0 +1,305 @@
+#
+#
+#
+"""This module offers `MetadataCache` class which keeps the probe data
+(the `ffprobe` JSON output used as `FFmpegMP3.RawData`) and selected ID3
+tags of audio files in a local SQLite database so reopening a known
+folder does not need to read its audio files.
+
+Rows are keyed by the folder and the name of files and are valid only
+while the size and the modification time (in nanoseconds) of the file
+are unchanged, so a stale row is never returned even if a change was
+missed. All rows of a folder are looked up by one query, validated
+against one scan of the folder, and rows of files which no longer exist
+are dropped along the way.
+"""
+
+from __future__ import annotations
+from json import dumps, loads
+import logging
+import os
+from os import PathLike
+from pathlib import Path
+import sqlite3
+from threading import Lock
+from typing import Any, Iterable, NamedTuple
+
+
+_SCHEMA_VERSION = 1
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS metadata (
+    folder TEXT NOT NULL,
+    name TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    tags TEXT,
+    probe TEXT,
+    PRIMARY KEY (folder, name)
+) WITHOUT ROWID;
+'''
+
+_UPSERT = '''
+INSERT INTO metadata (folder, name, size, mtime_ns, tags, probe)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (folder, name) DO UPDATE SET
+    tags = CASE
+        WHEN size = excluded.size AND mtime_ns = excluded.mtime_ns
+        THEN coalesce(excluded.tags, tags)
+        ELSE excluded.tags END,
+    probe = CASE
+        WHEN size = excluded.size AND mtime_ns = excluded.mtime_ns
+        THEN coalesce(excluded.probe, probe)
+        ELSE excluded.probe END,
+    size = excluded.size,
+    mtime_ns = excluded.mtime_ns
+'''
+"""Inserts or updates a row. Columns given as NULL keep their values if
+the file is unchanged and are cleared otherwise.
+"""
+
+
+class MetadataEntry(NamedTuple):
+    """The cached metadata of an audio file alongside its current
+    signature. `tags` and `probe` are None if they are not cached for
+    the current state of the file.
+    """
+    size: int
+    mtimeNs: int
+    tags: dict[str, list[str]] | None = None
+    """The selected ID3 tags, frame IDs to their values."""
+    probe: dict[str, Any] | None = None
+    """The `ffprobe` JSON output of the file."""
+
+
+def _FolderKey(folder: str | PathLike) -> str:
+    return os.path.normcase(os.path.abspath(folder))
+
+
+def _LoadJson(text: str | None) -> Any:
+    return None if text is None else loads(text)
+
+
+def _DumpJson(obj: Any) -> str | None:
+    return None if obj is None else dumps(obj, separators=(',', ':'))
+
+
+class MetadataCache:
+    """Keeps the metadata of audio files in an SQLite database. Instances
+    of this class are thread safe.
+    """
+    def __init__(self, filename: str | PathLike) -> None:
+        """Opens or creates the database at `filename`. A database which
+        cannot be used is recreated.
+        """
+        self._filename = Path(filename)
+        """The file of the database."""
+        self._lock = Lock()
+        self._filename.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            self._conn = self._Connect()
+        except sqlite3.DatabaseError as err:
+            logging.error(
+                f"Recreating the metadata cache '{self._filename}': {err}")
+            self._filename.unlink(missing_ok=True)
+            self._conn = self._Connect()
+
+    def _Connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self._filename,
+            isolation_level=None,
+            check_same_thread=False)
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            version, = conn.execute('PRAGMA user_version').fetchone()
+            if version != _SCHEMA_VERSION:
+                conn.execute('DROP TABLE IF EXISTS metadata')
+                conn.execute(f'PRAGMA user_version={_SCHEMA_VERSION}')
+            conn.executescript(_SCHEMA)
+        except BaseException:
+            conn.close()
+            raise
+        return conn
+
+    @property
+    def filename(self) -> Path:
+        """Gets the file of the database."""
+        return self._filename
+
+    def GetFolder(
+            self,
+            folder: str | PathLike,
+            suffix: str = '.mp3',
+            ) -> dict[str, MetadataEntry]:
+        """Returns the entries of all files in the specified folder whose
+        names end with `suffix`, case-insensitively, keyed by name. Only
+        the folder is scanned; the files themselves are not read. Rows of
+        files which no longer exist are removed.
+
+        #### Exceptions:
+        * `OSError`: the folder cannot be scanned
+        """
+        folderKey = _FolderKey(folder)
+        suffix = suffix.lower()
+        stats: dict[str, tuple[int, int]] = {}
+        with os.scandir(folder) as it:
+            for dirEntry in it:
+                if not dirEntry.name.lower().endswith(suffix):
+                    continue
+                try:
+                    if not dirEntry.is_file():
+                        continue
+                    stat = dirEntry.stat()
+                except OSError:
+                    continue
+                stats[dirEntry.name] = (stat.st_size, stat.st_mtime_ns,)
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT name, size, mtime_ns, tags, probe FROM metadata '
+                'WHERE folder = ?',
+                (folderKey,)).fetchall()
+        entries = {
+            name: MetadataEntry(size, mtimeNs)
+            for name, (size, mtimeNs) in stats.items()}
+        missing: list[tuple[str, str]] = []
+        for name, size, mtimeNs, tags, probe in rows:
+            if name not in stats:
+                if name.lower().endswith(suffix):
+                    missing.append((folderKey, name,))
+                continue
+            if stats[name] != (size, mtimeNs,):
+                continue
+            try:
+                entries[name] = MetadataEntry(
+                    size,
+                    mtimeNs,
+                    _LoadJson(tags),
+                    _LoadJson(probe))
+            except ValueError as err:
+                logging.error(
+                    f"Corrupted metadata cache row of '{name}': {err}")
+        if missing:
+            self._Delete(missing)
+        return entries
+
+    def Get(self, filename: str | PathLike) -> MetadataEntry:
+        """Returns the entry of the specified file. `tags` and `probe`
+        of the entry are None if they are not cached.
+
+        #### Exceptions:
+        * `OSError`: the file is not accessible
+        """
+        path = os.path.abspath(filename)
+        stat = os.stat(path)
+        folderKey = _FolderKey(os.path.dirname(path))
+        name = os.path.basename(path)
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT tags, probe FROM metadata '
+                'WHERE folder = ? AND name = ? AND size = ? '
+                'AND mtime_ns = ?',
+                (folderKey, name, stat.st_size, stat.st_mtime_ns,)
+                ).fetchone()
+        if row is not None:
+            try:
+                return MetadataEntry(
+                    stat.st_size,
+                    stat.st_mtime_ns,
+                    _LoadJson(row[0]),
+                    _LoadJson(row[1]))
+            except ValueError as err:
+                logging.error(
+                    f"Corrupted metadata cache row of '{path}': {err}")
+        return MetadataEntry(stat.st_size, stat.st_mtime_ns)
+
+    def Put(self, filename: str | PathLike, entry: MetadataEntry) -> None:
+        """Stores the specified entry of the file. The signature of the
+        entry must be taken before reading the metadata from the file,
+        for example by `Get` or `GetFolder`. Metadata which is None in
+        the entry is kept if the file is unchanged.
+        """
+        path = os.path.abspath(filename)
+        self.PutMany(
+            os.path.dirname(path),
+            [(os.path.basename(path), entry,)])
+
+    def PutMany(
+            self,
+            folder: str | PathLike,
+            entries: Iterable[tuple[str, MetadataEntry]],
+            ) -> None:
+        """Stores the entries of the specified files of the folder, as
+        2-tuples of names and entries, in one transaction. See `Put`.
+        """
+        folderKey = _FolderKey(folder)
+        params = [
+            (
+                folderKey,
+                name,
+                entry.size,
+                entry.mtimeNs,
+                _DumpJson(entry.tags),
+                _DumpJson(entry.probe),)
+            for name, entry in entries]
+        if not params:
+            return
+        with self._lock:
+            try:
+                with _Transaction(self._conn):
+                    self._conn.executemany(_UPSERT, params)
+            except sqlite3.Error as err:
+                logging.error(f'Failed to write the metadata cache: {err}')
+
+    def Invalidate(
+            self,
+            folder: str | PathLike,
+            names: Iterable[str],
+            ) -> None:
+        """Removes the entries of the specified files of the folder. Its
+        signature suits the callbacks of `FsWatcher` subscriptions when
+        the folder is bound, for example by `functools.partial`.
+        """
+        folderKey = _FolderKey(folder)
+        self._Delete([(folderKey, Path(name).name,) for name in names])
+
+    def Clear(self) -> None:
+        """Removes all entries of the cache."""
+        with self._lock:
+            self._conn.execute('DELETE FROM metadata')
+
+    def Close(self) -> None:
+        """Closes the database. The object must not be used afterwards."""
+        with self._lock:
+            self._conn.close()
+
+    def _Delete(self, keys: list[tuple[str, str]]) -> None:
+        with self._lock:
+            try:
+                with _Transaction(self._conn):
+                    self._conn.executemany(
+                        'DELETE FROM metadata WHERE folder = ? AND name = ?',
+                        keys)
+            except sqlite3.Error as err:
+                logging.error(f'Failed to write the metadata cache: {err}')
+
+
+class _Transaction:
+    """Wraps statements in a transaction of a connection in autocommit
+    mode, committing on success and rolling back on failure.
+    """
+    __slots__ = ('_conn',)
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self._conn = conn
+
+    def __enter__(self) -> None:
+        self._conn.execute('BEGIN')
+
+    def __exit__(self, exctype, excinst, exctb) -> bool:
+        if exctype is None:
+            self._conn.execute('COMMIT')
+        else:
+            self._conn.execute('ROLLBACK')
+        # Not suppressing possible exception...
+        return False
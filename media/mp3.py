@@ -1,5 +1,8 @@
 """This module implements the functionalities of abstract_mp3.py
-by the use of FFmpeg project.
+by the use of FFmpeg project. Basic properties of plain MP3 files are
+read in-process by `ProbeMp3` and `ffprobe` is only run for the others.
+The playback position is interpolated by `PlaybackClock` between the
+progress reports of `ffplay`.
 
 Dependencies:
 1. Python 3.10+
@@ -7,17 +10,191 @@ Dependencies:
 required to be added the path environment variable.
 """
 
+from __future__ import annotations
 from asyncio import AbstractEventLoop
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import timedelta
 from json import loads
 from math import isnan
+import os
 from pathlib import Path
 import subprocess
+import threading
 from traceback import TracebackException
+from time import monotonic
 from types import TracebackType
-from typing import Any
+from typing import Any, Iterable, Iterator
 
 from media.abstract_mp3 import AbstractMp3, MP3NotFoundError
+from media.mp3_probe import ProbeMp3
+
+
+def _RunFfprobe(filename: str | Path) -> dict[str, Any]:
+    """Runs `ffprobe` on the specified file and returns its JSON output
+    of format and streams. The output is collected by `communicate` at
+    once rather than polled line by line.
+
+    #### Exceptions:
+    * `OSError`: `ffprobe` cannot be run
+    * `MP3NotFoundError`: `ffprobe` cannot read the file
+    """
+    args = [
+        'ffprobe',
+        '-hide_banner',
+        '-loglevel',
+        '0',
+        '-print_format',
+        'json',
+        '-show_format',
+        '-show_streams',
+        filename]
+    completed = subprocess.run(
+        args,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        encoding='utf-8')
+    try:
+        rawData = loads(completed.stdout)
+    except ValueError:
+        rawData = None
+    if completed.returncode or not rawData or 'format' not in rawData:
+        raise MP3NotFoundError(f"ffprobe cannot read '{filename}'")
+    return rawData
+
+
+def _ProbeFile(filename: str | Path) -> dict[str, Any]:
+    """Returns the raw data of the specified file, read in-process by
+    `ProbeMp3` if possible and by `ffprobe` otherwise.
+
+    #### Exceptions:
+    * `OSError`: neither the file can be read nor `ffprobe` can be run
+    * `MP3NotFoundError`: `ffprobe` cannot read the file
+    """
+    try:
+        rawData = ProbeMp3(filename)
+    except OSError:
+        rawData = None
+    if rawData is None:
+        # Falling back to ffprobe for exotic files...
+        rawData = _RunFfprobe(filename)
+    return rawData
+
+
+def ProbeFiles(
+        filenames: Iterable[str | Path],
+        max_workers: int | None = None,
+        ) -> Iterator[tuple[str | Path, dict[str, Any] | Exception]]:
+    """Probes the specified files as `FFmpegMP3` does, at most
+    `max_workers` at a time which defaults to the number of CPUs, and
+    yields 2-tuples of every file and its raw data, or the exception
+    raised probing it, in the order of completion. Raw data can be
+    passed to `FFmpegMP3.FromRawData`. If the generator is closed early,
+    probes which have not started are canceled.
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    executor = ThreadPoolExecutor(
+        max_workers=max_workers,
+        thread_name_prefix='probe')
+    try:
+        futures = {
+            executor.submit(_ProbeFile, filename): filename
+            for filename in filenames}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result()
+            except Exception as err:
+                yield futures[future], err
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+class PlaybackClock:
+    """Interpolates the playback position between the reports of the
+    decoder, which come only a few times per second, by anchoring on the
+    last report and the monotonic time. A started clock holds its
+    position until the first report since the decoder takes a while to
+    start. Small differences of new reports are absorbed gradually over
+    `SLEW_TIME` seconds rather than jumped to, and positions read while
+    running never go backward until the clock is started again. Reading
+    the position needs no I/O.
+    """
+    SLEW_TIME = 0.5
+    """The time over which differences of reports are absorbed."""
+    MAX_SLEW = 0.25
+    """Differences of reports larger than this many seconds are jumped
+    to at once.
+    """
+
+    def __init__(self) -> None:
+        self._anchor: tuple[float, float, float] = (0.0, 0.0, 0.0,)
+        """The position, the monotonic time, and the difference to
+        absorb, of the last anchor as one tuple so that it is replaced
+        atomically.
+        """
+        self._running = False
+        self._awaiting = False
+        """Whether the clock is waiting for the first report."""
+        self._floor = 0.0
+        """The last position read while running."""
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def Start(self, pos: float) -> None:
+        """Anchors the clock at `pos` and starts it."""
+        self._floor = pos
+        self._anchor = (pos, monotonic(), 0.0,)
+        self._awaiting = True
+        self._running = True
+
+    def Stop(self, pos: float | None = None) -> None:
+        """Stops the clock at `pos` or, if it is None, at the current
+        position.
+        """
+        if pos is None:
+            pos = self.Now()
+        self._running = False
+        self._awaiting = False
+        self._floor = pos
+        self._anchor = (pos, monotonic(), 0.0,)
+
+    def Report(self, pos: float) -> None:
+        """Corrects the clock by the position reported by the decoder."""
+        if not self._running:
+            return
+        now = monotonic()
+        if self._awaiting:
+            self._awaiting = False
+            self._anchor = (pos, now, 0.0,)
+            self._floor = pos
+            return
+        predicted = self._Predict(now)
+        diff = pos - predicted
+        if abs(diff) > self.MAX_SLEW:
+            # Jumping to the report...
+            self._anchor = (pos, now, 0.0,)
+            if diff > 0:
+                self._floor = pos
+        else:
+            self._anchor = (predicted, now, diff,)
+
+    def Now(self) -> float:
+        """Returns the current position."""
+        if not self._running:
+            return self._anchor[0]
+        if self._awaiting:
+            return self._floor
+        pos = max(self._Predict(monotonic()), self._floor)
+        self._floor = pos
+        return pos
+
+    def _Predict(self, now: float) -> float:
+        pos, time, diff = self._anchor
+        elapsed = now - time
+        return pos + elapsed + diff * min(elapsed / self.SLEW_TIME, 1.0)
 
 
 class FFmpegMP3(AbstractMp3):
@@ -35,8 +212,44 @@ class FFmpegMP3(AbstractMp3):
         """
         if not Path(filename).exists():
             raise FileNotFoundError(f"'{filename}' has not found")
+        self._InitAttrs(filename)
+        # Getting information of the file & putting them into an object...
+        self._SetRawData(_ProbeFile(filename))
+
+    @classmethod
+    def ProbeMany(
+            cls,
+            filenames: Iterable[str | Path],
+            max_workers: int | None = None,
+            ) -> Iterator[tuple[str | Path, dict[str, Any] | Exception]]:
+        """Probes the specified files concurrently and yields their raw
+        data for `FromRawData` as they complete. See `ProbeFiles`.
+        """
+        return ProbeFiles(filenames, max_workers)
 
-        # Initializing other attributes...
+    @classmethod
+    def FromRawData(
+            cls,
+            filename: str | Path,
+            raw_data: dict[str, Any],
+            ) -> FFmpegMP3:
+        """Creates an instance of this class from the `ffprobe` JSON
+        output of the file, for example from `ProbeMany`, without
+        probing the file again. `raw_data` is owned by the new object
+        afterwards.
+
+        #### Exceptions:
+        * `MP3NotFoundError`: the raw data is not of an MP3 file
+        """
+        mp3 = cls.__new__(cls)
+        mp3._InitAttrs(filename)
+        mp3._SetRawData(raw_data)
+        return mp3
+
+    def _InitAttrs(self, filename: str | Path) -> None:
+        """Initializes the attributes of a new object without probing
+        the file.
+        """
         self._filename = filename
         """Specifies the location of the input audio either in the local
         file system or on the network.
@@ -51,45 +264,34 @@ class FFmpegMP3(AbstractMp3):
         """Specifies whether the audio is playing at the moment or not."""
         self._popen: subprocess.Popen[str] | None = None
         """Specifies the Popen object wrapping the child process."""
+        self._endEvent = threading.Event()
+        """Set when the current playback reaches the end of the stream."""
+        self._clock = PlaybackClock()
+        """Interpolates the position between the reports of ffplay."""
+        self._lock = threading.Lock()
+        """Guards the player process and the position against the
+        reader thread of ffplay output.
+        """
         self._rawData: dict[str, Any] | None = None
         """A JSON object (a dictionary) containing all raw multimedia
         attributes about the file.
         """
 
-        # Getting information of the file & putting them into an object...
-        args = [
-            'ffprobe',
-            '-hide_banner',
-            '-loglevel',
-            '0',
-            '-print_format',
-            'json',
-            '-show_format',
-            '-show_streams',
-            filename]
-        popen = subprocess.Popen(
-            args=args,
-            universal_newlines=True,
-            encoding='utf-8',
-            bufsize=1,
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT)
-        jsonData = ''
-        while True:
-            output = popen.stdout.readline()
-            if output:
-                jsonData += output
-            elif popen.poll() is not None:
-                break
-        self._rawData = loads(jsonData)
+    def _SetRawData(self, raw_data: dict[str, Any]) -> None:
+        """Normalizes and sets the raw data of the file.
+
+        #### Exceptions:
+        * `MP3NotFoundError`: the raw data is not of an MP3 file
+        """
+        self._rawData = raw_data
         self._rawData['format']['duration'] = float(
             self._rawData['format']['duration'])
         self._rawData['format']['bit_rate'] = int(
             self._rawData['format']['bit_rate'])
         # Checking the input file is an MP3...
         if self._rawData['format'].get('format_name', None).lower() != 'mp3':
-            raise MP3NotFoundError(f"'{filename}' is not an MP3 file.")
+            raise MP3NotFoundError(
+                f"'{self._filename}' is not an MP3 file.")
     
     @property
     def Duration(self) -> float:
@@ -140,39 +342,36 @@ class FFmpegMP3(AbstractMp3):
     def volume(self, __volume: int, /) -> int:
         self._volume = round(__volume)
         if self._playing:
-            self._popen.terminate()
+            self._StopPlayer()
             self.Play()
     
     @property
     def pos(self) -> float:
-        while self._popen and (self._popen.poll() is None):
-            try:
-                sPos = self._popen.stdout.readline().strip()
-                spaceIdx = sPos.index(' ')
-                fPos = float(sPos[:spaceIdx])
-            except ValueError:
-                pass
-            else:
-                if not isnan(fPos):
-                    if fPos < self._pos:
-                        continue
-                    self._pos = fPos
-                    return fPos
-        self._playing = False
-        self._pos = 0.0
-        return 0.0
+        if self._playing:
+            return self._clock.Now()
+        return self._pos
 
     @pos.setter
     def pos(self, __pos: float, /) -> None:
-        self._pos = __pos
         if self._playing:
-            self._popen.terminate()
+            self._StopPlayer()
+            self._pos = __pos
             self.Play()
+        else:
+            self._pos = __pos
 
     @property
     def playing(self) -> bool:
         return self._playing
 
+    @property
+    def endEvent(self) -> threading.Event:
+        """Gets the event which is set when the current playback reaches
+        the end of the stream, but not when it is paused or stopped.
+        Every call to `Play` makes a new event.
+        """
+        return self._endEvent
+
     def Play(self) -> None:
         args = [
             'ffplay',
@@ -185,7 +384,7 @@ class FFmpegMP3(AbstractMp3):
             str(self._volume),
             '-ss',
             str(timedelta(seconds=self._pos))]
-        self._popen = subprocess.Popen(
+        popen = subprocess.Popen(
             args,
             universal_newlines=True,
             encoding='utf-8',
@@ -193,24 +392,77 @@ class FFmpegMP3(AbstractMp3):
             stdin=subprocess.PIPE,
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT)
-        self._playing = True
+        endEvent = threading.Event()
+        with self._lock:
+            self._popen = popen
+            self._endEvent = endEvent
+            self._clock.Start(self._pos)
+            self._playing = True
+        threading.Thread(
+            target=self._ReadProgress,
+            args=(popen, endEvent,),
+            name='ffplay reader',
+            daemon=True).start()
 
     def Pause(self) -> None:
-        _ = self.pos
-        self._popen.terminate()
-        self._playing = False
+        self._StopPlayer()
 
     def Stop(self) -> None:
-        if self._popen:
-            self._popen.terminate()
+        self._StopPlayer()
         self._pos = 0.0
-        self._playing = False
 
     def Close(self) -> None:
-        try:
-            self._popen.terminate()
-        except AttributeError:
-            pass
+        self._StopPlayer()
+
+    def _StopPlayer(self) -> None:
+        """Terminates the current ffplay process, if any, and detaches
+        it so that its reader no longer updates the position.
+        """
+        with self._lock:
+            popen = self._popen
+            self._popen = None
+            if self._playing:
+                self._pos = self._clock.Now()
+                self._clock.Stop(self._pos)
+            self._playing = False
+        if popen:
+            popen.terminate()
+
+    def _ReadProgress(
+            self,
+            popen: subprocess.Popen[str],
+            end_event: threading.Event,
+            ) -> None:
+        """Reads the progress output of the ffplay process in a
+        background thread and keeps the latest position in `_pos`, and
+        reports it to the clock, while the process is the current one.
+        When the stream ends, `playing` becomes False, the position is
+        reset, and `end_event` is set.
+        """
+        for line in popen.stdout:
+            line = line.strip()
+            try:
+                fPos = float(line[:line.index(' ')])
+            except ValueError:
+                continue
+            if isnan(fPos):
+                continue
+            with self._lock:
+                if self._popen is not popen:
+                    break
+                if fPos > self._pos:
+                    self._pos = fPos
+                    self._clock.Report(fPos)
+        popen.wait()
+        popen.stdout.close()
+        with self._lock:
+            if self._popen is not popen:
+                return
+            self._popen = None
+            self._playing = False
+            self._pos = 0.0
+            self._clock.Stop(0.0)
+        end_event.set()
     
     def __exit__(
             self,
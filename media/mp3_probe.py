@@ -0,0 +1,353 @@
+#
+#
+#
+"""This module offers `ProbeMp3` function which reads the basic
+properties of MP3 files, duration, bit rate, sample rate, channels,
+encoder, and tags, in-process without spawning `ffprobe`. It finds the
+first MPEG audio frame after the ID3v2 tag and takes the duration from
+the Xing/Info or VBRI header of VBR files or, if there is none, from a
+scan of all frame headers. The result has the layout of the JSON output
+of `ffprobe -show_format -show_streams` so it can be used as
+`FFmpegMP3.RawData`.
+"""
+
+from __future__ import annotations
+import mmap
+from os import PathLike
+import os
+import struct
+from typing import Any
+
+from media.id3_frames import ENCODINGS, Id3Unsupported, ReadId3Frames, \
+    ReadString
+
+
+_BIT_RATES_V1 = (
+    0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 0,)
+"""The bit rates of MPEG-1 layer III frames in kbit/s by index."""
+
+_BIT_RATES_V2 = (
+    0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160, 0,)
+"""The bit rates of MPEG-2 and MPEG-2.5 layer III frames in kbit/s by
+index.
+"""
+
+_SAMPLE_RATES = {
+    3: (44_100, 48_000, 32_000,),
+    2: (22_050, 24_000, 16_000,),
+    0: (11_025, 12_000, 8_000,),}
+"""The sample rates by the version bits of frame headers, 3 for MPEG-1,
+2 for MPEG-2, and 0 for MPEG-2.5.
+"""
+
+_MAX_SYNC_SEARCH = 64 * 1024
+"""The maximum number of bytes searched for the first frame after the
+ID3v2 tag.
+"""
+
+_ID3_TAG_NAMES = {
+    b'TALB': 'album',
+    b'TCOM': 'composer',
+    b'TCON': 'genre',
+    b'TCOP': 'copyright',
+    b'TDRC': 'date',
+    b'TENC': 'encoded_by',
+    b'TIT2': 'title',
+    b'TLAN': 'language',
+    b'TPE1': 'artist',
+    b'TPE2': 'album_artist',
+    b'TPE3': 'performer',
+    b'TPOS': 'disc',
+    b'TPUB': 'publisher',
+    b'TRCK': 'track',
+    b'TSSE': 'encoder',
+    b'TYER': 'date',}
+"""The names of ID3 text frames in the tags of `ffprobe` output."""
+
+
+class _FrameHeader:
+    """The fields of an MPEG audio layer III frame header."""
+    __slots__ = (
+        'version',
+        'bitRate',
+        'sampleRate',
+        'channels',
+        'samples',
+        'length',)
+
+    def __init__(
+            self,
+            version: int,
+            bitRate: int,
+            sampleRate: int,
+            channels: int,
+            samples: int,
+            length: int,
+            ) -> None:
+        self.version = version
+        """The version bits, 3 for MPEG-1, 2 for MPEG-2, and 0 for
+        MPEG-2.5.
+        """
+        self.bitRate = bitRate
+        """The bit rate of the frame in bit/s."""
+        self.sampleRate = sampleRate
+        self.channels = channels
+        self.samples = samples
+        """The number of samples per channel in the frame."""
+        self.length = length
+        """The length of the frame in bytes including the header."""
+
+
+def _ParseFrameHeader(header: int) -> _FrameHeader | None:
+    """Parses the 32-bit frame header and returns its fields or None if
+    it is not a valid layer III header. Free format frames are not
+    supported.
+    """
+    if header & 0xFFE00000 != 0xFFE00000:
+        return None
+    version = (header >> 19) & 3
+    layer = (header >> 17) & 3
+    bitRateIdx = (header >> 12) & 15
+    sampleRateIdx = (header >> 10) & 3
+    if version == 1 or layer != 1 or bitRateIdx in (0, 15,) or \
+            sampleRateIdx == 3:
+        return None
+    padding = (header >> 9) & 1
+    channels = 1 if (header >> 6) & 3 == 3 else 2
+    sampleRate = _SAMPLE_RATES[version][sampleRateIdx]
+    if version == 3:
+        bitRate = _BIT_RATES_V1[bitRateIdx] * 1_000
+        samples = 1152
+    else:
+        bitRate = _BIT_RATES_V2[bitRateIdx] * 1_000
+        samples = 576
+    length = samples // 8 * bitRate // sampleRate + padding
+    return _FrameHeader(
+        version,
+        bitRate,
+        sampleRate,
+        channels,
+        samples,
+        length)
+
+
+def _FindFirstFrame(
+        data: mmap.mmap | bytes,
+        start: int,
+        ) -> tuple[int, _FrameHeader] | None:
+    """Finds the first frame at or after `start` which is followed by
+    another valid frame, to avoid false syncs in junk data.
+    """
+    stop = min(len(data) - 4, start + _MAX_SYNC_SEARCH)
+    pos = start
+    while pos < stop:
+        pos = data.find(b'\xFF', pos, stop)
+        if pos < 0:
+            break
+        frame = _ParseFrameHeader(
+            int.from_bytes(data[pos:pos + 4], 'big'))
+        if frame:
+            nextPos = pos + frame.length
+            if nextPos + 4 > len(data):
+                return pos, frame
+            nextFrame = _ParseFrameHeader(
+                int.from_bytes(data[nextPos:nextPos + 4], 'big'))
+            if nextFrame and nextFrame.sampleRate == frame.sampleRate:
+                return pos, frame
+        pos += 1
+    return None
+
+
+def _ReadXing(
+        data: mmap.mmap | bytes,
+        pos: int,
+        frame: _FrameHeader,
+        ) -> tuple[int | None, int | None, str] | None:
+    """Reads the Xing/Info header of the first frame at `pos` and returns
+    the number of frames, the number of bytes, and the encoder of the
+    LAME extension, or None if there is no such header.
+    """
+    if frame.version == 3:
+        sideInfo = 17 if frame.channels == 1 else 32
+    else:
+        sideInfo = 9 if frame.channels == 1 else 17
+    xingPos = pos + 4 + sideInfo
+    if data[xingPos:xingPos + 4] not in (b'Xing', b'Info',):
+        return None
+    flags = int.from_bytes(data[xingPos + 4:xingPos + 8], 'big')
+    fieldPos = xingPos + 8
+    nFrames = nBytes = None
+    if flags & 1:
+        nFrames = int.from_bytes(data[fieldPos:fieldPos + 4], 'big')
+        fieldPos += 4
+    if flags & 2:
+        nBytes = int.from_bytes(data[fieldPos:fieldPos + 4], 'big')
+        fieldPos += 4
+    if flags & 4:
+        # Skipping the table of contents...
+        fieldPos += 100
+    if flags & 8:
+        # Skipping the quality indicator...
+        fieldPos += 4
+    encoder = data[fieldPos:fieldPos + 9]
+    encoder = encoder.rstrip(b'\x00 ').decode('latin-1') \
+        if encoder[:4].isalpha() else ''
+    return nFrames, nBytes, encoder
+
+
+def _ReadVbri(
+        data: mmap.mmap | bytes,
+        pos: int,
+        ) -> tuple[int, int] | None:
+    """Reads the VBRI header of the first frame at `pos` and returns the
+    number of frames and bytes or None if there is no such header.
+    """
+    vbriPos = pos + 36
+    if data[vbriPos:vbriPos + 4] != b'VBRI':
+        return None
+    nBytes, nFrames = struct.unpack_from('>LL', data, vbriPos + 10)
+    return nFrames, nBytes
+
+
+def _ScanFrames(
+        data: mmap.mmap | bytes,
+        pos: int,
+        end: int,
+        ) -> tuple[int, int, int]:
+    """Walks the frame headers from `pos` to `end` and returns the total
+    number of samples, the number of frames, and the number of bytes of
+    frames. The scan stops at the first byte which is not a valid frame
+    header.
+    """
+    nSamples = nFrames = 0
+    start = pos
+    # Caching parsed headers which differ only in padding and flags...
+    cache: dict[int, _FrameHeader | None] = {}
+    from_bytes = int.from_bytes
+    while pos + 4 <= end:
+        header = from_bytes(data[pos:pos + 4], 'big')
+        key = header & 0xFFFFFC00
+        try:
+            frame = cache[key]
+        except KeyError:
+            frame = cache[key] = _ParseFrameHeader(key)
+        if frame is None:
+            break
+        nSamples += frame.samples
+        nFrames += 1
+        pos += frame.length + ((header >> 9) & 1)
+    return nSamples, nFrames, pos - start
+
+
+def _DecodeTags(frames: list[tuple[bytes, bytes]]) -> dict[str, str]:
+    """Converts ID3 text frames to the tags of `ffprobe` output."""
+    tags: dict[str, str] = {}
+    for frameId, body in frames:
+        if not body or body[0] >= len(ENCODINGS):
+            continue
+        encoding = body[0]
+        values: list[str] = []
+        pos = 1
+        if frameId == b'TXXX':
+            name, pos = ReadString(body, pos, encoding)
+        else:
+            name = _ID3_TAG_NAMES.get(frameId, frameId.decode('latin-1'))
+        while pos < len(body):
+            value, pos = ReadString(body, pos, encoding)
+            values.append(value)
+        if values and name:
+            tags[name] = ';'.join(values)
+    return tags
+
+
+class _TextFrameIds:
+    """A container of the IDs of all ID3v2.3 and ID3v2.4 text frames."""
+    def __contains__(self, frameId: bytes) -> bool:
+        return len(frameId) == 4 and frameId[:1] == b'T'
+
+
+def ProbeMp3(filename: str | PathLike) -> dict[str, Any] | None:
+    """Reads the basic properties of the specified MP3 file and returns
+    them in the layout of `ffprobe` JSON output or None if the file is
+    not a plain layer III stream this function can read, for example if
+    it is truncated or its tag is malformed, in which case `ffprobe`
+    should be used.
+
+    #### Exceptions:
+    * `OSError`: the file cannot be read
+    """
+    try:
+        return _ProbeMp3(filename)
+    except (ValueError, IndexError, struct.error):
+        return None
+
+
+def _ProbeMp3(filename: str | PathLike) -> dict[str, Any] | None:
+    """Implements `ProbeMp3` but lets parse errors of malformed files
+    propagate.
+    """
+    with open(filename, mode='rb') as file:
+        try:
+            id3 = ReadId3Frames(file, _TextFrameIds())
+            tags = _DecodeTags(id3.frames)
+            audioStart = id3.size
+        except Id3Unsupported:
+            return None
+        if id3.major == 2:
+            # ID3v2.2 frame IDs are not mapped to names...
+            return None
+        fileSize = os.fstat(file.fileno()).st_size
+        if fileSize <= audioStart + 4:
+            return None
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            found = _FindFirstFrame(data, audioStart)
+            if found is None:
+                return None
+            pos, frame = found
+            audioEnd = fileSize
+            if fileSize >= 128 and \
+                    data[fileSize - 128:fileSize - 125] == b'TAG':
+                # Excluding the ID3v1 tag...
+                audioEnd -= 128
+            encoder = ''
+            nFrames = nBytes = None
+            xing = _ReadXing(data, pos, frame)
+            if xing:
+                nFrames, nBytes, encoder = xing
+            else:
+                vbri = _ReadVbri(data, pos)
+                if vbri:
+                    nFrames, nBytes = vbri
+            if nFrames:
+                duration = nFrames * frame.samples / frame.sampleRate
+                if not nBytes:
+                    nBytes = audioEnd - pos
+            else:
+                nSamples, _, nBytes = _ScanFrames(data, pos, audioEnd)
+                duration = nSamples / frame.sampleRate
+    if duration <= 0:
+        return None
+    bitRate = round(nBytes * 8 / duration)
+    stream: dict[str, Any] = {
+        'index': 0,
+        'codec_name': 'mp3',
+        'codec_long_name': 'MP3 (MPEG audio layer 3)',
+        'codec_type': 'audio',
+        'sample_rate': str(frame.sampleRate),
+        'channels': frame.channels,
+        'channel_layout': 'mono' if frame.channels == 1 else 'stereo',
+        'duration': f'{duration:.6f}',
+        'bit_rate': str(bitRate),}
+    if encoder:
+        stream['tags'] = {'encoder': encoder}
+    return {
+        'streams': [stream],
+        'format': {
+            'filename': os.fspath(filename),
+            'nb_streams': 1,
+            'format_name': 'mp3',
+            'format_long_name': 'MP2/3 (MPEG audio layer 2/3)',
+            'duration': duration,
+            'size': str(fileSize),
+            'bit_rate': bitRate,
+            'tags': tags,},}
@@ -0,0 +1,426 @@
+#
+#
+#
+"""This module converts lyrics between LRC and the SRT, WebVTT, ASS, and
+SSA subtitle formats. Conversions stream in both directions: lyrics and cues
+are consumed and produced by generators one line at a time, so batch
+converting many files never materializes a whole document in memory.
+
+The end time of a cue exported from LRC is the next later timestamp, an
+empty lyrics line which clears the previous one, or, for the last cue,
+the duration of the audio such as `AbstractMp3.Duration`.
+"""
+
+from __future__ import annotations
+from os import PathLike
+from pathlib import Path
+import re
+from typing import Iterable, Iterator, NamedTuple
+
+from media.lrc import Lrc, LyricsItem, Timestamp, _WriteAtomically
+
+
+class Cue(NamedTuple):
+    """A subtitle cue with its start and end times in milliseconds."""
+    start: int
+    end: int
+    text: str
+    words: tuple[tuple[int, int], ...] = ()
+    """The word-level timing of the text as pairs of the offset of every
+    word in the text and its start time in milliseconds.
+    """
+
+
+LAST_CUE_LENGTH: int = 5_000
+"""The length of the last cue in milliseconds if the duration of the
+audio is not known.
+"""
+
+SUBTITLE_EXTS: tuple[str, ...] = ('.srt', '.vtt', '.ass', '.ssa',)
+
+
+_SRT_TIME_REGEX = re.compile(r'''
+    (?:(?P<h1>\d+):)?(?P<m1>\d{1,2}):(?P<s1>\d{1,2})[,.](?P<ms1>\d{1,3})
+    \s*-->\s*
+    (?:(?P<h2>\d+):)?(?P<m2>\d{1,2}):(?P<s2>\d{1,2})[,.](?P<ms2>\d{1,3})''',
+    re.VERBOSE)
+"""Matches the timing line of SRT and WebVTT cues. Hours are optional
+in WebVTT and the decimal separator is a comma in SRT.
+"""
+
+_HTML_TAG_REGEX = re.compile(r'<[^>]*>')
+
+_ASS_TIME_REGEX = re.compile(r'(\d+):(\d{1,2}):(\d{1,2})[.:](\d{1,2})')
+
+_ASS_OVERRIDE_REGEX = re.compile(r'\{[^}]*\}')
+
+
+def _FormatTime(ms: int, sep: str) -> str:
+    """Formats milliseconds as `HH:MM:SS<sep>mmm`."""
+    secs, ms = divmod(ms, 1_000)
+    mins, ss = divmod(secs, 60)
+    hh, mm = divmod(mins, 60)
+    return f'{hh:02}:{mm:02}:{ss:02}{sep}{ms:03}'
+
+
+def _FormatAssTime(ms: int) -> str:
+    """Formats milliseconds as `H:MM:SS.cc` of ASS."""
+    cs = (ms + 5) // 10
+    secs, cs = divmod(cs, 100)
+    mins, ss = divmod(secs, 60)
+    hh, mm = divmod(mins, 60)
+    return f'{hh}:{mm:02}:{ss:02}.{cs:02}'
+
+
+def _MatchToMs(match: re.Match, suffix: str) -> int:
+    """Returns the milliseconds of one side of a match of
+    `_SRT_TIME_REGEX`.
+    """
+    hh = match['h' + suffix]
+    # Right-padding the fraction so that ',5' means 500 milliseconds...
+    ms = int(match['ms' + suffix].ljust(3, '0'))
+    return (
+        ((int(hh) if hh else 0) * 60 + int(match['m' + suffix])) * 60
+        + int(match['s' + suffix])) * 1_000 + ms
+
+
+def IterLyricsCues(
+        lyrics: Iterable[LyricsItem],
+        duration: float | None = None,
+        offset: int = 0,
+        ) -> Iterator[Cue]:
+    """Yields the cues of timed lyrics in order, looking only one lyrics
+    item ahead. Lyrics items with empty text end the previous cue and
+    yield nothing. `duration`, in seconds, is the end of the last cue;
+    if it is not provided, the last cue lasts `LAST_CUE_LENGTH`. `offset`
+    is the value of the `[offset:]` tag in milliseconds which is
+    subtracted from all timestamps.
+
+    #### Exceptions:
+    * `ValueError`: a lyrics item does not have a timestamp
+    """
+    pending: LyricsItem | None = None
+    pendingStart = 0
+    for item in lyrics:
+        if item.timestamp is None:
+            raise ValueError('some lyrics do not have a timestamp')
+        start = max(0, item.timestamp.ToMilliseconds() - offset)
+        if pending is not None and start > pendingStart:
+            yield _MakeCue(pending, pendingStart, start, offset)
+            pending = None
+        if item.text:
+            if pending is None:
+                pending, pendingStart = item, start
+            else:
+                # Keeping lines with the same timestamp in one cue...
+                pending = LyricsItem(f'{pending.text}\n{item.text}')
+    if pending is not None:
+        end = pendingStart + LAST_CUE_LENGTH if duration is None \
+            else max(pendingStart, round(duration * 1_000))
+        yield _MakeCue(pending, pendingStart, end, offset)
+
+
+def _MakeCue(item: LyricsItem, start: int, end: int, offset: int) -> Cue:
+    words = item.words
+    if not words:
+        return Cue(start, end, item.text)
+    return Cue(
+        start,
+        end,
+        item.text,
+        tuple(
+            (words[idx], max(0, words[idx + 1] - offset),)
+            for idx in range(0, len(words), 2)))
+
+
+def IterSrtLines(cues: Iterable[Cue]) -> Iterator[str]:
+    """Yields the lines of an SRT document of `cues`."""
+    for idx, cue in enumerate(cues, 1):
+        yield f'{idx}\n'
+        yield (
+            f'{_FormatTime(cue.start, ",")} --> '
+            f'{_FormatTime(cue.end, ",")}\n')
+        # Blank lines end cues in SRT, dropping them from the text...
+        for line in cue.text.splitlines():
+            if line.strip():
+                yield f'{line}\n'
+        yield '\n'
+
+
+def IterVttLines(cues: Iterable[Cue]) -> Iterator[str]:
+    """Yields the lines of a WebVTT document of `cues`."""
+    yield 'WEBVTT\n'
+    yield '\n'
+    for cue in cues:
+        yield (
+            f'{_FormatTime(cue.start, ".")} --> '
+            f'{_FormatTime(cue.end, ".")}\n')
+        for line in cue.text.splitlines():
+            if line.strip():
+                # '-->' is not allowed in the payload of WebVTT cues...
+                yield line.replace('-->', '->') + '\n'
+        yield '\n'
+
+
+def IterAssLines(cues: Iterable[Cue], title: str = '') -> Iterator[str]:
+    """Yields the lines of an ASS document of `cues` with a default
+    style. Word-level timing of enhanced LRC lines becomes karaoke
+    `{\\k}` tags.
+    """
+    yield '[Script Info]\n'
+    if title:
+        yield f'Title: {title}\n'
+    yield 'ScriptType: v4.00+\n'
+    yield '\n'
+    yield '[V4+ Styles]\n'
+    yield (
+        'Format: Name, Fontname, Fontsize, PrimaryColour, '
+        'SecondaryColour, OutlineColour, BackColour, Bold, Italic, '
+        'Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, '
+        'BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, '
+        'MarginV, Encoding\n')
+    yield (
+        'Style: Default,Arial,20,&H00FFFFFF,&H000000FF,&H00000000,'
+        '&H00000000,0,0,0,0,100,100,0,0,1,2,2,2,10,10,10,1\n')
+    yield '\n'
+    yield '[Events]\n'
+    yield (
+        'Format: Layer, Start, End, Style, Name, MarginL, MarginR, '
+        'MarginV, Effect, Text\n')
+    yield from _IterAssEvents(cues, '0')
+
+
+def IterSsaLines(cues: Iterable[Cue], title: str = '') -> Iterator[str]:
+    """Yields the lines of an SSA v4 document of `cues` with a default
+    style. Word-level timing of enhanced LRC lines becomes karaoke
+    `{\\k}` tags.
+    """
+    yield '[Script Info]\n'
+    if title:
+        yield f'Title: {title}\n'
+    yield 'ScriptType: v4.00\n'
+    yield '\n'
+    yield '[V4 Styles]\n'
+    yield (
+        'Format: Name, Fontname, Fontsize, PrimaryColour, '
+        'SecondaryColour, TertiaryColour, BackColour, Bold, Italic, '
+        'BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, '
+        'MarginV, AlphaLevel, Encoding\n')
+    # Colours of SSA are decimal BGR values...
+    yield (
+        'Style: Default,Arial,20,16777215,255,0,0,0,0,1,2,2,2,10,10,10,'
+        '0,1\n')
+    yield '\n'
+    yield '[Events]\n'
+    yield (
+        'Format: Marked, Start, End, Style, Name, MarginL, MarginR, '
+        'MarginV, Effect, Text\n')
+    yield from _IterAssEvents(cues, 'Marked=0')
+
+
+def _IterAssEvents(cues: Iterable[Cue], first: str) -> Iterator[str]:
+    """Yields the `Dialogue` lines of ASS or SSA `cues`. `first` is the
+    value of the first field, `Layer` of ASS or `Marked` of SSA.
+    """
+    for cue in cues:
+        yield (
+            f'Dialogue: {first},{_FormatAssTime(cue.start)},'
+            f'{_FormatAssTime(cue.end)},Default,,0,0,0,,'
+            f'{_GetAssText(cue)}\n')
+
+
+def _EscapeAss(text: str) -> str:
+    return text.replace('{', '(').replace('}', ')').replace('\n', '\\N')
+
+
+def _GetAssText(cue: Cue) -> str:
+    """Returns the text of the cue for ASS events."""
+    if not cue.words:
+        return _EscapeAss(cue.text)
+    parts = [_EscapeAss(cue.text[:cue.words[0][0]])]
+    for idx, (offset, start) in enumerate(cue.words):
+        try:
+            nextOffset, nextStart = cue.words[idx + 1]
+        except IndexError:
+            nextOffset, nextStart = len(cue.text), cue.end
+        cs = max(0, round((nextStart - start) / 10))
+        parts.append(f'{{\\k{cs}}}')
+        parts.append(_EscapeAss(cue.text[offset:nextOffset]))
+    return ''.join(parts)
+
+
+def IterSrtCues(lines: Iterable[str]) -> Iterator[Cue]:
+    """Yields the cues of SRT or WebVTT `lines`, for example an opened
+    text file, in the order of the document. Blocks without a timing
+    line, such as the WebVTT header or notes, are skipped and markup
+    tags are removed from the text.
+    """
+    times: re.Match | None = None
+    texts: list[str] = []
+    for line in lines:
+        line = line.strip().lstrip('\ufeff')
+        if not line:
+            # Reaching the end of a block...
+            if times:
+                yield _MakeSrtCue(times, texts)
+            times = None
+            texts = []
+        elif times is None:
+            # Looking for the timing line, skipping identifiers...
+            times = _SRT_TIME_REGEX.match(line)
+        else:
+            texts.append(_HTML_TAG_REGEX.sub('', line))
+    if times:
+        yield _MakeSrtCue(times, texts)
+
+
+def _MakeSrtCue(times: re.Match, texts: list[str]) -> Cue:
+    return Cue(_MatchToMs(times, '1'), _MatchToMs(times, '2'), ' '.join(texts))
+
+
+def IterAssCues(lines: Iterable[str]) -> Iterator[Cue]:
+    """Yields the cues of the `Dialogue` events of ASS or SSA `lines`,
+    for example an opened text file, in the order of the document.
+    Override tags are removed from the text.
+    """
+    inEvents = False
+    fields: list[str] = []
+    for line in lines:
+        line = line.strip().lstrip('\ufeff')
+        if line.startswith('['):
+            inEvents = line.lower() == '[events]'
+            continue
+        if not inEvents:
+            continue
+        key, sep, value = line.partition(':')
+        if not sep:
+            continue
+        key = key.strip().lower()
+        if key == 'format':
+            fields = [field.strip().lower() for field in value.split(',')]
+        elif key == 'dialogue' and fields:
+            values = value.split(',', len(fields) - 1)
+            if len(values) != len(fields):
+                continue
+            event = dict(zip(fields, values))
+            start = _ParseAssTime(event.get('start', ''))
+            end = _ParseAssTime(event.get('end', ''))
+            if start is None or end is None:
+                continue
+            text = _ASS_OVERRIDE_REGEX.sub('', event.get('text', ''))
+            text = text.replace('\\N', ' ').replace('\\n', ' ')
+            yield Cue(start, end, text.replace('\\h', ' ').strip())
+
+
+def _ParseAssTime(value: str) -> int | None:
+    match = _ASS_TIME_REGEX.fullmatch(value.strip())
+    if not match:
+        return None
+    hh, mm, ss, cs = match.groups()
+    return (
+        ((int(hh) * 60 + int(mm)) * 60 + int(ss)) * 1_000
+        + int(cs.ljust(2, '0')) * 10)
+
+
+def IterCueLyrics(cues: Iterable[Cue]) -> Iterator[LyricsItem]:
+    """Yields timed lyrics items of `cues`. If a cue ends before the
+    next one starts, an empty lyrics item is yielded at its end to clear
+    it. The result can be assigned to `Lrc.lyrics`.
+    """
+    FromMilliseconds = Timestamp.FromMilliseconds
+    prevEnd: int | None = None
+    for cue in cues:
+        if prevEnd is not None and prevEnd < cue.start:
+            yield LyricsItem('', FromMilliseconds(prevEnd))
+        yield LyricsItem(cue.text, FromMilliseconds(cue.start))
+        prevEnd = cue.end if prevEnd is None else max(prevEnd, cue.end)
+    if prevEnd is not None:
+        yield LyricsItem('', FromMilliseconds(prevEnd))
+
+
+def IterLrcLines(
+        lyrics: Iterable[LyricsItem],
+        tags: Iterable[tuple[str, str]] = (),
+        ) -> Iterator[str]:
+    """Yields the lines of an LRC document of `tags` and timed
+    `lyrics`.
+    """
+    for tag, value in tags:
+        yield f'[{tag}:{value}]\n'
+    for item in lyrics:
+        yield f'[{item.timestamp}]{item.GetEnhancedText()}\n'
+
+
+def IterSubtitleCues(filename: str | PathLike) -> Iterator[Cue]:
+    """Opens the specified subtitle file and yields its cues. The format
+    is determined by the extension of the file, one of `SUBTITLE_EXTS`.
+
+    #### Exceptions:
+    * `ValueError`: the extension is not a supported subtitle format
+    """
+    suffix = Path(filename).suffix.lower()
+    if suffix not in SUBTITLE_EXTS:
+        raise ValueError(f"'{suffix}' is not a supported subtitle format")
+    Parse = IterAssCues if suffix in ('.ass', '.ssa',) else IterSrtCues
+    return _IterFileCues(filename, Parse)
+
+
+def _IterFileCues(filename: str | PathLike, Parse) -> Iterator[Cue]:
+    """Yields the cues of the file parsed by `Parse` and closes the file
+    when exhausted.
+    """
+    with open(filename, mode='rt', encoding='utf-8-sig') as file:
+        yield from Parse(file)
+
+
+def ExportSubtitles(
+        lrc: Lrc,
+        filename: str | PathLike,
+        duration: float | None = None,
+        ) -> None:
+    """Writes the timed lyrics of `lrc` to the specified subtitle file
+    whose format is determined by its extension, one of
+    `SUBTITLE_EXTS`. The `[offset:]` tag of `lrc` is applied. `duration`
+    is the length of the audio in seconds, for example
+    `AbstractMp3.Duration`, which ends the last cue.
+
+    #### Exceptions:
+    * `ValueError`: the extension is not a supported subtitle format or
+    some lyrics do not have a timestamp, in which case the file is not
+    touched
+    """
+    suffix = Path(filename).suffix.lower()
+    cues = IterLyricsCues(lrc.lyrics, duration, lrc.GetOffset())
+    if suffix == '.srt':
+        lines = IterSrtLines(cues)
+    elif suffix == '.vtt':
+        lines = IterVttLines(cues)
+    elif suffix in ('.ass', '.ssa',):
+        title = lrc.tags.get('ti', '')
+        if not isinstance(title, str):
+            title = title[-1]
+        IterLines = IterAssLines if suffix == '.ass' else IterSsaLines
+        lines = IterLines(cues, title)
+    else:
+        raise ValueError(f"'{suffix}' is not a supported subtitle format")
+    _WriteAtomically(filename, _IterEncoded(lines))
+
+
+def ImportSubtitles(
+        filename: str | PathLike,
+        lrc_file: str | PathLike,
+        ) -> None:
+    """Converts the specified subtitle file to the `lrc_file` LRC file,
+    streaming one line at a time.
+
+    #### Exceptions:
+    * `ValueError`: the extension is not a supported subtitle format
+    """
+    lyrics = IterCueLyrics(IterSubtitleCues(filename))
+    _WriteAtomically(lrc_file, _IterEncoded(IterLrcLines(lyrics)))
+
+
+def _IterEncoded(lines: Iterable[str]) -> Iterator[bytes]:
+    """Yields the UTF-8 representation of `lines`."""
+    for line in lines:
+        yield line.encode('utf-8')
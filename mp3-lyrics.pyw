@@ -11,9 +11,12 @@ try:
 except ImportError:
     sys.stderr.write("'mp3.py' has not been found")
     sys.exit(1)
+from media.lrc_cache import LrcCache
+from media.metadata_cache import MetadataCache
 from mp3_lyrics_win import Mp3LyricsWin
 from app_utils import AppSettings
 from app_utils import ConfigureLogging, SetUnsupFile
+from utils.ops import SetLrcCache, SetLyricsPacks, SetMetadataCache
 
 
 # Definning global variables...
@@ -54,6 +57,14 @@ if __name__ == '__main__':
             pass
     AppSettings().Load(filename)
 
+    # Configuring the cache of parsed LRC files...
+    SetLrcCache(LrcCache(_APP_DIR / 'cache' / 'lrc'))
+    # Configuring zip lyrics packs which are put in the 'packs' folder...
+    SetLyricsPacks(sorted((_APP_DIR / 'packs').glob('*.zip')))
+    # Configuring the cache of tags and probe data of audios...
+    metadataCache = MetadataCache(_APP_DIR / 'cache' / 'metadata.sqlite3')
+    SetMetadataCache(metadataCache)
+
     # Starting the Async I/O thread...
     asyncioThrd = AsyncioThrd(name='AsyncioThrd')
     asyncioThrd.start()
@@ -70,3 +81,5 @@ if __name__ == '__main__':
     AppSettings().Save()
     print('Closing the Async I/O thread...')
     asyncioThrd.close()
+    SetMetadataCache(None)
+    metadataCache.Close()
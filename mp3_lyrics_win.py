@@ -25,9 +25,10 @@ from media.abstract_mp3 import AbstractMp3, MP3NotFoundError
 from app_utils import AppSettings
 from asyncio_thrd import AsyncioThrd
 from media import AbstractPlaylist
-from media.lrc import Lrc, Timestamp
+from media.lrc import Lrc, LrcErrors, LyricsTimeline, MergeLyrics, \
+    Timestamp
+from media.lrc_journal import LrcJournal
 from utils.async_ops import AsyncOpManager, AsyncOp
-from utils.sorted_list import SortedList, CollisionPolicy
 from utils.types import (
     AppStatus,
     GifImage,
@@ -76,6 +77,13 @@ class Mp3LyricsWin(tk.Tk):
         """
         self._lrc: Lrc | None = None
         """The LRC object associated with the current MP3 file."""
+        self._lrcTranslations: list[Lrc] = []
+        """The language-specific LRC objects, such as `song.fa.lrc`,
+        associated with the current MP3 file which are shown under the
+        lyrics of `_lrc` in the lyrics view.
+        """
+        self._lrcJournal: LrcJournal | None = None
+        """The journal of unsaved edits of `_lrc` in the lyrics editor."""
         self._playlist: PathLike | AbstractPlaylist | None = None
         """Specifies the playlist object or its path during loading the
         playlist.
@@ -116,9 +124,10 @@ class Mp3LyricsWin(tk.Tk):
         """Specifies what to do when the playback of the current file
         finishes. Its value is integer number of AfterPlayed enumeration.
         """
-        self._timestamps: SortedList[float] = SortedList(
-            cp=CollisionPolicy.END)
-        """The timestamps of the loaded LRC files."""
+        self._timeline: LyricsTimeline | None = None
+        """The timeline of the loaded LRC file if its timestamps are
+        Ok.
+        """
         # Loading resources...
         self._IMG_PLAY: PIL.ImageTk.PhotoImage
         self._HIMG_PLAY: PIL.Image.Image
@@ -833,6 +842,7 @@ class Mp3LyricsWin(tk.Tk):
             self._playlistAsyncOp = self._asyncManager.InitiateOp(
                 start_cb=LoadPlaylist,
                 start_args=(playlist, self,),
+                start_kwargs={'mp3_class': self._Mp3Class},
                 finish_cb=self._OnPlaylistLoaded,
                 cancel_cb=self._OnPlaylistLoadingCanceled,
                 cancel_args=(playlist,),
@@ -926,7 +936,7 @@ class Mp3LyricsWin(tk.Tk):
         if self._lrcAsyncOp is None:
             self._lrcAsyncOp = self._asyncManager.InitiateOp(
                 start_cb=LoadLrc,
-                start_args=(pthLrc,),
+                start_args=(pthLrc, audio_file,),
                 finish_cb=self._OnLrcLoaded,
                 cancel_cb=self._OnLoadingLrcCanceled,
                 cancel_args=(pthLrc,),
@@ -934,10 +944,13 @@ class Mp3LyricsWin(tk.Tk):
         elif not self._lrcAsyncOp.HasCanceled():
             self._lrcAsyncOp.cancelArgs = tuple([
                 *self._lrcAsyncOp.cancelArgs,
-                pthLrc])
+                audio_file])
             self._lrcAsyncOp.Cancel()
 
-    def _OnLrcLoaded(self, obj: Future[Lrc] | Lrc) -> None:
+    def _OnLrcLoaded(
+            self,
+            obj: Future[tuple[Lrc, list[Lrc]]] | Lrc,
+            ) -> None:
         """This callback must be fired whenever an LRC object is loaded
         or when the `Lrc` object has changed and we want to reflect the
         changes in the GUI.
@@ -945,7 +958,7 @@ class Mp3LyricsWin(tk.Tk):
         self._lrcAsyncOp = None
         if isinstance(obj, Future):
             try:
-                self._lrc = obj.result()
+                self._lrc, self._lrcTranslations = obj.result()
             except FileNotFoundError:
                 self._msgvw.AddMessage(
                     title='No LRC',
@@ -962,7 +975,7 @@ class Mp3LyricsWin(tk.Tk):
     def _OnLoadingLrcCanceled(
             self,
             old_lrc: PathLike,
-            new_lrc: PathLike | None = None,
+            new_audio: PathLike | None = None,
             ) -> None:
         """This callback is triggered when loading of a playlist has
         been canceled.
@@ -970,8 +983,8 @@ class Mp3LyricsWin(tk.Tk):
         msg = f"Loading the LRC file '{old_lrc}' was canceled."
         self._msgvw.AddMessage(message=msg)
         self._lrcAsyncOp = None
-        if new_lrc is not None:
-            self._LoadLrc(new_lrc)
+        if new_audio is not None:
+            self._LoadLrc(new_audio)
 
     def _LoadAudio(self, audio: PathLike) -> None:
         """Loads the specified audio both as an object into `_audio` and
@@ -1029,7 +1042,7 @@ class Mp3LyricsWin(tk.Tk):
                 f"There was a problem converting {self._pos}"
                 + f" to a {Timestamp} object")
         # Checking whether the MP3 has finished or not...
-        if not self._audio.playing:
+        if self._audio.endEvent.is_set():
             # The MP3 finished, deciding on the action...
             self._DecideAfterPlayed()
             return
@@ -1042,16 +1055,9 @@ class Mp3LyricsWin(tk.Tk):
             # Updating Play Time slider...
             self._slider_playTime.set(self._pos)
         # Highlighting the current lyrics...
-        _, idx = self._timestamps.index(self._pos)
-        try:
-            self._lrcvw.Highlight(idx - 1)
-        except TypeError:
-            msg = '\n'.join((
-                'E-2-1',
-                repr(self._timestamps),
-                f"idx: {idx}"))
-            logging.error('\n'.join(msg), stack_info=True)
-            print(msg)
+        if self._timeline:
+            idx, _ = self._timeline.Update(self._pos)
+            self._lrcvw.Highlight(idx)
         self._syncPTAfterID = self.after(
             self._TIME_PLAYBACK,
             self._SyncPTSlider)
@@ -1309,6 +1315,7 @@ class Mp3LyricsWin(tk.Tk):
             toSave = askyesno(message='Do you want to save the LRC?')
             if toSave:
                 self._SaveCreateLrc(exhibit_gui=False)
+        self._DiscardLrcJournal()
         # Saving settings...
         settings: dict[str, Any] = {}
         # Getting the geometry of the MP3 Lyrics Window (MLW)...
@@ -1376,6 +1383,15 @@ class Mp3LyricsWin(tk.Tk):
         whether the saved LRC must be reflected in the GUI.
         """
         if self._audio and self._lrcedt.HasChanged():
+            if self._lrcedt.timestampsErrors & (
+                    LrcErrors.OUT_OF_ORDER | LrcErrors.DUPLICATE_TIMESTAMPS):
+                self._msgvw.AddMessage(
+                    title='Save/create command',
+                    message=(
+                        'Timestamps in the lyrics editor must be unique '
+                        'and in order.'),
+                    type_=MessageType.ERROR)
+                return
             if self._lrc is None:
                 lrcFilename = Lrc.GetLrcFilename(self._audio.Filename)
                 Lrc.CreateLrc(lrcFilename)
@@ -1384,8 +1400,11 @@ class Mp3LyricsWin(tk.Tk):
             self._lrc['by'] = 'https://twitter.com/megacodist'
             self._lrc['re'] = 'https://github.com/megacodist/mp3-lyrics'
             self._lrc.Save()
+            if self._lrcJournal:
+                # Starting a new journal based on the saved content...
+                self._lrcJournal.Begin(self._lrc)
             if exhibit_gui:
-                self._timestamps.clear()
+                self._timeline = None
                 self._OnLrcLoaded(self._lrc)
         elif self._audio:
             self._msgvw.AddMessage(
@@ -1403,6 +1422,7 @@ class Mp3LyricsWin(tk.Tk):
             toDelete = askyesno(message='Do you want to delete the LRC?')
             if toDelete:
                 pLrc.unlink()
+                self._DiscardLrcJournal()
                 del self._lrc
                 self._lrc = None
                 self._ExhibitLrc_Gui()
@@ -1486,12 +1506,14 @@ class Mp3LyricsWin(tk.Tk):
                 message='Do you want to save/create the lyrics?')
             if toSave:
                 self._SaveCreateLrc(exhibit_gui=False)
-        self._timestamps.clear()
+        self._DiscardLrcJournal()
+        self._timeline = None
         self._lrcvw.Clear()
         self._lrcedt.ClearContent()
         self._lrcedt.SetChangeOrigin()
         self._infovw.ClearLrcInfo()
         self._lrc = None
+        self._lrcTranslations = []
     
     def _ExhibitLrc_Gui(self) -> None:
         """Updates the GUI to show the content of the loaded `_lrc`.
@@ -1499,18 +1521,30 @@ class Mp3LyricsWin(tk.Tk):
         loaded.
         """
         # Populating the lyrics view...
-        self._timestamps.clear()
+        self._timeline = None
         allLyrics = [li.text for li in self._lrc.lyrics]
-        if self._lrc.AreTimstampsOk():
+        translations = [
+            lrc
+            for lrc in self._lrcTranslations
+            if lrc.AreTimstampsOk()]
+        if self._lrc.AreTimstampsOk() and translations:
+            # Stacking translations under the lyrics in one timeline...
+            merged = MergeLyrics([
+                lrc.Retimed(bakeOffset=True).lyrics
+                for lrc in (self._lrc, *translations,)])
+            self._lrcvw.Populate([li.text for li in merged], True)
+            self._timeline = LyricsTimeline(merged)
+        elif self._lrc.AreTimstampsOk():
             self._lrcvw.Populate(allLyrics, True)
-            self._timestamps.merge([
-                lrcItem.timestamp.ToFloat()
-                for lrcItem in self._lrc.lyrics])
+            self._timeline = LyricsTimeline(
+                self._lrc.lyrics,
+                self._lrc.GetOffset())
         else:
             self._lrcvw.Populate(allLyrics, False)
         # Populating the lyrics editor...
         self._lrcedt.Populate(self._lrc.lyrics)
         self._lrcedt.SetChangeOrigin()
+        self._StartLrcJournal()
         # Populating the info view...
         self._infovw.PopulateLrcInfo(self._lrc)
         # Adding a message if necessary...
@@ -1524,6 +1558,38 @@ class Mp3LyricsWin(tk.Tk):
                 message='\n'.join(message),
                 type_=MessageType.WARNING)
 
+    def _StartLrcJournal(self) -> None:
+        """Starts journaling the edits of `_lrc` in the lyrics editor. If
+        a journal of a previous session, for example one ended by a
+        crash, still applies to the LRC file, it offers to recover its
+        edits into the editor.
+        """
+        self._lrcJournal = LrcJournal(
+            self._lrc.filename,
+            master=self,
+            rows_cb=self._lrcedt.GetAllLyricsItems)
+        rows = self._lrcJournal.Replay(self._lrc)
+        toRecover = rows is not None and askyesno(
+            title='Unsaved lyrics',
+            message=(
+                'Unsaved edits of a previous session were found for '
+                f"'{self._lrc.filename}'. Do you want to recover them?"))
+        self._lrcJournal.Begin(self._lrc)
+        if toRecover:
+            self._lrcedt.Populate(rows)
+            # Keeping recovered edits in the new journal...
+            self._lrcJournal.Checkpoint(rows)
+        self._lrcedt.journal = self._lrcJournal
+
+    def _DiscardLrcJournal(self) -> None:
+        """Deletes the journal of `_lrc`, if any, because its edits have
+        been saved or declined.
+        """
+        if self._lrcJournal:
+            self._lrcJournal.Discard()
+        self._lrcJournal = None
+        self._lrcedt.journal = None
+
     def _ShowAudioPos_Gui(self, __pos: float, /) -> None:
         """Reflects the provided value in the play-time slider and clock.
         """
@@ -0,0 +1,45 @@
+#
+#
+#
+"""Tests of reading and writing lyrics embedded in ID3 tags."""
+
+from pathlib import Path
+
+from benchmarks.mp3_probe import MakeMp3
+from media.id3_lyrics import ReadId3Lyrics, WriteId3Lyrics
+from media.lrc import Lrc
+
+
+_TEXT = (
+    '[00:01.00]Plain line\n'
+    '[00:02.00]<00:02.00>Timed <00:02.50>words\n'
+    '[00:04.00]Last line\n')
+
+
+def test_sylt_round_trip_keeps_lines_and_words(tmp_path: Path) -> None:
+    mp3File = tmp_path / 'song.mp3'
+    MakeMp3(mp3File, 8, False)
+    WriteId3Lyrics(mp3File, Lrc.FromStr(_TEXT))
+    lrc = ReadId3Lyrics(mp3File)
+    assert lrc is not None
+    expected = Lrc.FromStr(_TEXT).lyrics
+    assert [item.text for item in lrc.lyrics] == [
+        item.text for item in expected]
+    assert [item.timestamp for item in lrc.lyrics] == [
+        item.timestamp for item in expected]
+    assert lrc.lyrics[1].words.tolist() == expected[1].words.tolist()
+
+
+def test_file_without_tag_has_no_lyrics(tmp_path: Path) -> None:
+    mp3File = tmp_path / 'song.mp3'
+    MakeMp3(mp3File, 8, False)
+    assert ReadId3Lyrics(mp3File) is None
+
+
+def test_unparsable_tag_has_no_lyrics(tmp_path: Path) -> None:
+    mp3File = tmp_path / 'song.mp3'
+    MakeMp3(mp3File, 8, False)
+    # Prepending an ID3v2.5 header, which no reader supports...
+    header = b'ID3\x05\x00\x00\x00\x00\x00\x10'
+    mp3File.write_bytes(header + bytes(16) + mp3File.read_bytes())
+    assert ReadId3Lyrics(mp3File) is None
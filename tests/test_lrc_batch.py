@@ -0,0 +1,57 @@
+#
+#
+#
+"""Tests of processing LRC files by `lrc_batch`."""
+
+from pathlib import Path
+import sys
+
+import pytest
+
+from lrc_batch import ProcessLrc, main
+
+
+def test_tags_only_reads_tags(tmp_path: Path) -> None:
+    lrcFile = tmp_path / 'song.lrc'
+    lrcFile.write_text(
+        '[ar:Someone]\n[ti:Title]\n[xx:unknown]\n'
+        '[00:02.00]Second\n[00:01.00]First\n',
+        encoding='utf-8')
+    report = ProcessLrc(str(lrcFile), tags_only=True)
+    assert not report.failure
+    assert sorted(report.tags) == ['ar', 'ti', 'xx']
+    assert report.errors == 0
+    assert ProcessLrc(str(lrcFile)).errors != 0
+
+
+def test_normalize_reports_files_to_rewrite(tmp_path: Path) -> None:
+    normal = tmp_path / 'normal.lrc'
+    normal.write_text(
+        '[ar:Someone]\n\n[00:01.00]First\n',
+        encoding='utf-8')
+    messy = tmp_path / 'messy.lrc'
+    messy.write_text('[00:01.00]First\n[ar:Someone]\n', encoding='utf-8')
+    assert not ProcessLrc(str(normal), to_normalize=True).toRewrite
+    report = ProcessLrc(str(messy), to_normalize=True, dry_run=True)
+    assert report.toRewrite and not report.written
+    report = ProcessLrc(str(messy), to_normalize=True, dry_run=False)
+    assert report.written
+    assert messy.read_text(encoding='utf-8').startswith('[ar:Someone]')
+
+
+def test_report_counts_every_error_of_a_file(
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+        capsys: pytest.CaptureFixture[str],
+        ) -> None:
+    (tmp_path / 'song.lrc').write_text(
+        '[xx:unknown]\n[00:02.00]Second\n[00:01.00]First\n',
+        encoding='utf-8')
+    monkeypatch.setattr(
+        sys,
+        'argv',
+        ['lrc_batch', str(tmp_path), '-j', '1', '--verbose'])
+    main()
+    out = capsys.readouterr().out
+    assert 'UNKNOWN_TAGS|OUT_OF_ORDER' in out
+    assert '  UNKNOWN_TAGS ' in out and '  OUT_OF_ORDER ' in out
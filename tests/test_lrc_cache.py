@@ -0,0 +1,67 @@
+#
+#
+#
+"""Tests of storing parsed LRC files in `LrcCache`."""
+
+from pathlib import Path
+
+from media.lrc import Lrc, LrcErrors
+from media.lrc_cache import LrcCache
+
+
+_ENHANCED = (
+    '[ar:Someone]\n'
+    '[00:01.00]<00:01.00>Hello <00:01.50>big <00:02.00>world\n'
+    '[00:03.00]plain line\n'
+    '[00:04.00]<00:04.00>Bye <00:04.80>now\n')
+
+
+def _Snapshot(lrc: Lrc) -> list:
+    return [
+        (
+            item.text,
+            item.timestamp,
+            None if item.words is None else item.words.tolist(),)
+        for item in lrc.lyrics]
+
+
+def test_round_trip_keeps_word_timestamps(tmp_path: Path) -> None:
+    lrcFile = tmp_path / 'song.lrc'
+    lrcFile.write_text(_ENHANCED, encoding='utf-8')
+    cache = LrcCache(tmp_path / 'cache')
+    parsed = cache.Load(lrcFile)
+    assert list(cache.folder.glob('*.lrcc'))
+    cached = cache.Get(lrcFile)
+    assert cached is not None
+    assert _Snapshot(cached) == _Snapshot(parsed)
+    assert cached.lyrics[0].words.typecode == 'l'
+    assert cached.lyrics[2].GetEnhancedText() == \
+        '<00:04.00>Bye <00:04.80>now'
+    assert cached.errors == parsed.errors
+    assert cached.tags == parsed.tags
+    assert cached.savedDigest == parsed.savedDigest
+    assert cached.NeedsSaving() == parsed.NeedsSaving()
+
+
+def test_changed_file_invalidates_entry(tmp_path: Path) -> None:
+    lrcFile = tmp_path / 'song.lrc'
+    lrcFile.write_text(_ENHANCED, encoding='utf-8')
+    cache = LrcCache(tmp_path / 'cache')
+    cache.Load(lrcFile)
+    lrcFile.write_text('[00:05.00]Changed\n', encoding='utf-8')
+    assert cache.Get(lrcFile) is None
+    assert cache.Load(lrcFile).lyrics[0].text == 'Changed'
+
+
+def test_state_round_trip_does_not_share_tags(tmp_path: Path) -> None:
+    lrc = Lrc.FromStr('[ar:One]\n[ar:Two]\n[00:01.00]Line\n')
+    assert lrc.errors & LrcErrors.DUPLICATE_TAGS
+    copy = Lrc.FromState(
+        tmp_path / 'song.lrc',
+        False,
+        False,
+        lrc.GetState())
+    copy.RemoveDupElem('ar', 0)
+    assert copy['ar'] == 'Two'
+    assert lrc['ar'] == ['One', 'Two']
+    assert copy.lyrics == lrc.lyrics
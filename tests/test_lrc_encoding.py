@@ -0,0 +1,72 @@
+#
+#
+#
+"""Tests of detecting the encoding of LRC files."""
+
+from pathlib import Path
+
+import pytest
+
+from media.lrc import Lrc, _DecodeLrcData
+
+
+_LATIN = '[ti:España Größe]\n[00:01.00]Café crème brûlée\n'
+_ARABIC = '[ti:سلام]\n[00:01.00]السلام عليكم يا صديقي\n'
+_PERSIAN = '[00:01.00]اين يک آزمايش است، گچ پژوهش\n'
+_FRENCH = '[00:01.00]Un élève très âgé à la fête\n'
+
+
+@pytest.mark.parametrize('text, encoding, detected', [
+    ('[00:01.00]Plain\n', 'ascii', 'utf-8'),
+    (_LATIN, 'utf-8', 'utf-8'),
+    (_LATIN, 'utf-8-sig', 'utf-8-sig'),
+    (_ARABIC, 'utf-16', 'utf-16'),
+    (_ARABIC, 'utf-32', 'utf-32'),
+    (_LATIN, 'utf-16-le', 'utf-16-le'),
+    (_LATIN, 'utf-16-be', 'utf-16-be'),
+    (_LATIN, 'cp1252', 'cp1252'),
+    (_FRENCH, 'cp1252', 'cp1252'),
+    (_ARABIC, 'cp1256', 'cp1256'),
+    (_PERSIAN, 'cp1256', 'cp1256'),
+])
+def test_encoding_is_detected(
+        text: str,
+        encoding: str,
+        detected: str,
+        ) -> None:
+    assert _DecodeLrcData(text.encode(encoding), Lrc.FALLBACK_ENCODINGS) \
+        == (text, detected)
+
+
+def test_fallback_order_only_breaks_ties() -> None:
+    data = _LATIN.encode('cp1252')
+    assert _DecodeLrcData(data, ['cp1256', 'cp1252'])[1] == 'cp1252'
+    assert _DecodeLrcData(data, ['cp1252', 'cp1256'])[1] == 'cp1252'
+    data = _ARABIC.encode('cp1256')
+    assert _DecodeLrcData(data, ['cp1252', 'cp1256'])[1] == 'cp1256'
+
+
+def test_invalid_utf8_after_the_sample_falls_back() -> None:
+    text = _FRENCH + f'[00:02.00]{"x" * 400}\n' + _FRENCH
+    data = _FRENCH.encode('utf-8') + text[len(_FRENCH):].encode('cp1252')
+    decoded, encoding = _DecodeLrcData(data, Lrc.FALLBACK_ENCODINGS)
+    assert encoding == 'cp1252'
+    assert decoded.endswith(_FRENCH)
+
+
+def test_undecodable_content_raises() -> None:
+    with pytest.raises(UnicodeDecodeError):
+        _DecodeLrcData(b'[00:01.00]\x81\x8d', ['cp1252'])
+
+
+def test_save_keeps_the_encoding(tmp_path: Path) -> None:
+    lrcFile = tmp_path / 'song.lrc'
+    lrcFile.write_bytes(_LATIN.encode('cp1252'))
+    lrc = Lrc(lrcFile)
+    assert lrc.encoding == 'cp1252'
+    assert lrc.lyrics[0].text == 'Café crème brûlée'
+    item = lrc.lyrics[0].Copy()
+    item.text = 'Crème'
+    lrc.lyrics = [item]
+    lrc.Save()
+    assert 'Crème'.encode('cp1252') in lrcFile.read_bytes()
@@ -0,0 +1,37 @@
+#
+#
+#
+"""Tests of finding the LRC files of audios."""
+
+from pathlib import Path
+
+from media.lrc import Lrc
+
+
+def _Touch(folder: Path, *names: str) -> None:
+    for name in names:
+        (folder / name).write_bytes(b'')
+
+
+def test_translations_are_language_tagged(tmp_path: Path) -> None:
+    _Touch(
+        tmp_path,
+        'song.mp3', 'song.lrc', 'song.fa.lrc', 'song.pt-BR.lrc',
+        'song.remastered.lrc', 'song.live.mp3', 'song.live.lrc',
+        'songs.fa.lrc')
+    expected = [
+        tmp_path / 'song.lrc',
+        tmp_path / 'song.fa.lrc',
+        tmp_path / 'song.pt-BR.lrc']
+    assert Lrc.GetLrcFilenames(tmp_path / 'song.mp3') == expected
+    assert Lrc.GetLrcFilenames(tmp_path / 'song.lrc') == expected
+    assert Lrc.GetLrcFilenames(tmp_path / 'song.live.mp3') == [
+        tmp_path / 'song.live.lrc']
+
+
+def test_lrc_of_another_audio_is_not_a_translation(tmp_path: Path) -> None:
+    _Touch(tmp_path, 'song.mp3', 'song.mix.mp3', 'song.mix.lrc')
+    assert Lrc.GetLrcFilenames(tmp_path / 'song.mp3') == []
+    (tmp_path / 'song.mix.mp3').unlink()
+    assert Lrc.GetLrcFilenames(tmp_path / 'song.mp3') == [
+        tmp_path / 'song.mix.lrc']
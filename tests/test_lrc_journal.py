@@ -0,0 +1,104 @@
+#
+#
+#
+"""Tests of recording edits of LRC files in `LrcJournal`."""
+
+from pathlib import Path
+from typing import Callable
+
+from media.lrc import Lrc, LyricsItem, Timestamp
+from media.lrc_journal import LrcJournal
+
+
+class _FakeMaster:
+    """Collects the callbacks of `after` instead of running a Tk loop."""
+    def __init__(self) -> None:
+        self.timers: dict[str, Callable[[], None]] = {}
+        self._nextId = 0
+
+    def after(self, ms: int, func: Callable[[], None]) -> str:
+        self._nextId += 1
+        afterId = f'after#{self._nextId}'
+        self.timers[afterId] = func
+        return afterId
+
+    def after_cancel(self, afterId: str) -> None:
+        del self.timers[afterId]
+
+    def Fire(self) -> None:
+        timers, self.timers = self.timers, {}
+        for func in timers.values():
+            func()
+
+
+def _MakeLrc(tmp_path: Path) -> Lrc:
+    lrcFile = tmp_path / 'song.lrc'
+    lrcFile.write_text(
+        '[00:01.00]One\n[00:02.00]Two\n',
+        encoding='utf-8')
+    return Lrc(lrcFile, True, True)
+
+
+def _Texts(rows: list[LyricsItem] | None) -> list[str] | None:
+    return None if rows is None else [row.text for row in rows]
+
+
+def test_timer_flushes_the_last_edit(tmp_path: Path) -> None:
+    lrc = _MakeLrc(tmp_path)
+    master = _FakeMaster()
+    journal = LrcJournal(lrc.filename, master=master)
+    journal.Begin(lrc)
+    journal.RecordSetCell(1, 1, 'Deux')
+    assert journal.Replay(lrc) is None
+    assert len(master.timers) == 1
+    master.Fire()
+    assert _Texts(journal.Replay(lrc)) == ['One', 'Deux']
+    journal.RecordSetCell(0, 1, 'Un')
+    journal.Flush()
+    assert not master.timers
+    assert _Texts(journal.Replay(lrc)) == ['Un', 'Deux']
+
+
+def test_checkpoint_compacts_without_saving(tmp_path: Path) -> None:
+    lrc = _MakeLrc(tmp_path)
+    lrcContent = lrc.filename.read_bytes()
+    journal = LrcJournal(lrc.filename)
+    journal.Begin(lrc)
+    journal.RecordInsert(
+        2,
+        LyricsItem('Three', Timestamp.FromMilliseconds(3_000)))
+    journal.RecordDelete(0, 1)
+    journal.Flush()
+    rows = journal.Replay(lrc)
+    assert _Texts(rows) == ['Two', 'Three']
+    journal.Checkpoint(rows)
+    assert len(journal.filename.read_text('utf-8').splitlines()) == 2
+    assert _Texts(journal.Replay(lrc)) == ['Two', 'Three']
+    assert lrc.filename.read_bytes() == lrcContent
+
+
+def test_journal_is_compacted_when_it_grows(tmp_path: Path) -> None:
+    lrc = _MakeLrc(tmp_path)
+    rows = [item.Copy() for item in lrc.lyrics]
+    journal = LrcJournal(
+        lrc.filename,
+        batch_size=1,
+        rows_cb=lambda: rows,
+        compact_size=8)
+    journal.Begin(lrc)
+    for idx in range(20):
+        rows[0].text = f'One {idx}'
+        journal.RecordSetCell(0, 1, rows[0].text)
+    nLines = len(journal.filename.read_text('utf-8').splitlines())
+    assert nLines < 8
+    assert _Texts(journal.Replay(lrc)) == ['One 19', 'Two']
+
+
+def test_edits_with_line_separators_are_replayed(tmp_path: Path) -> None:
+    lrc = _MakeLrc(tmp_path)
+    journal = LrcJournal(lrc.filename)
+    journal.Begin(lrc)
+    journal.RecordSetCell(0, 1, 'x\u2028y')
+    journal.RecordSetCell(1, 1, 'z\u0085w\u2029')
+    journal.Flush()
+    assert _Texts(journal.Replay(lrc)) == ['x\u2028y', 'z\u0085w\u2029']
@@ -0,0 +1,92 @@
+#
+#
+#
+"""Tests of reading LRC files from zip lyrics packs by `LrcPack`."""
+
+from pathlib import Path
+import zipfile
+
+import pytest
+
+from media.lrc_pack import LrcPack
+
+
+def _Lrc(text: str) -> bytes:
+    return f'[ti:{text}]\n[00:01.00]{text}\n'.encode('utf-8')
+
+
+def _PatchMember(pack: Path, name: str, field: str, value: int) -> None:
+    """Patches the general purpose flags or the compression method,
+    `field` of 'flags' or 'method', of the member in its local header
+    and its central directory entry.
+    """
+    data = bytearray(pack.read_bytes())
+    rawName = name.encode('utf-8')
+    for signature, nameOffset, flagsOffset in (
+            (b'PK\x03\x04', 30, 6),
+            (b'PK\x01\x02', 46, 8)):
+        offset = flagsOffset if field == 'flags' else flagsOffset + 2
+        pos = data.find(signature)
+        while pos >= 0:
+            if data[pos + nameOffset:].startswith(rawName):
+                data[pos + offset:pos + offset + 2] = \
+                    value.to_bytes(2, 'little')
+            pos = data.find(signature, pos + 1)
+    pack.write_bytes(bytes(data))
+
+
+@pytest.fixture(autouse=True)
+def _ClearIndexes() -> None:
+    LrcPack.ClearIndexes()
+
+
+def test_members_of_all_methods_are_read(tmp_path: Path) -> None:
+    pack = tmp_path / 'pack.zip'
+    with zipfile.ZipFile(pack, 'w') as zipFile:
+        zipFile.writestr('Album/Stored.lrc', _Lrc('stored'))
+        zipFile.writestr(
+            'Deflated.LRC',
+            _Lrc('deflated'),
+            zipfile.ZIP_DEFLATED)
+        zipFile.writestr('Bzip2.lrc', _Lrc('bzip2'), zipfile.ZIP_BZIP2)
+        zipFile.writestr('cover.jpg', b'\xff\xd8')
+    lrcPack = LrcPack(pack)
+    assert len(lrcPack) == 3
+    assert lrcPack.GetMemberName('stored') == 'Album/Stored.lrc'
+    for stem in ('Stored', 'deflated', 'BZIP2'):
+        assert lrcPack.ReadBytes(stem) == _Lrc(stem.lower())
+    assert lrcPack.Get('deflated').lyrics[0].text == 'deflated'
+    assert lrcPack.ReadBytes('cover') is None
+
+
+def test_unreadable_members_are_skipped(tmp_path: Path) -> None:
+    pack = tmp_path / 'pack.zip'
+    with zipfile.ZipFile(pack, 'w') as zipFile:
+        zipFile.writestr('song.lrc', _Lrc('encrypted'))
+        zipFile.writestr('other/song.lrc', _Lrc('plain'))
+        zipFile.writestr('ppmd.lrc', _Lrc('ppmd'))
+    _PatchMember(pack, 'song.lrc', 'flags', 0x1)
+    _PatchMember(pack, 'ppmd.lrc', 'method', 98)
+    lrcPack = LrcPack(pack)
+    assert 'ppmd' not in lrcPack
+    assert lrcPack.ReadBytes('song') == _Lrc('plain')
+
+
+def test_zip64_archives(
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+        ) -> None:
+    # Forcing zipfile to write ZIP64 records for a small archive...
+    monkeypatch.setattr(zipfile, 'ZIP64_LIMIT', 64)
+    monkeypatch.setattr(zipfile, 'ZIP_FILECOUNT_LIMIT', 2)
+    pack = tmp_path / 'pack.zip'
+    with zipfile.ZipFile(pack, 'w') as zipFile:
+        for idx in range(5):
+            zipFile.writestr(
+                f'song{idx}.lrc',
+                _Lrc(f'song {idx}' * 20),
+                zipfile.ZIP_DEFLATED)
+    assert b'PK\x06\x06' in pack.read_bytes()
+    lrcPack = LrcPack(pack)
+    assert len(lrcPack) == 5
+    assert lrcPack.ReadBytes('song4') == _Lrc('song 4' * 20)
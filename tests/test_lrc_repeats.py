@@ -0,0 +1,53 @@
+#
+#
+#
+"""Tests of expanding LRC lines with repeated timestamps."""
+
+from media.lrc import Lrc, LrcErrors
+
+
+def _Lines(lrc: Lrc) -> list[tuple[str, str]]:
+    return [(str(item.timestamp), item.text,) for item in lrc.lyrics]
+
+
+def test_repeats_are_merged_into_the_timeline() -> None:
+    lrc = Lrc.FromStr(
+        '[00:10.00][00:30.00]chorus\n'
+        '[00:20.00]verse\n'
+        '[00:40.00]end\n')
+    assert _Lines(lrc) == [
+        ('00:10.00', 'chorus',),
+        ('00:20.00', 'verse',),
+        ('00:30.00', 'chorus',),
+        ('00:40.00', 'end',),]
+    assert lrc.lyrics[0].text is lrc.lyrics[2].text
+    assert lrc.AreTimstampsOk()
+    assert lrc.toCollapseRepeats
+
+
+def test_earliest_repeat_stays_in_place() -> None:
+    lrc = Lrc.FromStr('[00:30.00][00:05.00]chorus\n[00:20.00]verse\n')
+    assert _Lines(lrc) == [
+        ('00:05.00', 'chorus',),
+        ('00:20.00', 'verse',),
+        ('00:30.00', 'chorus',),]
+    assert lrc.AreTimstampsOk()
+
+
+def test_out_of_order_lines_are_still_reported() -> None:
+    lrc = Lrc.FromStr(
+        '[00:10.00][00:50.00]chorus\n'
+        '[00:30.00]verse\n'
+        '[00:20.00]misplaced\n')
+    assert lrc.errors & LrcErrors.OUT_OF_ORDER
+
+
+def test_repeats_follow_their_line_with_bad_timestamps() -> None:
+    lrc = Lrc.FromStr(
+        '[00:10.00][00:50.00]chorus\n'
+        '[00:99.00]bad\n',
+        None,
+        True,
+        True)
+    assert [item.text for item in lrc.lyrics] == ['chorus', 'chorus', 'bad']
+    assert lrc.errors & LrcErrors.BAD_TIMESTAMP
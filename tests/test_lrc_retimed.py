@@ -0,0 +1,30 @@
+#
+#
+#
+"""Tests of transforming the timeline of LRC files by `Lrc.Retimed`."""
+
+from media.lrc import Lrc
+
+
+_TEXT = (
+    '[ar:First]\n[ar:Second]\n[offset:500]\n[zz:one]\n[zz:two]\n'
+    '[00:01.00]One\n[00:02.00]Two\n')
+
+
+def test_shift_and_bake_offset() -> None:
+    lrc = Lrc.FromStr(_TEXT)
+    retimed = lrc.Retimed(bakeOffset=True, shift=1_000, start=1)
+    assert [item.timestamp.ToMilliseconds() for item in retimed.lyrics] \
+        == [500, 2_500]
+    assert 'offset' not in retimed.tags
+    assert [item.timestamp.ToMilliseconds() for item in lrc.lyrics] \
+        == [1_000, 2_000]
+
+
+def test_duplicate_tags_are_not_shared() -> None:
+    lrc = Lrc.FromStr(_TEXT)
+    retimed = lrc.Retimed(shift=100)
+    retimed.tags['ar'].append('Third')
+    retimed.unknownTags['zz'].append('three')
+    assert lrc.tags['ar'] == ['First', 'Second']
+    assert lrc.unknownTags['zz'] == ['one', 'two']
@@ -0,0 +1,85 @@
+#
+#
+#
+"""Tests of saving LRC files with `Lrc.Save`."""
+
+import os
+import stat
+import sys
+from pathlib import Path
+
+import pytest
+
+from media import FolderPlaylist
+from media.lrc import Lrc, _UMASK
+
+
+_TEXT = '[ar:Someone]\n[00:01.00]First line\n[00:02.00]Second line\n'
+
+
+def test_from_bytes_writes_a_missing_file(tmp_path: Path) -> None:
+    target = tmp_path / 'song.lrc'
+    lrc = Lrc.FromBytes(_TEXT.encode(), target)
+    assert lrc.Save()
+    assert Lrc(target).lyrics[1].text == 'Second line'
+
+
+def test_unchanged_loaded_file_is_not_rewritten(tmp_path: Path) -> None:
+    target = tmp_path / 'song.lrc'
+    target.write_text(_TEXT, encoding='utf-8')
+    lrc = Lrc(target)
+    assert lrc.Save()
+    mtimeNs = target.stat().st_mtime_ns
+    assert not lrc.Save()
+    assert target.stat().st_mtime_ns == mtimeNs
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='POSIX file modes')
+def test_new_file_gets_the_default_mode(tmp_path: Path) -> None:
+    target = tmp_path / 'song.lrc'
+    Lrc.FromStr(_TEXT, target).Save()
+    assert stat.S_IMODE(target.stat().st_mode) == 0o666 & ~_UMASK
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='POSIX file modes')
+def test_existing_file_keeps_its_mode(tmp_path: Path) -> None:
+    target = tmp_path / 'song.lrc'
+    target.write_text('[00:01.00]Old\n', encoding='utf-8')
+    os.chmod(target, 0o640)
+    Lrc.FromStr(_TEXT, target).Save()
+    assert stat.S_IMODE(target.stat().st_mode) == 0o640
+
+
+def test_no_temporary_file_is_left(tmp_path: Path) -> None:
+    target = tmp_path / 'song.lrc'
+    Lrc.FromStr(_TEXT, target).Save()
+    assert [pth.name for pth in tmp_path.iterdir()] == ['song.lrc']
+
+
+def test_folder_playlist_ignores_non_audio_items() -> None:
+    items = ['song.mp3', '.song.lrc.x1y2.tmp', 'song.lrc', 'other.mp3']
+    assert list(FolderPlaylist._FilterAudios(items)) == [
+        Path('song.mp3'), Path('other.mp3')]
+
+
+def test_needs_saving_follows_content_and_file(tmp_path: Path) -> None:
+    target = tmp_path / 'song.lrc'
+    target.write_text(_TEXT, encoding='utf-8')
+    lrc = Lrc(target)
+    assert lrc.NeedsSaving()
+    lrc.Save()
+    assert not Lrc(target).NeedsSaving()
+    assert not lrc.NeedsSaving()
+    lrc['ti'] = 'Title'
+    assert lrc.NeedsSaving()
+    lrc.Save()
+    assert not lrc.NeedsSaving()
+    target.write_text('[00:01.00]Changed elsewhere\n', encoding='utf-8')
+    assert lrc.NeedsSaving()
+
+
+def test_length_tag_in_milliseconds() -> None:
+    assert Lrc.FromStr('[length:03:25.50]\n').GetLength() == 205_500
+    assert Lrc.FromStr('[length:3:05]\n').GetLength() == 185_000
+    assert Lrc.FromStr('[length:soon]\n').GetLength() is None
+    assert Lrc.FromStr('[00:01.00]No tags\n').GetLength() is None
@@ -0,0 +1,57 @@
+#
+#
+#
+"""Tests of sharing the lyrics of `Lrc` objects as read-only snapshots."""
+
+from copy import deepcopy
+from pathlib import Path
+
+import pytest
+
+from media.lrc import Lrc, LyricsItem, Timestamp
+
+
+_TEXT = '[00:01.00]One\n[00:02.00]<00:02.00>Two <00:02.50>words\n'
+
+
+def _MakeLrc(tmp_path: Path) -> Lrc:
+    lrcFile = tmp_path / 'song.lrc'
+    lrcFile.write_text(_TEXT, encoding='utf-8')
+    lrc = Lrc(lrcFile)
+    lrc.Save()
+    return lrc
+
+
+def test_changing_a_snapshot_does_not_change_the_lrc(tmp_path: Path) -> None:
+    lrc = _MakeLrc(tmp_path)
+    snapshot = lrc.lyrics
+    assert snapshot is lrc.lyrics
+    with pytest.raises(AttributeError):
+        snapshot[0].text = 'Changed'
+    with pytest.raises(AttributeError):
+        snapshot[0].timestamp = Timestamp.FromMilliseconds(5_000)
+    with pytest.raises(TypeError):
+        snapshot[0][1] = 'Changed'
+    assert [item.text for item in lrc.lyrics] == ['One', 'Two words']
+    assert not lrc.NeedsSaving()
+
+
+def test_copies_are_editable_and_detached(tmp_path: Path) -> None:
+    lrc = _MakeLrc(tmp_path)
+    item = lrc.lyrics[1].Copy()
+    assert type(item) is LyricsItem
+    item.words[1] = 0
+    item[1] = 'Edited'
+    assert lrc.lyrics[1].words.tolist() == [0, 2_000, 4, 2_500]
+    items = [lrc.lyrics[0].Copy(), item]
+    lrc.lyrics = items
+    items[0].text = 'Changed afterwards'
+    assert [item.text for item in lrc.lyrics] == ['One', 'Edited']
+    assert lrc.NeedsSaving()
+
+
+def test_read_only_items_can_be_copied_deeply(tmp_path: Path) -> None:
+    lrc = _MakeLrc(tmp_path)
+    item = deepcopy(lrc.lyrics[1])
+    assert item.text == 'Two words'
+    assert item.words.tolist() == [0, 2_000, 4, 2_500]
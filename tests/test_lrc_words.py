@@ -0,0 +1,36 @@
+#
+#
+#
+"""Tests of enhanced LRC word timestamps and `WordIndex`."""
+
+from media.lrc import Lrc
+
+
+_ENHANCED = (
+    '[00:01.00]<00:01.00>Hello <00:01.50>big <00:02.00>world\n'
+    '[00:03.00]plain line\n'
+    '[00:04.00]<00:04.00>Bye <00:04.80>now\n')
+
+
+def test_word_timestamps_are_parsed() -> None:
+    lrc = Lrc.FromStr(_ENHANCED)
+    first = lrc.lyrics[0]
+    assert first.text == 'Hello big world'
+    assert first.nWords == 3
+    assert [first.text[slice(*first.GetWordSpan(idx))]
+        for idx in range(first.nWords)] == ['Hello ', 'big ', 'world']
+    assert lrc.lyrics[1].words is None
+    assert first.GetEnhancedText() == \
+        '<00:01.00>Hello <00:01.50>big <00:02.00>world'
+
+
+def test_word_index_is_built_lazily_and_looks_up_words() -> None:
+    lrc = Lrc.FromStr(_ENHANCED)
+    assert lrc._wordIndex is None
+    index = lrc.GetWordIndex()
+    assert lrc.GetWordIndex() is index
+    assert len(index) == 5
+    assert index.Lookup(0.5) == (-1, -1)
+    assert index.Lookup(1.6) == (0, 1)
+    assert index.Lookup(3.5) == (0, 2)
+    assert index.Lookup(5.0) == (2, 1)
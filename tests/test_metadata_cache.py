@@ -0,0 +1,102 @@
+#
+#
+#
+"""Tests of keeping metadata of audios in `MetadataCache`."""
+
+import os
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from media.metadata_cache import MetadataCache
+
+
+_TAGS = {'TIT2': ['Title']}
+
+_PROBE = {'format': {'duration': 1.5}}
+
+
+@pytest.fixture
+def cache(tmp_path: Path) -> Iterator[MetadataCache]:
+    cache = MetadataCache(tmp_path / 'cache' / 'metadata.sqlite3')
+    yield cache
+    cache.Close()
+
+
+def _MakeAudio(folder: Path, name: str) -> Path:
+    audio = folder / name
+    audio.write_bytes(b'audio')
+    return audio
+
+
+def _Store(cache: MetadataCache, audio: Path) -> None:
+    entry = cache.Get(audio)
+    cache.Put(audio, entry._replace(tags=_TAGS, probe=_PROBE))
+
+
+def test_folder_lookup_returns_stored_entries(
+        cache: MetadataCache,
+        tmp_path: Path,
+        ) -> None:
+    audio = _MakeAudio(tmp_path, 'song.mp3')
+    _MakeAudio(tmp_path, 'other.MP3')
+    _Store(cache, audio)
+    entries = cache.GetFolder(tmp_path)
+    assert set(entries) == {'song.mp3', 'other.MP3'}
+    assert entries['song.mp3'].tags == _TAGS
+    assert entries['song.mp3'].probe == _PROBE
+    assert entries['other.MP3'].tags is None
+
+
+def test_changed_file_is_stale(cache: MetadataCache, tmp_path: Path) -> None:
+    audio = _MakeAudio(tmp_path, 'song.mp3')
+    _Store(cache, audio)
+    stat = audio.stat()
+    os.utime(audio, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert cache.Get(audio).tags is None
+    entry = cache.GetFolder(tmp_path)['song.mp3']
+    assert (entry.tags, entry.probe,) == (None, None,)
+    # Storing only tags must not revive the stale probe data...
+    cache.Put(audio, cache.Get(audio)._replace(tags=_TAGS))
+    entry = cache.Get(audio)
+    assert (entry.tags, entry.probe,) == (_TAGS, None,)
+
+
+def test_missing_metadata_is_kept_for_unchanged_file(
+        cache: MetadataCache,
+        tmp_path: Path,
+        ) -> None:
+    audio = _MakeAudio(tmp_path, 'song.mp3')
+    _Store(cache, audio)
+    cache.Put(audio, cache.Get(audio)._replace(tags=None, probe=None))
+    assert cache.Get(audio).probe == _PROBE
+
+
+def test_invalidate_drops_entries(
+        cache: MetadataCache,
+        tmp_path: Path,
+        ) -> None:
+    song = _MakeAudio(tmp_path, 'song.mp3')
+    other = _MakeAudio(tmp_path, 'other.mp3')
+    _Store(cache, song)
+    _Store(cache, other)
+    cache.Invalidate(tmp_path, [str(song)])
+    entries = cache.GetFolder(tmp_path)
+    assert entries['song.mp3'].tags is None
+    assert entries['other.mp3'].tags == _TAGS
+
+
+def test_rows_of_deleted_files_are_dropped(
+        cache: MetadataCache,
+        tmp_path: Path,
+        ) -> None:
+    audio = _MakeAudio(tmp_path, 'song.mp3')
+    _Store(cache, audio)
+    stat = audio.stat()
+    audio.unlink()
+    assert cache.GetFolder(tmp_path) == {}
+    # Recreating the file with the same signature must not revive it...
+    _MakeAudio(tmp_path, 'song.mp3')
+    os.utime(audio, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert cache.GetFolder(tmp_path)['song.mp3'].tags is None
@@ -0,0 +1,58 @@
+#
+#
+#
+"""Tests of tracking the playback of `FFmpegMP3` from `ffplay` output."""
+
+import io
+from pathlib import Path
+import threading
+
+from benchmarks.mp3_probe import MakeMp3
+from media.mp3 import FFmpegMP3
+from media.mp3_probe import ProbeMp3
+
+
+class _FakePopen:
+    """Stands for an `ffplay` process which has printed `lines`."""
+    def __init__(self, lines: list[str]) -> None:
+        self.stdout = io.StringIO(''.join(lines))
+
+    def wait(self) -> int:
+        return 0
+
+
+def _MakeMp3Object(tmp_path: Path) -> FFmpegMP3:
+    mp3File = tmp_path / 'song.mp3'
+    MakeMp3(mp3File, 40, False)
+    return FFmpegMP3.FromRawData(mp3File, ProbeMp3(mp3File))
+
+
+def _Attach(mp3: FFmpegMP3, popen: _FakePopen) -> threading.Event:
+    endEvent = threading.Event()
+    mp3._popen = popen
+    mp3._endEvent = endEvent
+    mp3._clock.Start(0.0)
+    mp3._playing = True
+    return endEvent
+
+
+def test_end_of_stream_sets_the_event(tmp_path: Path) -> None:
+    mp3 = _MakeMp3Object(tmp_path)
+    popen = _FakePopen(['   0.50 M-A: 0.000\n', '   0.90 M-A: 0.000\n'])
+    endEvent = _Attach(mp3, popen)
+    mp3._ReadProgress(popen, endEvent)
+    assert mp3.endEvent is endEvent
+    assert endEvent.is_set()
+    assert not mp3.playing
+    assert mp3.pos == 0.0
+
+
+def test_stopped_playback_does_not_set_the_event(tmp_path: Path) -> None:
+    mp3 = _MakeMp3Object(tmp_path)
+    popen = _FakePopen(['   0.50 M-A: 0.000\n'])
+    endEvent = _Attach(mp3, popen)
+    # Detaching the process as `Pause` does...
+    mp3._popen = None
+    mp3._playing = False
+    mp3._ReadProgress(popen, endEvent)
+    assert not endEvent.is_set()
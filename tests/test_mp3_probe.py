@@ -0,0 +1,93 @@
+#
+#
+#
+"""Tests of probing MP3 files by `ProbeMp3` and `FFmpegMP3.ProbeMany`."""
+
+from pathlib import Path
+
+import pytest
+
+from benchmarks.mp3_probe import MakeMp3
+from media.mp3 import FFmpegMP3
+from media.mp3_probe import ProbeMp3
+
+
+_FRAME_LENGTH = 417
+"""The length of frames made by `MakeMp3` for CBR files, 128 kbit/s at
+44.1 kHz without padding.
+"""
+
+_SAMPLES = 1152
+
+_RATE = 44_100
+
+
+def _MakeWithHeader(filename: Path, n_frames: int, header: bytes) -> None:
+    """Makes a CBR file whose first frame carries the specified VBR
+    header right after the side information of a stereo frame.
+    """
+    MakeMp3(filename, n_frames, False)
+    data = bytearray(filename.read_bytes())
+    data[36:36 + len(header)] = header
+    filename.write_bytes(data)
+
+
+def test_cbr_duration_from_frame_scan(tmp_path: Path) -> None:
+    mp3File = tmp_path / 'cbr.mp3'
+    MakeMp3(mp3File, 20, False)
+    rawData = ProbeMp3(mp3File)
+    assert rawData is not None
+    assert rawData['format']['duration'] == pytest.approx(
+        20 * _SAMPLES / _RATE)
+    assert rawData['streams'][0]['sample_rate'] == str(_RATE)
+    assert rawData['streams'][0]['channels'] == 2
+
+
+def test_xing_header_gives_duration(tmp_path: Path) -> None:
+    mp3File = tmp_path / 'xing.mp3'
+    xing = b'Xing' + (3).to_bytes(4, 'big') + (1_000).to_bytes(4, 'big') \
+        + (400_000).to_bytes(4, 'big')
+    _MakeWithHeader(mp3File, 8, xing)
+    rawData = ProbeMp3(mp3File)
+    assert rawData is not None
+    duration = 1_000 * _SAMPLES / _RATE
+    assert rawData['format']['duration'] == pytest.approx(duration)
+    assert rawData['format']['bit_rate'] == round(400_000 * 8 / duration)
+
+
+def test_vbri_header_gives_duration(tmp_path: Path) -> None:
+    mp3File = tmp_path / 'vbri.mp3'
+    vbri = b'VBRI' + bytes(6) + (300_000).to_bytes(4, 'big') \
+        + (500).to_bytes(4, 'big')
+    _MakeWithHeader(mp3File, 8, vbri)
+    rawData = ProbeMp3(mp3File)
+    assert rawData is not None
+    duration = 500 * _SAMPLES / _RATE
+    assert rawData['format']['duration'] == pytest.approx(duration)
+    assert rawData['format']['bit_rate'] == round(300_000 * 8 / duration)
+
+
+def test_truncated_vbri_header_is_not_probed(tmp_path: Path) -> None:
+    mp3File = tmp_path / 'truncated.mp3'
+    _MakeWithHeader(mp3File, 1, b'VBRI' + bytes(6))
+    mp3File.write_bytes(mp3File.read_bytes()[:36 + 12])
+    assert ProbeMp3(mp3File) is None
+
+
+def test_file_without_frames_is_not_probed(tmp_path: Path) -> None:
+    mp3File = tmp_path / 'empty.mp3'
+    mp3File.write_bytes(bytes(_FRAME_LENGTH))
+    assert ProbeMp3(mp3File) is None
+
+
+def test_probe_many_yields_raw_data_and_errors(tmp_path: Path) -> None:
+    filenames = [tmp_path / f'{idx}.mp3' for idx in range(4)]
+    for idx, filename in enumerate(filenames):
+        MakeMp3(filename, 10 + idx, False)
+    missing = tmp_path / 'missing.mp3'
+    results = dict(FFmpegMP3.ProbeMany([*filenames, missing], 2))
+    assert isinstance(results.pop(missing), Exception)
+    assert set(results) == set(filenames)
+    for idx, filename in enumerate(filenames):
+        mp3 = FFmpegMP3.FromRawData(filename, results[filename])
+        assert mp3.Duration == pytest.approx((10 + idx) * _SAMPLES / _RATE)
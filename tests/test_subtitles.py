@@ -0,0 +1,46 @@
+#
+#
+#
+"""Tests of converting lyrics between LRC and subtitle formats."""
+
+from pathlib import Path
+
+import pytest
+
+from media.lrc import Lrc
+from media.subtitles import ExportSubtitles, IterSubtitleCues
+
+
+_TEXT = (
+    '[ti:Song]\n'
+    '[00:01.00]<00:01.00>Hello <00:01.50>world\n'
+    '[00:03.00]Second line\n')
+
+
+@pytest.mark.parametrize('ext', ['.srt', '.vtt', '.ass', '.ssa'])
+def test_export_round_trip(tmp_path: Path, ext: str) -> None:
+    subFile = tmp_path / f'song{ext}'
+    ExportSubtitles(Lrc.FromStr(_TEXT), subFile, 4.0)
+    cues = list(IterSubtitleCues(subFile))
+    assert [(cue.start, cue.end, cue.text) for cue in cues] == [
+        (1_000, 3_000, 'Hello world'),
+        (3_000, 4_000, 'Second line')]
+
+
+def test_ssa_is_v4(tmp_path: Path) -> None:
+    subFile = tmp_path / 'song.ssa'
+    ExportSubtitles(Lrc.FromStr(_TEXT), subFile)
+    content = subFile.read_text(encoding='utf-8')
+    assert 'ScriptType: v4.00\n' in content
+    assert '[V4 Styles]' in content and '[V4+ Styles]' not in content
+    assert 'Dialogue: Marked=0,0:00:01.00,0:00:03.00,' in content
+
+
+def test_failed_export_keeps_the_file(tmp_path: Path) -> None:
+    subFile = tmp_path / 'song.srt'
+    subFile.write_text('old', encoding='utf-8')
+    lrc = Lrc.FromStr('[00:01.00]Timed\nUntimed\n', toSaveNoTimestamps=True)
+    with pytest.raises(ValueError):
+        ExportSubtitles(lrc, subFile)
+    assert subFile.read_text(encoding='utf-8') == 'old'
+    assert [pth.name for pth in tmp_path.iterdir()] == ['song.srt']
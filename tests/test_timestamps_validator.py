@@ -0,0 +1,63 @@
+#
+#
+#
+"""Tests of `TimestampsValidator`, the incremental checker of timestamps
+which the lyrics editor keeps up to date on every edit.
+"""
+
+import random
+
+from media.lrc import LrcErrors, Timestamp, TimestampsValidator
+
+
+def _Check(timestamps: list[Timestamp | None]) -> LrcErrors:
+    """Checks `timestamps` from scratch."""
+    errors = LrcErrors.No_ERROR
+    timed = [ts.ToMilliseconds() for ts in timestamps if ts is not None]
+    if len(timed) < len(timestamps):
+        errors |= LrcErrors.NO_TIMESTAMP
+    if any(a > b for a, b in zip(timed, timed[1:])):
+        errors |= LrcErrors.OUT_OF_ORDER
+    if len(set(timed)) < len(timed):
+        errors |= LrcErrors.DUPLICATE_TIMESTAMPS
+    return errors
+
+
+def _RandomTimestamp(rand: random.Random) -> Timestamp | None:
+    if rand.random() < 0.15:
+        return None
+    return Timestamp.FromMilliseconds(rand.randrange(0, 20) * 100)
+
+
+def test_edits_match_full_checks() -> None:
+    rand = random.Random(42)
+    for _ in range(200):
+        rows = [_RandomTimestamp(rand) for _ in range(rand.randint(0, 8))]
+        validator = TimestampsValidator(rows)
+        assert validator.errors == _Check(rows)
+        for _ in range(30):
+            op = rand.random()
+            if op < 0.4 and rows:
+                idx = rand.randrange(len(rows))
+                rows[idx] = _RandomTimestamp(rand)
+                validator.Set(idx, rows[idx])
+            elif op < 0.7:
+                idx = rand.randint(0, len(rows))
+                rows.insert(idx, _RandomTimestamp(rand))
+                validator.Insert(idx, rows[idx])
+            elif rows:
+                idx = rand.randrange(len(rows))
+                del rows[idx]
+                validator.Delete(idx)
+            assert validator.errors == _Check(rows)
+            assert len(validator) == len(rows)
+
+
+def test_fixing_the_only_inversion_clears_the_error() -> None:
+    ms = Timestamp.FromMilliseconds
+    validator = TimestampsValidator([ms(1_000), ms(3_000), ms(2_000)])
+    assert validator.errors == LrcErrors.OUT_OF_ORDER
+    validator.Set(2, ms(4_000))
+    assert validator.errors == LrcErrors.No_ERROR
+    validator.Insert(0, None)
+    assert validator.errors == LrcErrors.NO_TIMESTAMP
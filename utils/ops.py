@@ -4,20 +4,30 @@
 """This mosule offers operations for `mp3_lyrics_win` module.
 
 #### Functions:
-1. `LoadPlaylist`
-2. `LoadLrc`
-3. `LoadAudio`
+1. `SetMetadataCache`
+2. `LoadPlaylist`
+3. `SetLrcCache`
+4. `SetLyricsPacks`
+5. `LoadLrc`
+6. `LoadAudio`
 """
 
 from collections import OrderedDict
+from functools import partial
+import logging
 from os import PathLike
 from pathlib import Path
 from queue import Queue
 import tkinter as tk
 from typing import Callable, Iterable
+from zipfile import BadZipFile
 
 from media import AbstractPlaylist
+from media.id3_lyrics import ReadId3Lyrics
 from media.lrc import Lrc
+from media.lrc_cache import LrcCache
+from media.lrc_pack import LrcPack
+from media.metadata_cache import MetadataCache, MetadataEntry
 from media.abstract_mp3 import AbstractMp3
 from widgets.playlist_view import PlaylistItem
 
@@ -31,6 +41,29 @@ _PLVW_TAGS['TIT2'] = 'Title'
 _PLVW_TAGS['TALB'] = 'Album'
 _PLVW_TAGS['TPE1'] = 'Artist'
 
+_metadataCache: MetadataCache | None = None
+"""The cache of tags and probe data of audios which is used by
+`LoadPlaylist` and `LoadAudio` if it is set.
+"""
+
+_lrcCache: LrcCache | None = None
+"""The cache of parsed LRC files which is used by `LoadLrc` if it is
+set.
+"""
+
+_lyricsPacks: list[Path] = []
+"""The zip lyrics packs which `LoadLrc` looks up for LRC files missing
+in the file system, in addition to the packs next to the audio.
+"""
+
+
+def SetMetadataCache(cache: MetadataCache | None) -> None:
+    """Sets the cache of tags and probe data of audios which is used by
+    `LoadPlaylist` and `LoadAudio`. Passing None disables the cache.
+    """
+    global _metadataCache
+    _metadataCache = cache
+
 
 def LoadPlaylist(
         q: Queue | None,
@@ -39,21 +72,34 @@ def LoadPlaylist(
         added_cb: Callable[[Path], None] | None = None,
         changed_cb: Callable[[Path], None] | None = None,
         deleted_cb: Callable[[Path], None] | None = None,
+        mp3_class: type[AbstractMp3] | None = None,
         ) -> tuple[AbstractPlaylist, Iterable[PlaylistItem]]:
     """Accepts a `Path` object to a playlist and returns the playlist
-    object and all included audios in the playlist as a 2-tuple.
+    object and all included audios in the playlist as a 2-tuple. If a
+    cache is set via `SetMetadataCache`, tags of unchanged audios are
+    read from it and those of the others are stored in it. If the
+    folder is watched, the cache entries of changed audios are dropped.
+    If `mp3_class` can probe files concurrently by `ProbeMany`, audios
+    whose probe data is not cached are probed in a batch and stored in
+    the cache as well, so `LoadAudio` does not need to probe them.
 
     #### Exceptions:
     * `FileNotFoundError`: the playlist did not find in the file system.
     """
-    from collections import OrderedDict
     from media import PLAYLIST_EXTS, FolderPlaylist, GetAllTags
     if q:
         q.put(f'Loading playlist\n{playlist}')
+    cache = _metadataCache
     # Instantiating the playlist...
     if not playlist.exists():
         raise FileNotFoundError()
     elif playlist.is_dir():
+        if cache and any([added_cb, changed_cb, deleted_cb]):
+            # Invalidating cache entries on file system events...
+            invalidate = partial(cache.Invalidate, playlist)
+            added_cb = _ChainInvalidation(invalidate, added_cb)
+            changed_cb = _ChainInvalidation(invalidate, changed_cb)
+            deleted_cb = _ChainInvalidation(invalidate, deleted_cb)
         playlistObj = FolderPlaylist(
             master=master,
             dir_=playlist,
@@ -64,16 +110,36 @@ def LoadPlaylist(
         pass
     else:
         return None, []
+    entries = {}
+    if cache and playlist.is_dir():
+        try:
+            entries = cache.GetFolder(playlist)
+        except OSError as err:
+            logging.error(f"Failed to scan '{playlist}': {err}")
+    newEntries: dict[str, MetadataEntry] = {}
+    unprobed: list[str] = []
     mpSorter: dict[Path, int] = {}
     plyItems: list[PlaylistItem] = []
     for pth in playlistObj.Audios:
+        entry = entries.get(pth.name)
+        if entry is not None and entry.probe is None:
+            unprobed.append(pth.name)
+        if entry is not None and entry.tags is not None:
+            tagsRaw = entry.tags
+        else:
+            tagsRaw = GetAllTags(playlist / pth)
+            if entry is not None:
+                # Keeping only shown tags in the cache...
+                tagsRaw = {
+                    key: [str(value) for value in tagsRaw[key]]
+                    for key in _PLVW_TAGS
+                    if key in tagsRaw}
+                newEntries[pth.name] = entry._replace(tags=tagsRaw)
         tags = OrderedDict()
-        tagsRaw = GetAllTags(playlist / pth)
         for key in _PLVW_TAGS:
             if key in tagsRaw:
                 tags[_PLVW_TAGS[key]] = tagsRaw[key]
         plyItems.append(PlaylistItem(str(pth), tags))
-        tagsRaw.clear()
         del tagsRaw
         try:
             mpSorter[pth] = int(tags['Track #'][0]) if 'Track #' in tags \
@@ -81,20 +147,118 @@ def LoadPlaylist(
         except ValueError:
             # Handling a/b format...
             pass
+    ProbeMany = getattr(mp3_class, 'ProbeMany', None)
+    if cache and unprobed and ProbeMany:
+        if q:
+            q.put(f'Probing {len(unprobed)} audios\n{playlist}')
+        for filename, rawData in ProbeMany(
+                [playlist / name for name in unprobed]):
+            if isinstance(rawData, Exception):
+                logging.error(f"Failed to probe '{filename}': {rawData}")
+                continue
+            name = filename.name
+            newEntries[name] = newEntries.get(name, entries[name])._replace(
+                probe=rawData)
+    if cache:
+        cache.PutMany(playlist, newEntries.items())
     playlistObj.Key = lambda pth: mpSorter[pth]
     playlistObj.Key = None
     plyItems.sort(key=lambda a: mpSorter[Path(a.name)])
     return playlistObj, plyItems
 
 
+def _ChainInvalidation(
+        invalidate: Callable[[Iterable[str]], None],
+        callback: Callable[[Path], None] | None,
+        ) -> Callable[[Path], None]:
+    """Returns a callback of `FolderPlaylist` which drops the cache entry
+    of the audio and then calls `callback` if it is provided.
+    """
+    def Callback(audio: Path) -> None:
+        invalidate([audio.name])
+        if callback:
+            callback(audio)
+    return Callback
+
+
+def SetLrcCache(cache: LrcCache | None) -> None:
+    """Sets the cache of parsed LRC files which is used by `LoadLrc`.
+    Passing None disables the cache.
+    """
+    global _lrcCache
+    _lrcCache = cache
+
+
+def SetLyricsPacks(packs: Iterable[PathLike]) -> None:
+    """Sets the zip lyrics packs which `LoadLrc` looks up, in order, for
+    LRC files missing in the file system. Packs in the folder of the
+    audio are always looked up afterwards.
+    """
+    global _lyricsPacks
+    _lyricsPacks = [Path(pack) for pack in packs]
+
+
 def LoadLrc(
         q: Queue | None,
         lrc_file: PathLike,
-        ) -> Lrc:
-    """Loads the specified LRC file."""
+        audio_file: PathLike | None = None,
+        ) -> tuple[Lrc, list[Lrc]]:
+    """Loads the specified LRC file and its translations, the
+    language-specific LRC files next to it such as `song.fa.lrc`, and
+    returns them as a 2-tuple. Translations which cannot be loaded are
+    skipped. If a cache is set via `SetLrcCache`, unchanged LRC files
+    are loaded from it without parsing. If the LRC file does not exist,
+    it is looked up by its stem in zip lyrics packs and then in the SYLT
+    and USLT frames of `audio_file` if provided; saving such lyrics
+    creates the LRC file.
+
+    #### Exceptions:
+    * `FileNotFoundError`: the lyrics were found neither in the file
+    system, nor in lyrics packs, nor in the audio.
+    """
     if q:
         q.put(f'Loading LRC\n{lrc_file}')
-    return Lrc(lrc_file, True, True)
+    try:
+        lrc = _LoadLrcFile(lrc_file)
+    except FileNotFoundError:
+        lrc = _LoadPackedLrc(lrc_file)
+        if lrc is None and audio_file is not None:
+            lrc = ReadId3Lyrics(audio_file, lrc_file)
+        if lrc is None:
+            raise
+    translations: list[Lrc] = []
+    for filename in Lrc.GetLrcFilenames(lrc_file):
+        if filename == Path(lrc_file):
+            continue
+        try:
+            translations.append(_LoadLrcFile(filename))
+        except (OSError, UnicodeDecodeError) as err:
+            logging.error(f"Failed to load LRC translation: {err}")
+    return lrc, translations
+
+
+def _LoadLrcFile(lrc_file: PathLike) -> Lrc:
+    """Loads the specified LRC file through the cache if it is set."""
+    if _lrcCache is None:
+        return Lrc(lrc_file, True, True)
+    return _lrcCache.Load(lrc_file, True, True)
+
+
+def _LoadPackedLrc(lrc_file: PathLike) -> Lrc | None:
+    """Looks up the stem of the specified LRC file in lyrics packs and
+    returns the first match or None.
+    """
+    lrc_file = Path(lrc_file)
+    packs = [*_lyricsPacks, *sorted(lrc_file.parent.glob('*.zip'))]
+    for pack in packs:
+        try:
+            lrc = LrcPack(pack).Get(lrc_file.stem, lrc_file, True, True)
+        except (OSError, BadZipFile, UnicodeDecodeError) as err:
+            logging.error(f"Failed to read the lyrics pack '{pack}': {err}")
+            continue
+        if lrc is not None:
+            return lrc
+    return None
 
 
 def LoadAudio(
@@ -102,6 +266,23 @@ def LoadAudio(
         audio_file: PathLike,
         mp3_class: type[AbstractMp3],
         ) -> AbstractMp3:
+    """Loads the specified audio by `mp3_class`. If a cache is set via
+    `SetMetadataCache` and `mp3_class` can be made from probe data by
+    `FromRawData`, the probe data of unchanged audios is read from the
+    cache and that of the others is stored in it.
+    """
     if q:
         q.put(f'Loading audio\n{audio_file}')
-    return mp3_class(audio_file)
+    cache = _metadataCache
+    FromRawData = getattr(mp3_class, 'FromRawData', None)
+    if cache is None or FromRawData is None:
+        return mp3_class(audio_file)
+    entry = cache.Get(audio_file)
+    if entry.probe is not None:
+        try:
+            return FromRawData(audio_file, entry.probe)
+        except (KeyError, TypeError, ValueError) as err:
+            logging.error(f"Bad cached probe data of '{audio_file}': {err}")
+    mp3 = mp3_class(audio_file)
+    cache.Put(audio_file, entry._replace(probe=mp3.RawData))
+    return mp3
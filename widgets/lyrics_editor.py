@@ -11,7 +11,9 @@ from typing import Callable, Iterable
 
 import tksheet
 
-from media.lrc import LyricsItem, Timestamp
+from media.lrc import LrcErrors, LyricsItem, Timestamp, \
+    TimestampsValidator
+from media.lrc_journal import LrcJournal
 
 
 class SelectionError(Exception):
@@ -43,6 +45,14 @@ class LyricsEditor(tksheet.Sheet):
         """The hash of data in the sheet computed column by column."""
         self._hashRows: str
         """The hash of data in the sheet computed row by row."""
+        self.journal: LrcJournal | None = None
+        """The journal which edits of this editor are recorded into, if
+        any.
+        """
+        self._validator = TimestampsValidator()
+        """Keeps the timestamps errors of the rows up to date as they are
+        edited.
+        """
         self.SetChangeOrigin()
         # Configuring the sheet...
         self.headers([
@@ -60,6 +70,50 @@ class LyricsEditor(tksheet.Sheet):
             'row_drag_and_drop',
             'arrowkeys',
             'edit_cell')
+        self.extra_bindings('end_edit_cell', self._OnCellEdited)
+        # Moving rows has different event names in different versions of
+        # tksheet...
+        self.extra_bindings(
+            ['end_row_index_drag_drop', 'end_move_rows'],
+            self._OnRowsMoved)
+    
+    @property
+    def timestampsErrors(self) -> LrcErrors:
+        """Gets the NO_TIMESTAMP, OUT_OF_ORDER, and DUPLICATE_TIMESTAMPS
+        errors of the rows of this editor. Edits update them by checking
+        only the neighbours of the edited rows.
+        """
+        return self._validator.errors
+    
+    def _OnCellEdited(self, event) -> None:
+        """Accounts for the edited cell once tksheet has applied the new
+        value.
+        """
+        # Newer tksheet passes event dictionaries, older ones tuples...
+        try:
+            row, col = event.row, event.column
+        except AttributeError:
+            row, col = event[1], event[2]
+        self.after_idle(self._ApplyCellEdit, row, col)
+    
+    def _ApplyCellEdit(self, row: int, col: int) -> None:
+        data: list[LyricsItem] = self.get_sheet_data()
+        if row >= len(data):
+            return
+        if col == 0:
+            self._validator.Set(row, data[row].timestamp)
+        if self.journal:
+            self.journal.RecordSetCell(row, col, data[row][col])
+    
+    def _OnRowsMoved(self, event) -> None:
+        """Accounts for the whole content after moving rows."""
+        self.after_idle(self._ResetRows)
+    
+    def _ResetRows(self) -> None:
+        data: list[LyricsItem] = self.get_sheet_data()
+        self._validator.Reset(li.timestamp for li in data)
+        if self.journal:
+            self.journal.RecordReset(data)
     
     def SetChangeOrigin(self) -> None:
         """Sets the current status of the editor as the origin for
@@ -110,10 +164,18 @@ class LyricsEditor(tksheet.Sheet):
     def ClearContent(self) -> None:
         """Clears the content of this lyrics editor and makes it empty."""
         self.set_sheet_data([], reset_col_positions=False)
+        self._validator.Reset(())
     
     def Populate(self, __lis: Iterable[LyricsItem], /) -> None:
-        """Populates the provided LRC object into this editor."""
-        self.set_sheet_data(__lis, reset_col_positions=False, redraw=True)
+        """Populates editable copies of the provided lyrics items into
+        this editor.
+        """
+        data = [li.Copy() for li in __lis]
+        self._validator.Reset(li.timestamp for li in data)
+        self.set_sheet_data(
+            data,
+            reset_col_positions=False,
+            redraw=True)
     
     def InsertRowAbove(self) -> None:
         """Inserts a row above selected cells. If no cell is selected,
@@ -134,6 +196,9 @@ class LyricsEditor(tksheet.Sheet):
         data.insert(
             rowIdx,
             LyricsItem(''))
+        self._validator.Insert(rowIdx, None)
+        if self.journal:
+            self.journal.RecordInsert(rowIdx, data[rowIdx])
         colIdx = 1
         self.set_sheet_data(data, reset_col_positions=False)
         if selectedBox:
@@ -158,6 +223,9 @@ class LyricsEditor(tksheet.Sheet):
         data.insert(
             rowIdx,
             LyricsItem(''))
+        self._validator.Insert(rowIdx, None)
+        if self.journal:
+            self.journal.RecordInsert(rowIdx, data[rowIdx])
         colIdx = 1
         self.set_sheet_data(data, reset_col_positions=False)
         if selectedBox:
@@ -170,6 +238,10 @@ class LyricsEditor(tksheet.Sheet):
             rowIdx, colIdx = cell
             if data[rowIdx][colIdx]:
                 data[rowIdx][colIdx] = ''
+                if colIdx == 0:
+                    self._validator.Set(rowIdx, None)
+                if self.journal:
+                    self.journal.RecordSetCell(rowIdx, colIdx, '')
         self.set_sheet_data(data, reset_col_positions=False)
     
     def RemoveRows(self) -> None:
@@ -181,6 +253,10 @@ class LyricsEditor(tksheet.Sheet):
         rowStart, _, rowEnd, _ = selectedBox[0]
         data = self.get_sheet_data()
         data = [*data[0:rowStart], *data[rowEnd:]]
+        for rowIdx in reversed(range(rowStart, rowEnd)):
+            self._validator.Delete(rowIdx)
+        if self.journal:
+            self.journal.RecordDelete(rowStart, rowEnd)
         self.set_sheet_data(data, reset_col_positions=False)
         #self.deselect()
         self.selection_clear()
@@ -198,6 +274,9 @@ class LyricsEditor(tksheet.Sheet):
         if (rowEnd - rowStart) == 1:
             data = self.get_sheet_data()
             data[rowStart][0] = Timestamp.FromFloat(pos)
+            self._validator.Set(rowStart, data[rowStart].timestamp)
+            if self.journal:
+                self.journal.RecordSetCell(rowStart, 0, data[rowStart][0])
             self.set_sheet_data(data, reset_col_positions=False)
             if rowEnd < len(data):
                 self.select_cell(rowEnd, 0)
@@ -286,6 +365,8 @@ class LyricsEditor(tksheet.Sheet):
             lineIdx = 0
             while True:
                 data[rowIdx][1] = clipLines[lineIdx]
+                if self.journal:
+                    self.journal.RecordSetCell(rowIdx, 1, clipLines[lineIdx])
                 lineIdx += 1
                 rowIdx += 1
         except IndexError:
@@ -296,6 +377,9 @@ class LyricsEditor(tksheet.Sheet):
             # The sheet exhausted, appending the rest of clipboard...
             for idx in range(lineIdx, len(clipLines)):
                 data.append(LyricsItem(clipLines[idx]))
+                self._validator.Insert(len(data) - 1, None)
+                if self.journal:
+                    self.journal.RecordInsert(len(data) - 1, data[-1])
         self.set_sheet_data(data, reset_col_positions=False)
 
     def PasteInsert(self) -> None: